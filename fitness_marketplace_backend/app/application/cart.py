@@ -1,7 +1,30 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app.config import settings
+from app.infrastructure.cache import TTLCache
 from app.infrastructure.cart_repo import MongoCartRepo
 from app.infrastructure.item_repo import MongoItemRepo
 from app.domain.entities import CartItem
 
+# Revalidated carts per user. Kept short so a refresh right after loading the
+# cart is free, while price/stock changes still show up within seconds.
+_revalidated_carts = TTLCache(
+    maxsize=settings.CART_CACHE_MAX_USERS,
+    ttl_seconds=settings.CART_REVALIDATION_TTL_SECONDS,
+)
+
+
+@dataclass
+class CartLine:
+    """A cart item checked against the current listing."""
+    item: CartItem
+    price_changed: bool = False
+    previous_price_cents: Optional[int] = None
+    out_of_stock: bool = False
+    quantity_capped: bool = False
+
+
 class AddToCart:
     def __init__(self, repo: MongoCartRepo, items: MongoItemRepo):
         self.repo = repo
@@ -23,15 +46,50 @@ class AddToCart:
         )
 
         await self.repo.add_item(cart_item)
+        _revalidated_carts.pop(user_id)
         return cart_item, None
 
 
 class GetCart:
-    def __init__(self, repo: MongoCartRepo):
+    def __init__(self, repo: MongoCartRepo, items: MongoItemRepo):
         self.repo = repo
+        self.items = items
 
-    async def execute(self, user_id: str):
-        return await self.repo.get_cart(user_id)
+    async def execute(self, user_id: str) -> List[CartLine]:
+        cached = _revalidated_carts.get(user_id)
+        if cached is not None:
+            return list(cached)
+
+        cart = await self.repo.get_cart(user_id)
+        # One $in query for every line instead of a lookup per product
+        products = await self.items.get_many([c.product_id for c in cart])
+
+        lines = []
+        for c in cart:
+            product = products.get(c.product_id)
+            if product is None or not product.is_seller or product.qty <= 0:
+                lines.append(CartLine(item=c, out_of_stock=True))
+                continue
+
+            price_changed = product.price_cents != c.price_cents
+            current = CartItem(
+                user_id=c.user_id,
+                product_id=c.product_id,
+                product_name=product.product_name,
+                price_cents=product.price_cents,
+                quantity=min(c.quantity, product.qty),
+                seller_user_id=product.owner_user_id,
+                photo=(product.photos[0] if product.photos else c.photo)
+            )
+            lines.append(CartLine(
+                item=current,
+                price_changed=price_changed,
+                previous_price_cents=c.price_cents if price_changed else None,
+                quantity_capped=c.quantity > product.qty,
+            ))
+
+        _revalidated_carts.set(user_id, tuple(lines))
+        return lines
 
 
 class RemoveFromCart:
@@ -40,6 +98,7 @@ class RemoveFromCart:
 
     async def execute(self, user_id: str, product_id: str):
         await self.repo.remove_item(user_id, product_id)
+        _revalidated_carts.pop(user_id)
 
 
 class ClearCart:
@@ -48,3 +107,4 @@ class ClearCart:
 
     async def execute(self, user_id: str):
         await self.repo.clear_cart(user_id)
+        _revalidated_carts.pop(user_id)
@@ -0,0 +1,144 @@
+# app/application/events.py
+"""
+Side effects of listings, purchases and reviews, run by the outbox dispatcher after
+the write has returned. A retry runs only the handlers that failed, but delivery
+is at-least-once, so handlers must tolerate seeing an event twice.
+"""
+import logging
+from datetime import datetime
+from typing import List
+
+from app.domain import events
+from app.domain.entities import Item, Purchase, PurchaseStatus, SearchAlert
+from app.domain.events import OutboxEvent
+from app.infrastructure.item_repo import MongoItemRepo
+from app.infrastructure.outbox import OutboxDispatcher
+from app.infrastructure.percolator import SearchPercolator, percolator
+from app.infrastructure.sales_rollup_repo import MongoSalesRollupRepo
+from app.infrastructure.saved_search_repo import MongoSavedSearchRepo
+from app.infrastructure.trending import trending
+
+logger = logging.getLogger(__name__)
+
+
+def _purchase_from_payload(payload: dict) -> Purchase:
+    fields = {k: v for k, v in payload.items() if k != "previous_status"}
+    return Purchase(**fields)
+
+
+class UpdateSalesRollups:
+    """Adds new purchases to the sellers' daily rollups and takes cancelled ones out.
+
+    Not retried once it has succeeded, even if another handler of the
+    event fails. Only a crash between the increment and its record counts
+    an event twice; `POST /purchases/stats/rebuild` recomputes the
+    rollups from the purchases.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def __call__(self, batch: List[OutboxEvent]) -> None:
+        rollups = MongoSalesRollupRepo(self.db)
+        created = [
+            _purchase_from_payload(e.payload) for e in batch
+            if e.event_type == events.PURCHASE_CREATED
+        ]
+        cancelled = [
+            _purchase_from_payload(e.payload) for e in batch
+            if e.event_type == events.PURCHASE_STATUS_CHANGED
+            and e.payload["status"] == PurchaseStatus.CANCELLED
+        ]
+        await rollups.record_sales(created)
+        await rollups.remove_sales(cancelled)
+
+
+async def count_trending_purchases(batch: List[OutboxEvent]) -> None:
+    for event in batch:
+        p = event.payload
+        trending.record_purchase(p["product_id"], p["quantity"], at=p["purchase_date"])
+
+
+async def notify_sellers(batch: List[OutboxEvent]) -> None:
+    """Seller order notification (FR-SELL-03)."""
+    for event in batch:
+        p = event.payload
+        logger.info(
+            "New order %s for seller %s: %d x %s",
+            p["purchase_id"], p["seller_user_id"], p["quantity"], p["product_name"],
+        )
+
+
+class MatchSavedSearches:
+    """Raises an alert for every saved search a new listing matches.
+
+    Runs on the worker holding the dispatcher lease, which keeps the
+    percolator in memory and catches it up with new and deleted searches
+    before each batch. Alerts are keyed by search and listing, so a
+    redelivered event does not alert twice.
+    """
+
+    def __init__(self, db, percolator: SearchPercolator):
+        self.repo = MongoSavedSearchRepo(db)
+        self.percolator = percolator
+
+    async def __call__(self, batch: List[OutboxEvent]) -> None:
+        await self.percolator.sync(self.repo)
+        now = datetime.utcnow()
+        alerts = []
+        for event in batch:
+            p = event.payload
+            if not p["is_seller"]:
+                continue
+            item = Item(
+                product_id=p["product_id"],
+                product_name=p["product_name"],
+                category=p["category"],
+                price_cents=p["price_cents"],
+                qty=0,
+                is_seller=True,
+                owner_user_id=p["owner_user_id"],
+                description=p["description"],
+            )
+            for search_id, user_id in self.percolator.match(item):
+                if user_id == item.owner_user_id:
+                    continue
+                alerts.append(SearchAlert(
+                    alert_id=f"{search_id}:{item.product_id}",
+                    search_id=search_id,
+                    user_id=user_id,
+                    product_id=item.product_id,
+                    product_name=item.product_name,
+                    category=item.category,
+                    price_cents=item.price_cents,
+                    created_at=now,
+                ))
+        await self.repo.add_alerts(alerts)
+
+
+class UpdateProductRatings:
+    """Keeps each listing's rating counters and score in step with its reviews.
+
+    The reviewed listings are recomputed from their reviews rather than
+    adjusted by the event, so a redelivered batch changes nothing.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def __call__(self, batch: List[OutboxEvent]) -> None:
+        product_ids = {event.payload["product_id"] for event in batch}
+        await MongoItemRepo(self.db).rebuild_ratings(sorted(product_ids))
+
+
+def register_handlers(dispatcher: OutboxDispatcher, db) -> None:
+    sales_rollups = UpdateSalesRollups(db)
+    dispatcher.register(events.PURCHASE_CREATED, sales_rollups)
+    dispatcher.register(events.PURCHASE_STATUS_CHANGED, sales_rollups)
+    dispatcher.register(events.PURCHASE_CREATED, notify_sellers)
+    dispatcher.register(events.PURCHASE_CREATED, count_trending_purchases)
+    dispatcher.register(events.ITEM_CREATED, MatchSavedSearches(db, percolator))
+    product_ratings = UpdateProductRatings(db)
+    dispatcher.register(events.REVIEW_CREATED, product_ratings)
+    dispatcher.register(events.REVIEW_UPDATED, product_ratings)
+    dispatcher.register(events.REVIEW_DELETED, product_ratings)
@@ -1,13 +1,25 @@
 # app/application/use_cases.py
-from typing import Optional, Sequence, Iterable, List
-from dataclasses import dataclass
-from app.domain.entities import Item, User, Purchase, Review, CartItem
-from app.domain.repositories import ItemRepo, UserRepository, PurchaseRepository, ReviewRepository
+from typing import Optional, Sequence, Iterable, List, Dict, Tuple
+from dataclasses import dataclass, replace
+from app.domain.entities import (
+    Item, User, Purchase, PurchaseStatus, Review, CartItem, DailySales, SavedSearch, SearchAlert,
+    TrendingProduct
+)
+from app.domain import events
+from app.domain.repositories import (
+    ItemRepo, UserRepository, PurchaseRepository, ReviewRepository, SalesRollupRepository,
+    SavedSearchRepository
+)
 from app.infrastructure.cart_repo import MongoCartRepo
 from app.infrastructure.item_repo import MongoItemRepo
-from app.domain.services import StorageService
+from app.infrastructure.flash_sale import FlashSaleRegistry, FlashSale
+from app.infrastructure.notifications import NotificationHub, purchase_notification
+from app.infrastructure.trending import TrendingTracker
+from app.infrastructure.suggest import tokens
+from app.domain.services import StorageService, ItemIndexer
+import asyncio
 import bcrypt
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
 
 from app.domain.results import Result
@@ -17,9 +29,15 @@ from app.domain.results import Result
 # ========== EXISTING ITEM USE CASES ==========
 
 class CreateItem:
-    def __init__(self, repo: ItemRepo, storage: StorageService | None = None):
+    def __init__(
+        self,
+        repo: ItemRepo,
+        storage: StorageService | None = None,
+        indexers: Sequence[ItemIndexer] = ()
+    ):
         self.repo = repo
         self.storage = storage
+        self.indexers = indexers
 
     async def execute(
         self, *, product_id: str, product_name: str, category: str,
@@ -42,15 +60,41 @@ class CreateItem:
             description=description,
             photos=photos or None,
         )
-        return await self.repo.create(item)
+        # Saved-search alerts are matched by the outbox dispatcher, off the request
+        created = await self.repo.create(item, events=[events.item_created(item)])
+        for indexer in self.indexers:
+            indexer.add(created)
+        return created
 
 
 class ListItems:
     def __init__(self, repo: ItemRepo):
         self.repo = repo
 
-    async def execute(self, *, is_seller: Optional[bool], category: Optional[str]) -> Iterable[Item]:
-        return await self.repo.list(is_seller=is_seller, category=category)
+    async def execute(
+        self,
+        *,
+        is_seller: Optional[bool],
+        category: Optional[str],
+        sort: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterable[Item]:
+        return await self.repo.list(
+            is_seller=is_seller, category=category, sort=sort, limit=limit, offset=offset,
+            fields=fields
+        )
+
+
+class RebuildProductRatings:
+    """Recompute the listings' rating scores from the reviews collection"""
+
+    def __init__(self, repo: ItemRepo):
+        self.repo = repo
+
+    async def execute(self, product_id: Optional[str] = None) -> int:
+        return await self.repo.rebuild_ratings([product_id] if product_id else None)
 
 
 class ListItemsByOwner:
@@ -255,9 +299,17 @@ class PurchaseResult:
 class PurchaseItem:
     """Use case for purchasing an item"""
     
-    def __init__(self, purchase_repo: PurchaseRepository, item_repo: ItemRepo):
+    def __init__(
+        self,
+        purchase_repo: PurchaseRepository,
+        item_repo: ItemRepo,
+        flash_sales: Optional[FlashSaleRegistry] = None,
+        notifier: Optional[NotificationHub] = None
+    ):
         self.purchase_repo = purchase_repo
         self.item_repo = item_repo
+        self.flash_sales = flash_sales
+        self.notifier = notifier
     
     async def execute(
         self,
@@ -265,6 +317,11 @@ class PurchaseItem:
         product_id: str,
         quantity: int
     ) -> PurchaseResult:
+        # 0. Products on flash sale are sold from this worker's token pool
+        sale = self.flash_sales.get(product_id) if self.flash_sales else None
+        if sale:
+            return await self._flash_purchase(sale, buyer_user_id, quantity)
+
         # 1. Get the item
         item = await self.item_repo.get_by_id(product_id)
         if not item:
@@ -295,7 +352,7 @@ class PurchaseItem:
             quantity=quantity,
             total_price_cents=total_price,
             purchase_date=datetime.utcnow(),
-            status="completed",
+            status=PurchaseStatus.PENDING,
             photo=item.photos[0] if item.photos else None  # 🔥 IMAGE SUPPORT
         )
         
@@ -303,31 +360,248 @@ class PurchaseItem:
         new_qty = item.qty - quantity
         await self.item_repo.update_quantity(product_id, new_qty)
         
-        # 8. Save purchase
-        created_purchase = await self.purchase_repo.create(purchase)
+        # 8. Save purchase; side effects (sales rollups, seller notification)
+        #    run from the outbox after we return
+        created_purchase = await self.purchase_repo.create(
+            purchase, events=[events.purchase_created(purchase)]
+        )
+
+        # 9. Tell the seller right away if they are listening
+        self._notify_seller(created_purchase)
         
         return PurchaseResult(purchase=created_purchase)
 
+    def _notify_seller(self, purchase: Purchase):
+        if self.notifier:
+            self.notifier.publish(
+                purchase.seller_user_id,
+                "purchase",
+                purchase_notification(purchase),
+                event_id=purchase.purchase_id
+            )
+
+    async def _flash_purchase(
+        self,
+        sale: FlashSale,
+        buyer_user_id: str,
+        quantity: int
+    ) -> PurchaseResult:
+        """Admit against in-memory stock; the purchase is written in the next batch."""
+        item = sale.item
+        if not item.is_seller:
+            return PurchaseResult(error="This item is not for sale")
+        if item.owner_user_id == buyer_user_id:
+            return PurchaseResult(error="You cannot buy your own item")
+        if not await sale.pool.acquire(quantity):
+            return PurchaseResult(error="Sold out")
+
+        purchase = Purchase(
+            purchase_id=str(uuid.uuid4()),
+            buyer_user_id=buyer_user_id,
+            seller_user_id=item.owner_user_id,
+            product_id=item.product_id,
+            product_name=item.product_name,
+            quantity=quantity,
+            total_price_cents=item.price_cents * quantity,
+            purchase_date=datetime.utcnow(),
+            status=PurchaseStatus.PENDING,
+            photo=item.photos[0] if item.photos else None
+        )
+        self.flash_sales.enqueue(purchase)
+        self._notify_seller(purchase)
+        return PurchaseResult(purchase=purchase)
+
 
 
 class GetPurchasesByBuyer:
-    """Get all purchases by a buyer"""
+    """Get purchases by a buyer, newest first, optionally filtered by status"""
     
     def __init__(self, purchase_repo: PurchaseRepository):
         self.purchase_repo = purchase_repo
     
-    async def execute(self, buyer_user_id: str) -> List[Purchase]:
-        return await self.purchase_repo.list_by_buyer(buyer_user_id)
+    async def execute(
+        self,
+        buyer_user_id: str,
+        statuses: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Purchase]:
+        return await self.purchase_repo.list_by_buyer(buyer_user_id, statuses, limit, offset, fields)
 
 
 class GetPurchasesBySeller:
-    """Get all purchases (sales) for a seller"""
+    """Get purchases (sales) for a seller, newest first, optionally filtered by status"""
     
     def __init__(self, purchase_repo: PurchaseRepository):
         self.purchase_repo = purchase_repo
     
-    async def execute(self, seller_user_id: str) -> List[Purchase]:
-        return await self.purchase_repo.list_by_seller(seller_user_id)
+    async def execute(
+        self,
+        seller_user_id: str,
+        statuses: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Purchase]:
+        return await self.purchase_repo.list_by_seller(seller_user_id, statuses, limit, offset, fields)
+
+
+@dataclass
+class StatusChangeResult:
+    purchase: Optional[Purchase] = None
+    error: Optional[str] = None
+    reason: Optional[str] = None  # "not_found", "forbidden", "invalid" or "conflict"
+
+
+class UpdatePurchaseStatus:
+    """
+    Move an order through its workflow (see PurchaseStatus).
+
+    The seller ships, delivers or cancels; the buyer may cancel while the
+    order is still pending. The update only applies if nobody changed the
+    status in the meantime. Cancelling puts the quantity back in stock,
+    in the same write as the status change.
+    """
+
+    def __init__(
+        self,
+        purchase_repo: PurchaseRepository,
+        notifier: Optional[NotificationHub] = None
+    ):
+        self.purchase_repo = purchase_repo
+        self.notifier = notifier
+
+    async def execute(self, purchase_id: str, user_id: str, new_status: str) -> StatusChangeResult:
+        if new_status not in PurchaseStatus.ALL:
+            return StatusChangeResult(error=f"Unknown status '{new_status}'", reason="invalid")
+
+        purchase = await self.purchase_repo.get_by_id(purchase_id)
+        if not purchase:
+            return StatusChangeResult(error="Purchase not found", reason="not_found")
+
+        is_seller = user_id == purchase.seller_user_id
+        buyer_cancels = (
+            user_id == purchase.buyer_user_id
+            and new_status == PurchaseStatus.CANCELLED
+            and purchase.status == PurchaseStatus.PENDING
+        )
+        if not (is_seller or buyer_cancels):
+            return StatusChangeResult(
+                error="Not allowed to change the status of this purchase", reason="forbidden"
+            )
+
+        if not PurchaseStatus.can_transition(purchase.status, new_status):
+            return StatusChangeResult(
+                error=f"Cannot change status from '{purchase.status}' to '{new_status}'",
+                reason="invalid"
+            )
+
+        updated = await self.purchase_repo.update_status(
+            purchase_id,
+            new_status,
+            expected_status=purchase.status,
+            events=[events.purchase_status_changed(purchase, new_status)],
+            restock=new_status == PurchaseStatus.CANCELLED
+        )
+        if not updated:
+            return StatusChangeResult(
+                error="The purchase status was changed by someone else; reload and retry",
+                reason="conflict"
+            )
+
+        changed = replace(purchase, status=new_status)
+        if self.notifier:
+            self.notifier.publish(
+                changed.seller_user_id, "status", purchase_notification(changed)
+            )
+        return StatusChangeResult(purchase=changed)
+
+
+@dataclass
+class DailySalesTotal:
+    day: datetime
+    units: int = 0
+    revenue_cents: int = 0
+    orders: int = 0
+
+
+@dataclass
+class ProductSalesTotal:
+    product_id: str
+    product_name: str
+    units: int = 0
+    revenue_cents: int = 0
+
+
+@dataclass
+class SellerSalesStats:
+    seller_user_id: str
+    start: datetime
+    end: datetime
+    total_units: int
+    total_revenue_cents: int
+    total_orders: int
+    daily: List[DailySalesTotal]
+    top_products: List[ProductSalesTotal]
+
+
+class GetSellerSalesStats:
+    """Daily revenue, units and top products for a seller, read from rollups"""
+
+    DEFAULT_RANGE_DAYS = 30
+
+    def __init__(self, sales_rollups: SalesRollupRepository):
+        self.sales_rollups = sales_rollups
+
+    async def execute(
+        self,
+        seller_user_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        top_n: int = 5
+    ) -> SellerSalesStats:
+        # `end` is inclusive for callers; rollups are queried with day < end + 1
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        end = end or today
+        start = start or end - timedelta(days=self.DEFAULT_RANGE_DAYS - 1)
+        rows: List[DailySales] = await self.sales_rollups.list_daily(
+            seller_user_id, start, end + timedelta(days=1)
+        )
+
+        daily: dict[datetime, DailySalesTotal] = {}
+        products: dict[str, ProductSalesTotal] = {}
+        for r in rows:
+            d = daily.setdefault(r.day, DailySalesTotal(day=r.day))
+            d.units += r.units
+            d.revenue_cents += r.revenue_cents
+            d.orders += r.orders
+
+            p = products.setdefault(r.product_id, ProductSalesTotal(r.product_id, r.product_name))
+            p.units += r.units
+            p.revenue_cents += r.revenue_cents
+
+        top = sorted(products.values(), key=lambda p: p.revenue_cents, reverse=True)[:top_n]
+        return SellerSalesStats(
+            seller_user_id=seller_user_id,
+            start=start,
+            end=end,
+            total_units=sum(d.units for d in daily.values()),
+            total_revenue_cents=sum(d.revenue_cents for d in daily.values()),
+            total_orders=sum(d.orders for d in daily.values()),
+            daily=list(daily.values()),
+            top_products=top,
+        )
+
+
+class RebuildSalesRollups:
+    """Recompute sales rollups from the purchases collection"""
+
+    def __init__(self, sales_rollups: SalesRollupRepository):
+        self.sales_rollups = sales_rollups
+
+    async def execute(self, seller_user_id: Optional[str] = None) -> int:
+        return await self.sales_rollups.rebuild(seller_user_id)
 
 
 class GetPurchaseById:
@@ -384,11 +658,11 @@ class ReviewService:
         #         "error": "Only the buyer can review this purchase"
         #     }
         
-        # Check if purchase is completed
-        if purchase.status != "completed":
+        # Cancelled orders cannot be reviewed
+        if purchase.status == PurchaseStatus.CANCELLED:
             return {
                 "success": False,
-                "error": "Can only review completed purchases"
+                "error": "Cannot review a cancelled purchase"
             }
         
         # Check if review already exists for this purchase
@@ -411,7 +685,9 @@ class ReviewService:
             created_at=datetime.utcnow()
         )
         
-        created_review = await self.review_repo.create(review)
+        created_review = await self.review_repo.create(
+            review, events=[events.review_created(review)]
+        )
         
         return {
             "success": True,
@@ -457,7 +733,10 @@ class ReviewService:
             }
         
         # Update review
-        success = await self.review_repo.update(review_id, rating, comment.strip())
+        success = await self.review_repo.update(
+            review_id, rating, comment.strip(),
+            events=[events.review_updated(review, new_rating=rating)]
+        )
         
         if not success:
             return {
@@ -489,7 +768,9 @@ class ReviewService:
                 "error": "Only the reviewer can delete this review"
             }
         
-        deleted = await self.review_repo.delete(review_id)
+        deleted = await self.review_repo.delete(
+            review_id, events=[events.review_deleted(review)]
+        )
         
         return {
             "success": deleted,
@@ -498,8 +779,10 @@ class ReviewService:
     
     async def get_seller_reviews(self, seller_user_id: str) -> dict:
         """Get all reviews for a seller with statistics"""
-        reviews = await self.review_repo.list_by_seller(seller_user_id)
-        stats = await self.review_repo.get_seller_rating_stats(seller_user_id)
+        reviews, stats = await asyncio.gather(
+            self.review_repo.list_by_seller(seller_user_id),
+            self.review_repo.get_seller_rating_stats(seller_user_id),
+        )
         
         return {
             "reviews": reviews,
@@ -535,6 +818,52 @@ class ReviewService:
         }
 
 
+# ===== SELLER DASHBOARD =====
+
+@dataclass
+class SellerDashboard:
+    seller_user_id: str
+    listings: dict
+    sales: dict
+    ratings: dict
+
+
+class GetSellerDashboard:
+    """Listings summary, recent sales and rating stats for a seller.
+
+    The three summaries are independent $facet queries run concurrently, so
+    the dashboard costs as much as the slowest one rather than their sum.
+    """
+
+    def __init__(
+        self,
+        item_repo: ItemRepo,
+        purchase_repo: PurchaseRepository,
+        review_repo: ReviewRepository
+    ):
+        self.item_repo = item_repo
+        self.purchase_repo = purchase_repo
+        self.review_repo = review_repo
+
+    async def execute(
+        self,
+        seller_user_id: str,
+        recent_sales: int = 10,
+        recent_reviews: int = 5
+    ) -> SellerDashboard:
+        listings, sales, ratings = await asyncio.gather(
+            self.item_repo.get_owner_summary(seller_user_id),
+            self.purchase_repo.get_seller_sales_summary(seller_user_id, recent_sales),
+            self.review_repo.get_seller_review_summary(seller_user_id, recent_reviews),
+        )
+        return SellerDashboard(
+            seller_user_id=seller_user_id,
+            listings=listings,
+            sales=sales,
+            ratings=ratings,
+        )
+
+
 # ===== ADMIN USE CASES =====
 # all admin related functions
 
@@ -543,3 +872,199 @@ class UpdateStatus:
         self.repo = repo
     async def execute(self, user_id:str, new_status:str) -> bool:
          return await self.repo.update_status(user_id,new_status)
+
+
+# ========== REVIEW PAGES ==========
+
+@dataclass
+class ReviewPage:
+    reviews: List[Review]
+    reviewer_names: Dict[str, str]
+    next_cursor: Optional[str]  # None on the last page
+
+
+class ListReviews:
+    """
+    One page of reviews, newest first, with the reviewers' display names.
+    The page is one indexed query and the names one batched user lookup,
+    whatever the page size.
+    """
+
+    def __init__(self, review_repo: ReviewRepository, user_repo: UserRepository):
+        self.review_repo = review_repo
+        self.user_repo = user_repo
+
+    async def execute(
+        self, *, by: str, owner_id: str, limit: int, cursor: Optional[str] = None,
+        comment_chars: Optional[int] = None, fields: Optional[Sequence[str]] = None
+    ) -> ReviewPage:
+        """`by` is "product", "seller" or "reviewer"; raises ValueError on a bad cursor"""
+        page = {
+            "product": self.review_repo.page_by_product,
+            "seller": self.review_repo.page_by_seller,
+            "reviewer": self.review_repo.page_by_reviewer,
+        }[by]
+        reviews, next_cursor = await page(owner_id, limit, cursor, comment_chars, fields)
+        if fields and "reviewer_user_id" not in fields:
+            names = {}
+        else:
+            names = await self.user_repo.get_names([r.reviewer_user_id for r in reviews])
+        return ReviewPage(reviews=reviews, reviewer_names=names, next_cursor=next_cursor)
+
+
+# ========== HOMEPAGE ==========
+
+@dataclass
+class HomepageSections:
+    top_rated: List[Item]  # by rating score, as GET /listings?sort=rating
+    new_arrivals: List[Item]
+    trending: List[Tuple[Item, TrendingProduct]]
+    best_sellers: Dict[str, List[Tuple[Item, int]]]  # category -> (item, units sold), best category first
+
+
+class BuildHomepage:
+    """
+    The curated homepage sections, computed from a few bounded queries.
+    Only listings for sale are shown; ranked candidates are over-fetched so
+    that dropping the others still fills each section.
+    """
+
+    def __init__(
+        self,
+        item_repo: ItemRepo,
+        rollup_repo: SalesRollupRepository,
+        trending: TrendingTracker,
+        *,
+        section_size: int,
+        best_seller_days: int,
+        best_sellers_per_category: int
+    ):
+        self.item_repo = item_repo
+        self.rollup_repo = rollup_repo
+        self.trending = trending
+        self.section_size = section_size
+        self.best_seller_days = best_seller_days
+        self.best_sellers_per_category = best_sellers_per_category
+
+    async def execute(self) -> HomepageSections:
+        since = datetime.utcnow() - timedelta(days=self.best_seller_days)
+        rated, newest, sold = await asyncio.gather(
+            self.item_repo.list(is_seller=True, sort="rating", limit=self.section_size),
+            self.item_repo.list_newest(self.section_size),
+            self.rollup_repo.top_products(since, 1000),
+        )
+        hot = self.trending.top(self.section_size * 2)
+
+        wanted = {pid for pid, _ in sold} | {
+            t.product_id for t in hot if t.product_id not in self.trending.items
+        }
+        items = {**self.trending.items, **await self.item_repo.get_many(list(wanted))}
+
+        def for_sale(product_id: str) -> Optional[Item]:
+            item = items.get(product_id)
+            return item if item and item.is_seller else None
+
+        best_sellers: Dict[str, List[Tuple[Item, int]]] = {}
+        category_units: Dict[str, int] = {}
+        for product_id, units in sold:  # best first
+            item = for_sale(product_id)
+            if item is None:
+                continue
+            category_units[item.category] = category_units.get(item.category, 0) + units
+            rows = best_sellers.setdefault(item.category, [])
+            if len(rows) < self.best_sellers_per_category:
+                rows.append((item, units))
+
+        return HomepageSections(
+            top_rated=rated,
+            new_arrivals=newest,
+            trending=[(i, t) for t in hot if (i := for_sale(t.product_id))][:self.section_size],
+            best_sellers={
+                c: best_sellers[c]
+                for c in sorted(best_sellers, key=category_units.get, reverse=True)
+            },
+        )
+
+
+# ========== SAVED SEARCHES ==========
+
+@dataclass
+class SavedSearchResult:
+    search: Optional[SavedSearch] = None
+    error: Optional[str] = None
+
+
+class SaveSearch:
+    """
+    Save a search a buyer wants alerts for. New listings are matched
+    against it by the outbox dispatcher (see MatchSavedSearches), so it only
+    alerts on listings created after it was saved.
+    """
+
+    def __init__(self, repo: SavedSearchRepository, max_per_user: int):
+        self.repo = repo
+        self.max_per_user = max_per_user
+
+    async def execute(
+        self, *, user_id: str, query: Optional[str], category: Optional[str],
+        min_price_cents: Optional[int], max_price_cents: Optional[int]
+    ) -> SavedSearchResult:
+        query = (query or "").strip() or None
+        category = (category or "").strip() or None
+        if not (query or category or min_price_cents is not None or max_price_cents is not None):
+            return SavedSearchResult(error="A saved search needs a query, a category or a price range")
+        # Listings are matched on these words; a query without any would match every listing
+        if query and not tokens(query):
+            return SavedSearchResult(error="The query needs at least one letter or digit (a-z, 0-9)")
+        if (
+            min_price_cents is not None and max_price_cents is not None
+            and min_price_cents > max_price_cents
+        ):
+            return SavedSearchResult(error="minPriceCents is greater than maxPriceCents")
+        if await self.repo.count_by_user(user_id) >= self.max_per_user:
+            return SavedSearchResult(error=f"At most {self.max_per_user} saved searches per user")
+
+        search = SavedSearch(
+            search_id=str(uuid.uuid4()),
+            user_id=user_id,
+            query=query,
+            category=category,
+            min_price_cents=min_price_cents,
+            max_price_cents=max_price_cents,
+            created_at=datetime.utcnow(),
+        )
+        return SavedSearchResult(search=await self.repo.create(search))
+
+
+class ListSavedSearches:
+    def __init__(self, repo: SavedSearchRepository):
+        self.repo = repo
+
+    async def execute(self, user_id: str) -> List[SavedSearch]:
+        return await self.repo.list_by_user(user_id)
+
+
+class DeleteSavedSearch:
+    def __init__(self, repo: SavedSearchRepository):
+        self.repo = repo
+
+    async def execute(self, search_id: str, user_id: str) -> bool:
+        return await self.repo.delete(search_id, user_id)
+
+
+class GetSearchAlerts:
+    """Listings that matched the user's saved searches, newest first"""
+
+    def __init__(self, repo: SavedSearchRepository):
+        self.repo = repo
+
+    async def execute(self, user_id: str, unread_only: bool = False, limit: int = 50) -> List[SearchAlert]:
+        return await self.repo.list_alerts(user_id, unread_only, limit)
+
+
+class MarkSearchAlertsRead:
+    def __init__(self, repo: SavedSearchRepository):
+        self.repo = repo
+
+    async def execute(self, user_id: str, alert_ids: List[str]) -> int:
+        return await self.repo.mark_alerts_read(user_id, alert_ids)
@@ -18,9 +18,110 @@ class Settings(BaseSettings):
     # in settings.py
     MONGO_PURCHASES_COLLECTION: str = "purchases"
     MONGO_REVIEWS_COLLECTION: str = "reviews"
+    MONGO_CART_COLLECTION: str = "cart"
+    MONGO_SALES_DAILY_COLLECTION: str = "sales_daily"
+    MONGO_IDEMPOTENCY_COLLECTION: str = "idempotency_keys"
+    MONGO_FLASH_SALES_COLLECTION: str = "flash_sales"
+    MONGO_OUTBOX_COLLECTION: str = "outbox"
+    MONGO_LOCKS_COLLECTION: str = "locks"
+    MONGO_TRENDING_COLLECTION: str = "trending"
+    MONGO_RELATED_ITEMS_COLLECTION: str = "related_items"
+    MONGO_SAVED_SEARCHES_COLLECTION: str = "saved_searches"
+    MONGO_SEARCH_ALERTS_COLLECTION: str = "search_alerts"
+    MONGO_COLLECTION_VERSIONS_COLLECTION: str = "collection_versions"
+
+    # --- Cart cache ---
+    CART_CACHE_TTL_SECONDS: float = 30.0
+    CART_CACHE_MAX_USERS: int = 10_000
+    CART_REVALIDATION_TTL_SECONDS: float = 5.0
+    CART_TTL_SECONDS: int = 30 * 24 * 3600  # carts untouched for 30 days expire
+    CART_COMPACTION_INTERVAL_SECONDS: float = 6 * 3600
+
+    # --- Product ratings ---
+    RATING_PRIOR_MEAN: float = 3.0  # score of a product with no reviews
+    RATING_PRIOR_COUNT: int = 5  # reviews at the prior mean added to every product's score
+    RATING_CACHE_TTL_SECONDS: float = 60.0  # bounds how stale another worker's view can be
+    RATING_CACHE_MAX_PRODUCTS: int = 50_000
+    RATING_BATCH_MAX_PRODUCTS: int = 200
+
+    # --- Idempotency keys ---
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 3600
+    IDEMPOTENCY_CACHE_SIZE: int = 10_000
+    IDEMPOTENCY_CACHE_TTL_SECONDS: float = 300.0
+    IDEMPOTENCY_LOCK_SECONDS: float = 30.0  # renewed while running; a lapsed claim means its worker died
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0  # how long a duplicate waits on another worker
+    IDEMPOTENCY_POLL_SECONDS: float = 0.05
+
+    # --- Flash sales ---
+    FLASH_SALE_CHUNK_SIZE: int = 50  # tokens a worker claims from stock at a time
+    FLASH_SALE_BATCH_SIZE: int = 200  # buffered purchases that trigger an early flush
+    FLASH_SALE_FLUSH_SECONDS: float = 0.5
+    FLASH_SALE_REFRESH_SECONDS: float = 2.0
+
+    # --- Outbox / event dispatch ---
+    OUTBOX_USE_TRANSACTIONS: bool = True  # needs a replica set; off for a standalone dev mongod
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_SECONDS: float = 1.0
+    OUTBOX_MAX_ATTEMPTS: int = 10  # then the event is parked as "dead"
+    OUTBOX_MAX_BACKOFF_SECONDS: float = 300.0
+    OUTBOX_LEASE_SECONDS: float = 15.0
+    OUTBOX_RETENTION_SECONDS: int = 7 * 24 * 3600
+
+    # --- Server-sent events ---
+    SSE_QUEUE_SIZE: int = 100  # undelivered events before a slow client is dropped
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    SSE_RETRY_MS: int = 3000  # client reconnect delay
+
+    # --- Trending ---
+    TRENDING_WINDOW_HOURS: int = 24
+    TRENDING_PURCHASE_WEIGHT: float = 5.0  # one unit sold counts as much as this many views
+    TRENDING_MERGE_SECONDS: float = 30.0
+    TRENDING_REFRESH_SECONDS: float = 60.0
+    TRENDING_TRACKED_PRODUCTS: int = 500  # size of the ranked snapshot each worker holds
+
+    # --- View counts ---
+    VIEW_COUNT_FLUSH_SECONDS: float = 5.0
+
+    # --- Frequently bought together ---
+    RELATED_ITEMS_TOP_N: int = 10
+    CO_PURCHASE_WINDOW_DAYS: int = 30  # one buyer's purchases within this window form a basket
+    CO_PURCHASE_UPDATE_SECONDS: float = 600.0  # incremental update of recently bought products
+    CO_PURCHASE_REBUILD_SECONDS: float = 24 * 3600.0
+    CO_PURCHASE_REBUILD_LEASE_SECONDS: float = 3600.0  # longer than a rebuild takes
+
+    # --- Similar items (content-based) ---
+    SIMILAR_ITEMS_DIR: str = "data/similar_items"
+    SIMILAR_ITEMS_DIM: int = 256  # float32 per listing and dimension: 1 KB per listing
+    SIMILAR_ITEMS_REBUILD_SECONDS: float = 6 * 3600.0
+    SIMILAR_ITEMS_RELOAD_SECONDS: float = 300.0  # how often workers pick up a new build and new listings
+    SIMILAR_ITEMS_LEASE_SECONDS: float = 3600.0  # longer than a rebuild takes
+    SIMILAR_ITEMS_CLOCK_SKEW_SECONDS: float = 60.0
+
+    # --- Homepage snapshot ---
+    HOMEPAGE_REFRESH_SECONDS: float = 120.0
+    HOMEPAGE_SECTION_SIZE: int = 12
+    HOMEPAGE_BEST_SELLER_DAYS: int = 30
+    HOMEPAGE_BEST_SELLERS_PER_CATEGORY: int = 6
+    HOMEPAGE_MAX_AGE_SECONDS: int = 60  # Cache-Control for browsers and CDNs
+
+    # --- Saved searches ---
+    SAVED_SEARCH_MAX_PER_USER: int = 50
+    SAVED_SEARCH_TOMBSTONE_SECONDS: int = 24 * 3600  # how long deletions stay visible to the matcher
+    SAVED_SEARCH_SYNC_OVERLAP_SECONDS: float = 60.0  # re-read window, covers clock skew between workers
+    SEARCH_ALERT_RETENTION_DAYS: int = 30
+
+    # --- Autocomplete ---
+    SUGGEST_MAX_ENTRIES: int = 200_000  # distinct product names + categories held per worker
+    SUGGEST_MAX_RESULTS: int = 20
+    SUGGEST_SCAN_LIMIT: int = 256  # prefixes matching more words than this are precomputed
+    SUGGEST_REFRESH_SECONDS: float = 600.0
 
 
     
+    # --- Response compression ---
+    COMPRESSION_MIN_BYTES: int = 1024  # smaller bodies gain less than the header costs
+    COMPRESSION_THREAD_BYTES: int = 256 * 1024  # larger bodies are compressed off the event loop
+
     # --- File uploads ---
     UPLOAD_DIR: str = "uploads"
     PUBLIC_PREFIX: str = "/uploads"
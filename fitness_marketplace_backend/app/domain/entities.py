@@ -2,17 +2,17 @@ from dataclasses import dataclass
 from typing import Optional, List
 from datetime import datetime
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class User:
     user_id: str
     name: str
     email: str
     username: str
     password: str
-    status : str
-    role: str
+    status: Optional[str] = None  # users are created without one
+    role: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class Item:
     product_id: str
     product_name: str
@@ -24,6 +24,10 @@ class Item:
     photos: List[str] | None = None
     description: Optional[str] = None
     avg_rating: float = 0  
+    view_count: int = 0
+    rating_count: int = 0
+    rating_score: float = 0  # Bayesian average, what sort=rating orders by
+    updated_at: Optional[datetime] = None  # last change to what the listing shows, views aside
     
     # status
     
@@ -31,7 +35,7 @@ class Item:
     
     
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Purchase:
     purchase_id: str
     buyer_user_id: str
@@ -41,10 +45,38 @@ class Purchase:
     quantity: int
     total_price_cents: int
     purchase_date: datetime
-    status: str  # "pending", "completed", "cancelled"
+    status: str  # see PurchaseStatus
     photo: Optional[str] = None 
 
-@dataclass(frozen=True)
+
+class PurchaseStatus:
+    """
+    Order workflow: pending -> shipped -> delivered, and pending or shipped
+    -> cancelled. "completed" is what purchases were created with before the
+    workflow existed; it is terminal.
+    """
+    PENDING = "pending"
+    SHIPPED = "shipped"
+    DELIVERED = "delivered"
+    CANCELLED = "cancelled"
+    COMPLETED = "completed"  # legacy
+
+    ALL = (PENDING, SHIPPED, DELIVERED, CANCELLED, COMPLETED)
+    OPEN = (PENDING, SHIPPED)
+
+    TRANSITIONS = {
+        PENDING: (SHIPPED, CANCELLED),
+        SHIPPED: (DELIVERED, CANCELLED),
+        DELIVERED: (),
+        CANCELLED: (),
+        COMPLETED: (),
+    }
+
+    @classmethod
+    def can_transition(cls, current: str, new: str) -> bool:
+        return new in cls.TRANSITIONS.get(current, ())
+
+@dataclass(frozen=True, slots=True)
 class Review:
     review_id: str
     purchase_id: str
@@ -55,8 +87,77 @@ class Review:
     comment: str
     created_at: datetime
     updated_at: Optional[datetime] = None
+    comment_truncated: bool = False  # list views may load only the start of the comment
+
+@dataclass(frozen=True, slots=True)
+class DailySales:
+    """Sales of one product by one seller on one (UTC) day"""
+    seller_user_id: str
+    day: datetime  # midnight UTC
+    product_id: str
+    product_name: str
+    units: int
+    revenue_cents: int
+    orders: int
+
+@dataclass(frozen=True, slots=True)
+class TrendingProduct:
+    """Recent popularity of a product over the trending window"""
+    product_id: str
+    views: int
+    purchases: int  # units sold
+    score: float
+
+@dataclass(frozen=True, slots=True)
+class RelatedItem:
+    """A product often bought together with another one (listing fields as of the last build)"""
+    product_id: str
+    product_name: str
+    category: str
+    price_cents: int
+    photo: Optional[str]
+    score: float  # co-purchases / sqrt(buyers of each product)
+    co_purchases: int
+
+@dataclass(frozen=True, slots=True)
+class SavedSearch:
+    """A buyer's standing query; new listings that match it raise an alert"""
+    search_id: str
+    user_id: str
+    query: Optional[str]  # every word must appear in the listing's name or description
+    category: Optional[str]
+    min_price_cents: Optional[int]
+    max_price_cents: Optional[int]
+    created_at: datetime
+
+@dataclass(frozen=True, slots=True)
+class SearchAlert:
+    """A new listing that matched a saved search"""
+    alert_id: str  # "<search_id>:<product_id>", so a listing alerts a search once
+    search_id: str
+    user_id: str
+    product_id: str
+    product_name: str
+    category: str
+    price_cents: int
+    created_at: datetime
+    read: bool = False
+
+@dataclass(frozen=True, slots=True)
+class CollectionVersion:
+    """Change counter of a collection, bumped by every write that list responses show"""
+    name: str
+    version: int
+    updated_at: Optional[datetime]
+
+@dataclass(frozen=True, slots=True)
+class Suggestion:
+    """An autocomplete suggestion: a product name or a category"""
+    text: str
+    kind: str  # "product" | "category"
+    weight: float  # popularity: listings plus their views
 
-@dataclass
+@dataclass(slots=True)
 class CartItem:
     user_id: str
     product_id: str
@@ -0,0 +1,108 @@
+# app/domain/events.py
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+import uuid
+
+from .entities import Item, Purchase, Review
+
+# Event types
+ITEM_CREATED = "item.created"
+PURCHASE_CREATED = "purchase.created"
+PURCHASE_STATUS_CHANGED = "purchase.status_changed"
+REVIEW_CREATED = "review.created"
+REVIEW_UPDATED = "review.updated"
+REVIEW_DELETED = "review.deleted"
+
+
+@dataclass(frozen=True)
+class OutboxEvent:
+    """A side effect to run after a write, stored in the same transaction as the write."""
+    event_type: str
+    aggregate_type: str  # e.g. "purchase", "review"
+    aggregate_id: str    # events of one aggregate are dispatched in order
+    payload: dict
+    event_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+def item_created(item: Item) -> OutboxEvent:
+    return OutboxEvent(
+        event_type=ITEM_CREATED,
+        aggregate_type="item",
+        aggregate_id=item.product_id,
+        payload={
+            "product_id": item.product_id,
+            "product_name": item.product_name,
+            "category": item.category,
+            "price_cents": item.price_cents,
+            "description": item.description,
+            "owner_user_id": item.owner_user_id,
+            "is_seller": item.is_seller,
+        },
+    )
+
+
+def _purchase_payload(purchase: Purchase) -> dict:
+    return {
+        "purchase_id": purchase.purchase_id,
+        "buyer_user_id": purchase.buyer_user_id,
+        "seller_user_id": purchase.seller_user_id,
+        "product_id": purchase.product_id,
+        "product_name": purchase.product_name,
+        "quantity": purchase.quantity,
+        "total_price_cents": purchase.total_price_cents,
+        "purchase_date": purchase.purchase_date,
+        "status": purchase.status,
+        "photo": purchase.photo,
+    }
+
+
+def purchase_created(purchase: Purchase) -> OutboxEvent:
+    return OutboxEvent(
+        event_type=PURCHASE_CREATED,
+        aggregate_type="purchase",
+        aggregate_id=purchase.purchase_id,
+        payload=_purchase_payload(purchase),
+    )
+
+
+def purchase_status_changed(purchase: Purchase, new_status: str) -> OutboxEvent:
+    # `purchase` is the order before the change
+    return OutboxEvent(
+        event_type=PURCHASE_STATUS_CHANGED,
+        aggregate_type="purchase",
+        aggregate_id=purchase.purchase_id,
+        payload={**_purchase_payload(purchase), "status": new_status,
+                 "previous_status": purchase.status},
+    )
+
+
+def _review_event(event_type: str, review: Review, rating: Optional[int],
+                  previous_rating: Optional[int]) -> OutboxEvent:
+    # rating is None after a delete, previous_rating is None on create
+    return OutboxEvent(
+        event_type=event_type,
+        aggregate_type="review",
+        aggregate_id=review.review_id,
+        payload={
+            "review_id": review.review_id,
+            "product_id": review.product_id,
+            "reviewed_user_id": review.reviewed_user_id,
+            "reviewer_user_id": review.reviewer_user_id,
+            "rating": rating,
+            "previous_rating": previous_rating,
+        },
+    )
+
+
+def review_created(review: Review) -> OutboxEvent:
+    return _review_event(REVIEW_CREATED, review, rating=review.rating, previous_rating=None)
+
+
+def review_updated(review: Review, new_rating: int) -> OutboxEvent:
+    return _review_event(REVIEW_UPDATED, review, rating=new_rating, previous_rating=review.rating)
+
+
+def review_deleted(review: Review) -> OutboxEvent:
+    return _review_event(REVIEW_DELETED, review, rating=None, previous_rating=review.rating)
@@ -1,7 +1,9 @@
 # domain/repositories.py (interfaces)
 from abc import ABC, abstractmethod
-from typing import Iterable, Optional, List
-from .entities import User, Item, Purchase, Review
+from typing import Iterable, Optional, List, Dict, Sequence, Tuple
+from datetime import datetime
+from .entities import User, Item, Purchase, Review, DailySales, TrendingProduct, RelatedItem, SavedSearch, SearchAlert, CollectionVersion
+from .events import OutboxEvent
 
 class UserRepo(ABC): # Not used anywhere!
     @abstractmethod
@@ -11,22 +13,69 @@ class UserRepo(ABC): # Not used anywhere!
 
 class ItemRepo(ABC):
     @abstractmethod
-    async def create(self, item: Item) -> Item: ...
+    async def create(self, item: Item, events: Sequence[OutboxEvent] = ()) -> Item:
+        """Insert a listing; `events` are stored in the outbox in the same transaction"""
+        ...
 
     @abstractmethod
     async def list(
-        self, *, is_seller: Optional[bool] = None, category: Optional[str] = None
-    ) -> Iterable[Item]: ...
+        self,
+        *,
+        is_seller: Optional[bool] = None,
+        category: Optional[str] = None,
+        sort: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterable[Item]:
+        """
+        `sort`: "rating" (best score first), "price" (cheapest first), "newest" or None.
+        With `fields` (Item attributes) only those are loaded; the others keep their defaults.
+        """
+        ...
 
     @abstractmethod
     async def list_by_owner(self, owner_user_id: str) -> Iterable[Item]: ...
 
+    @abstractmethod
+    async def list_newest(self, limit: int) -> List[Item]:
+        """Listings for sale, most recently created first"""
+        ...
+
     @abstractmethod
     async def update_quantity(self, product_id: str, new_qty: int) -> bool:
         pass
 
     @abstractmethod
-    async def get_by_id(self, product_id: str) -> Optional[Item]:
+    async def adjust_quantity(self, product_id: str, delta: int) -> bool:
+        """Atomically add `delta` to the item's quantity"""
+        pass
+
+    @abstractmethod
+    async def get_by_id(
+        self, product_id: str, fields: Optional[Sequence[str]] = None
+    ) -> Optional[Item]:
+        """With `fields` (Item attributes) only those are loaded, as in list()"""
+        pass
+
+    @abstractmethod
+    async def get_many(self, product_ids: List[str]) -> Dict[str, Item]:
+        """Fetch several items in one query, keyed by product id"""
+        pass
+
+    @abstractmethod
+    async def add_views(self, counts: Dict[str, int]) -> None:
+        """Add {product_id: views} to the items' view counts in one write"""
+        pass
+
+    @abstractmethod
+    async def rebuild_ratings(self, product_ids: Optional[Sequence[str]] = None) -> int:
+        """Recompute rating counters and scores from the reviews (all items, or these); returns items written"""
+        pass
+
+    @abstractmethod
+    async def get_owner_summary(self, owner_user_id: str, low_stock_threshold: int = 2) -> dict:
+        """Listing counts, stock and low-stock items for an owner in one query"""
         pass
 
 class UserRepository(ABC):
@@ -68,9 +117,22 @@ class UserRepository(ABC):
     async def update_status(self, user_id:str,new_status: str) -> bool:
         pass
 
+    @abstractmethod
+    async def get_names(self, user_ids: Sequence[str]) -> Dict[str, str]:
+        """Display names of many users in one query; unknown ids are left out"""
+        pass
+
 class PurchaseRepository(ABC):
     @abstractmethod
-    async def create(self, purchase: Purchase) -> Purchase:
+    async def create(self, purchase: Purchase, events: Sequence[OutboxEvent] = ()) -> Purchase:
+        """Insert a purchase; `events` are stored in the outbox in the same transaction"""
+        pass
+
+    @abstractmethod
+    async def create_many(
+        self, purchases: List[Purchase], events: Sequence[OutboxEvent] = ()
+    ) -> List[Purchase]:
+        """Insert a batch, skipping purchases already stored; returns those that failed"""
         pass
     
     @abstractmethod
@@ -78,22 +140,57 @@ class PurchaseRepository(ABC):
         pass
     
     @abstractmethod
-    async def list_by_buyer(self, buyer_user_id: str) -> List[Purchase]:
+    async def list_by_buyer(
+        self,
+        buyer_user_id: str,
+        statuses: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Purchase]:
+        """Newest first; optionally only the given statuses, one page at a time.
+        With `fields` (Purchase attributes) only those are loaded, the others are None."""
         pass
     
     @abstractmethod
-    async def list_by_seller(self, seller_user_id: str) -> List[Purchase]:
+    async def list_by_seller(
+        self,
+        seller_user_id: str,
+        statuses: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Purchase]:
+        """Newest first; optionally only the given statuses, one page at a time.
+        With `fields` (Purchase attributes) only those are loaded, the others are None."""
         pass
     
     @abstractmethod
-    async def update_status(self, purchase_id: str, status: str) -> bool:
+    async def update_status(
+        self,
+        purchase_id: str,
+        status: str,
+        expected_status: Optional[str] = None,
+        events: Sequence[OutboxEvent] = (),
+        restock: bool = False
+    ) -> bool:
+        """
+        Set the status, only if it is still `expected_status` when given.
+        With `restock`, the purchased quantity goes back to the product's
+        stock in the same write, so it happens exactly when the status changes.
+        """
+        pass
+
+    @abstractmethod
+    async def get_seller_sales_summary(self, seller_user_id: str, recent_limit: int = 10) -> dict:
+        """Sales totals and the most recent sales for a seller in one query"""
         pass
 
 
 class ReviewRepository(ABC):
     
     @abstractmethod
-    async def create(self, review: Review) -> Review:
+    async def create(self, review: Review, events: Sequence[OutboxEvent] = ()) -> Review:
         """Create a new review"""
         pass
     
@@ -123,12 +220,43 @@ class ReviewRepository(ABC):
         pass
     
     @abstractmethod
-    async def update(self, review_id: str, rating: int, comment: str) -> bool:
+    async def page_by_product(
+        self, product_id: str, limit: int, cursor: Optional[str] = None,
+        comment_chars: Optional[int] = None, fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Review], Optional[str]]:
+        """
+        One page of a product's reviews, newest first, and the cursor of the
+        next page (None on the last one). With `comment_chars`, comments are
+        cut to that many characters. With `fields` (Review attributes) only
+        those are loaded, the others are None.
+        """
+        pass
+
+    @abstractmethod
+    async def page_by_seller(
+        self, seller_user_id: str, limit: int, cursor: Optional[str] = None,
+        comment_chars: Optional[int] = None, fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Review], Optional[str]]:
+        """Like page_by_product, for the reviews a seller received"""
+        pass
+
+    @abstractmethod
+    async def page_by_reviewer(
+        self, reviewer_user_id: str, limit: int, cursor: Optional[str] = None,
+        comment_chars: Optional[int] = None, fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Review], Optional[str]]:
+        """Like page_by_product, for the reviews a user wrote"""
+        pass
+
+    @abstractmethod
+    async def update(
+        self, review_id: str, rating: int, comment: str, events: Sequence[OutboxEvent] = ()
+    ) -> bool:
         """Update an existing review"""
         pass
     
     @abstractmethod
-    async def delete(self, review_id: str) -> bool:
+    async def delete(self, review_id: str, events: Sequence[OutboxEvent] = ()) -> bool:
         """Delete a review"""
         pass
     
@@ -137,8 +265,143 @@ class ReviewRepository(ABC):
         """Get average rating for a seller"""
         pass
     
+    @abstractmethod
+    async def get_product_rating_stats(self, product_ids: Sequence[str]) -> Dict[str, dict]:
+        """Average, count and star distribution per product, for many products in one query"""
+        pass
+
     @abstractmethod
     async def get_seller_rating_stats(self, seller_user_id: str) -> dict:
         """Get detailed rating statistics for a seller"""
         pass
 
+    @abstractmethod
+    async def get_seller_review_summary(self, seller_user_id: str, recent_limit: int = 5) -> dict:
+        """Rating statistics and the most recent reviews for a seller in one query"""
+        pass
+
+
+class SalesRollupRepository(ABC):
+
+    @abstractmethod
+    async def record_sale(self, purchase: Purchase) -> None:
+        """Add a purchase to its (seller, day, product) rollup"""
+        pass
+
+    @abstractmethod
+    async def record_sales(self, purchases: List[Purchase]) -> None:
+        """Add a batch of purchases to their rollups in one write"""
+        pass
+
+    @abstractmethod
+    async def remove_sales(self, purchases: List[Purchase]) -> None:
+        """Take cancelled purchases back out of their rollups"""
+        pass
+
+    @abstractmethod
+    async def list_daily(
+        self, seller_user_id: str, start: datetime, end: datetime
+    ) -> List[DailySales]:
+        """Get rollups for a seller with start <= day < end"""
+        pass
+
+    @abstractmethod
+    async def rebuild(self, seller_user_id: Optional[str] = None) -> int:
+        """Recompute rollups from purchases; returns the number of rollup rows"""
+        pass
+
+    @abstractmethod
+    async def top_products(self, since: datetime, limit: int) -> List[tuple]:
+        """(product_id, units) of the best sellers across all sellers since `since`"""
+        pass
+
+
+class TrendingRepository(ABC):
+
+    @abstractmethod
+    async def add_counts(self, counts: Dict[tuple, tuple]) -> None:
+        """Add {(product_id, hour): (views, purchases)} to the hourly counters in one write"""
+        pass
+
+    @abstractmethod
+    async def top(self, since: datetime, purchase_weight: float, limit: int) -> List[TrendingProduct]:
+        """Highest scoring products over the hours starting at or after `since`"""
+        pass
+
+
+class RelatedItemsRepository(ABC):
+
+    @abstractmethod
+    async def get_related(self, product_id: str, limit: int) -> List[RelatedItem]:
+        """Precomputed neighbours of a product, best first"""
+        pass
+
+    @abstractmethod
+    async def save_related(self, related: Dict[str, List[RelatedItem]]) -> None:
+        """Replace the neighbour lists of the given products"""
+        pass
+
+    @abstractmethod
+    async def oldest_update(self) -> Optional[datetime]:
+        """When the least recently saved neighbour list was saved; a full rebuild resaves all"""
+        pass
+
+    @abstractmethod
+    async def delete_older(self, than: datetime) -> int:
+        """Drop neighbour lists last saved before `than`; returns how many"""
+        pass
+
+
+class SavedSearchRepository(ABC):
+
+    @abstractmethod
+    async def create(self, search: SavedSearch) -> SavedSearch:
+        pass
+
+    @abstractmethod
+    async def count_by_user(self, user_id: str) -> int:
+        pass
+
+    @abstractmethod
+    async def list_by_user(self, user_id: str) -> List[SavedSearch]:
+        pass
+
+    @abstractmethod
+    async def delete(self, search_id: str, user_id: str) -> bool:
+        """Delete one of the user's searches; False if they have no such search"""
+        pass
+
+    @abstractmethod
+    async def changes_since(
+        self, since: Optional[datetime]
+    ) -> tuple[List[SavedSearch], List[str]]:
+        """Searches created and ids of searches deleted since `since` (everything live if None)"""
+        pass
+
+    @abstractmethod
+    async def add_alerts(self, alerts: List[SearchAlert]) -> None:
+        """Store alerts; an alert that already exists is left as it is"""
+        pass
+
+    @abstractmethod
+    async def list_alerts(
+        self, user_id: str, unread_only: bool = False, limit: int = 50
+    ) -> List[SearchAlert]:
+        """Newest first"""
+        pass
+
+    @abstractmethod
+    async def mark_alerts_read(self, user_id: str, alert_ids: List[str]) -> int:
+        pass
+
+
+class CollectionVersionRepo(ABC):
+    @abstractmethod
+    async def bump(self, name: str) -> None:
+        """Count a write to collection `name`; call it once the write has committed"""
+        pass
+
+    @abstractmethod
+    async def get(self, name: str) -> CollectionVersion:
+        """Version 0 for a collection never bumped"""
+        pass
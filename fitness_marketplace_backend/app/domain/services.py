@@ -1,6 +1,9 @@
 # app/domain/services.py
 from __future__ import annotations
-from typing import Protocol, Sequence, runtime_checkable
+from typing import TYPE_CHECKING, Protocol, Sequence, runtime_checkable
+
+if TYPE_CHECKING:
+    from .entities import Item
 
 
 @runtime_checkable
@@ -60,3 +63,18 @@ class ItemRepository(Protocol):
             List of item dicts.
         """
         ...
+
+
+@runtime_checkable
+class ItemIndexer(Protocol):
+    """
+    An in-process index over listings (e.g. similar items) that wants to
+    see new listings as soon as they are created.
+    """
+
+    def add(self, item: "Item") -> None:
+        """
+        Index a listing that was just created (or replace it if present).
+        Must be cheap: it runs on the request that created the listing.
+        """
+        ...
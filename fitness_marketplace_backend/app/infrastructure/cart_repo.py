@@ -1,43 +1,206 @@
 from app.domain.entities import CartItem
-from typing import List
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+from pymongo import ReturnDocument
 from pymongo.collection import Collection
+from app.config import settings
+from app.infrastructure.cache import TTLCache
 from app.infrastructure.database import get_database
+from app.infrastructure.mapping import DocMapper
+
+# A line of the cart document's "items"; the user id is the cart's
+CART_LINES = DocMapper(
+    CartItem,
+    user_id=None,
+    product_id="product_id",
+    product_name="product_name",
+    price_cents="price_cents",
+    quantity="quantity",
+    seller_user_id="seller_user_id",
+    photo="photo",
+)
+
+# Per-user write-through cache shared by every MongoCartRepo in this process:
+# user_id -> (the cart's last_touched, its lines). An entry only exists once
+# the user's cart has been read through get_cart, so a cached cart never
+# hides legacy one-line-per-document rows. Other workers write carts too, so
+# a hit is used only while the stored last_touched still matches.
+_cart_cache = TTLCache(
+    maxsize=settings.CART_CACHE_MAX_USERS,
+    ttl_seconds=settings.CART_CACHE_TTL_SECONDS,
+)
+
+
+@dataclass
+class CartCompactionReport:
+    users_compacted: int
+    lines_merged: int
+    documents_before: int
+    documents_after: int
+    size_bytes_before: int
+    size_bytes_after: int
+
+    @property
+    def bytes_reclaimed(self) -> int:
+        return self.size_bytes_before - self.size_bytes_after
+
+
+def _touched(doc: Optional[dict]) -> Optional[datetime]:
+    """The cart's version: every write sets last_touched, a cleared cart has none"""
+    return doc.get("last_touched") if doc else None
+
+
+def _line_key(product_id: str) -> str:
+    """Escape a product id so it is safe to use as a field name under `items`."""
+    return product_id.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
 
 class MongoCartRepo:
+    """
+    One document per user: {_id: user_id, user_id, last_touched, items: {<product>: line}}.
+
+    Every mutation is a single find_one_and_update/delete, so concurrent adds
+    cannot lose increments and the returned document refreshes the cache
+    without a second round trip.
+    """
+
     def __init__(self, db=None):
         if db is None:
             db = get_database()
-        self.collection: Collection = db["cart"]
+        self.collection: Collection = db[settings.MONGO_CART_COLLECTION]
 
-    async def add_item(self, item: CartItem):
-        existing = await self.collection.find_one({
-            "user_id": item.user_id,
-            "product_id": item.product_id
-        })
+    async def ensure_indexes(self):
+        # clear_cart and the legacy-line lookup in get_cart filter on user_id
+        await self.collection.create_index("user_id")
+        # Abandoned carts are removed by MongoDB's TTL monitor
+        await self.collection.create_index(
+            "last_touched", expireAfterSeconds=settings.CART_TTL_SECONDS
+        )
 
-        if existing:
-            new_qty = existing["quantity"] + item.quantity
-            await self.collection.update_one(
-                {"_id": existing["_id"]},
-                {"$set": {"quantity": new_qty}}
-            )
-            return
+    def _doc_to_items(self, doc: Optional[dict]) -> List[CartItem]:
+        if not doc:
+            return []
+        user_id = doc["user_id"]
+        return [CART_LINES.from_doc(line, user_id) for line in (doc.get("items") or {}).values()]
 
-        await self.collection.insert_one(item.__dict__)
+    def _cache_result(self, user_id: str, doc: Optional[dict]):
+        # Only refresh users whose cart has already been loaded; otherwise the
+        # next get_cart does the full read (and folds any legacy lines).
+        if user_id in _cart_cache:
+            _cart_cache.set(user_id, (_touched(doc), tuple(self._doc_to_items(doc))))
+
+    async def add_item(self, item: CartItem):
+        key = f"items.{_line_key(item.product_id)}"
+        doc = await self.collection.find_one_and_update(
+            {"_id": item.user_id},
+            {
+                "$inc": {f"{key}.quantity": item.quantity},
+                "$set": {
+                    "user_id": item.user_id,
+                    "last_touched": datetime.utcnow(),
+                    f"{key}.product_id": item.product_id,
+                    f"{key}.product_name": item.product_name,
+                    f"{key}.price_cents": item.price_cents,
+                    f"{key}.seller_user_id": item.seller_user_id,
+                    f"{key}.photo": item.photo,
+                },
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._cache_result(item.user_id, doc)
 
     async def get_cart(self, user_id: str) -> list[CartItem]:
-        cursor = self.collection.find({"user_id": user_id})
-        docs = await cursor.to_list(100)
+        cached = _cart_cache.get(user_id)
+        if cached is not None:
+            # An _id lookup returning one date, instead of the whole cart
+            stamp = await self.collection.find_one({"_id": user_id}, {"_id": 0, "last_touched": 1})
+            touched, items = cached
+            if _touched(stamp) == touched:
+                return list(items)
 
-        items = []
-        for d in docs:
-            d.pop("_id", None)   # remove Mongo _id
-            items.append(CartItem(**d))
+        # Matches the cart document and any rows left over from the old
+        # one-document-per-line layout in a single query.
+        docs = await self.collection.find({"user_id": user_id}).to_list(length=None)
+        cart = next((d for d in docs if d["_id"] == user_id), None)
+        legacy = [d for d in docs if d["_id"] != user_id]
+        if legacy:
+            cart = await self._fold_legacy_lines(user_id, legacy) or cart
 
+        items = self._doc_to_items(cart)
+        _cart_cache.set(user_id, (_touched(cart), tuple(items)))
         return items
 
+    async def _fold_legacy_lines(self, user_id: str, legacy: List[dict]) -> Optional[dict]:
+        """Move old per-line documents into the user's cart document (runs once per user)."""
+        inc, fields = {}, {"user_id": user_id, "last_touched": datetime.utcnow()}
+        for d in legacy:
+            # find_one_and_delete makes sure a line is only folded by one worker
+            line = await self.collection.find_one_and_delete({"_id": d["_id"]})
+            if not line:
+                continue
+            key = f"items.{_line_key(line['product_id'])}"
+            inc[f"{key}.quantity"] = inc.get(f"{key}.quantity", 0) + line["quantity"]
+            fields[f"{key}.product_id"] = line["product_id"]
+            fields[f"{key}.product_name"] = line["product_name"]
+            fields[f"{key}.price_cents"] = line["price_cents"]
+            fields[f"{key}.seller_user_id"] = line["seller_user_id"]
+            fields[f"{key}.photo"] = line.get("photo")
+
+        if not inc:
+            return None
+        return await self.collection.find_one_and_update(
+            {"_id": user_id},
+            {"$inc": inc, "$set": fields},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+
     async def remove_item(self, user_id: str, product_id: str):
-        await self.collection.delete_one({"user_id": user_id, "product_id": product_id})
+        doc = await self.collection.find_one_and_update(
+            {"_id": user_id},
+            {
+                "$unset": {f"items.{_line_key(product_id)}": ""},
+                "$set": {"last_touched": datetime.utcnow()},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        self._cache_result(user_id, doc)
 
     async def clear_cart(self, user_id: str):
+        # user_id also matches legacy per-line documents
         await self.collection.delete_many({"user_id": user_id})
+        _cart_cache.set(user_id, (None, ()))
+
+    async def compact(self) -> CartCompactionReport:
+        """
+        Fold every leftover per-line document (including duplicate
+        (user_id, product_id) lines) into its owner's cart document.
+        """
+        before = await self._collection_stats()
+
+        pipeline = [
+            {"$match": {"product_id": {"$exists": True}}},
+            {"$group": {"_id": "$user_id", "lines": {"$push": {"_id": "$_id"}}}},
+        ]
+        users, lines = 0, 0
+        async for group in self.collection.aggregate(pipeline, allowDiskUse=True):
+            user_id = group["_id"]
+            if await self._fold_legacy_lines(user_id, group["lines"]):
+                users += 1
+                lines += len(group["lines"])
+                _cart_cache.pop(user_id)
+
+        after = await self._collection_stats()
+        return CartCompactionReport(
+            users_compacted=users,
+            lines_merged=lines,
+            documents_before=before.get("count", 0),
+            documents_after=after.get("count", 0),
+            size_bytes_before=before.get("size", 0),
+            size_bytes_after=after.get("size", 0),
+        )
+
+    async def _collection_stats(self) -> dict:
+        return await self.collection.database.command("collStats", self.collection.name)
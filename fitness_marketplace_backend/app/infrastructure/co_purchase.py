@@ -0,0 +1,193 @@
+# app/infrastructure/co_purchase.py
+import asyncio
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.config import settings
+from app.domain.entities import PurchaseStatus, RelatedItem
+from app.infrastructure.item_repo import MongoItemRepo
+from app.infrastructure.related_items_repo import MongoRelatedItemsRepo
+
+# (neighbour product id, score, co-purchases)
+Neighbour = Tuple[str, float, int]
+
+IN_BATCH = 1000  # values per $in, so a popular product's buyers do not make one huge query
+
+
+def co_purchase_neighbours(
+    baskets: List[List[str]],
+    top_n: int,
+    products: Optional[Iterable[str]] = None,
+) -> Dict[str, List[Neighbour]]:
+    """
+    Top-N co-purchased products per product.
+
+    `baskets` are lists of distinct product ids bought together. They become
+    a sparse basket x product matrix B; B.T @ B counts, for every pair of
+    products, the baskets containing both. Scores are those counts
+    normalised by sqrt(baskets with a) * sqrt(baskets with b), so
+    bestsellers do not top every list. With `products`, only those rows are
+    computed.
+    """
+    index: Dict[str, int] = {}
+    indices: List[int] = []
+    indptr = [0]
+    for basket in baskets:
+        for pid in basket:
+            indices.append(index.setdefault(pid, len(index)))
+        indptr.append(len(indices))
+    if not index:
+        return {}
+
+    ids = np.array(list(index), dtype=object)
+    b = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), np.array(indices), np.array(indptr)),
+        shape=(len(baskets), len(index)),
+    )
+    b.sum_duplicates()
+    b.data[:] = 1  # a product counts once per basket
+    basket_counts = np.asarray(b.sum(axis=0)).ravel()
+
+    if products is None:
+        rows = np.arange(len(index))
+    else:
+        rows = np.array([index[p] for p in products if p in index], dtype=np.int64)
+        if not len(rows):
+            return {}
+    co = (b[:, rows].T.tocsr() @ b).tocsr()
+
+    # Score every stored pair at once; drop each product's pair with itself
+    row_of = np.repeat(rows, np.diff(co.indptr))
+    scores = co.data / np.sqrt(basket_counts[row_of] * basket_counts[co.indices])
+    scores[co.indices == row_of] = -1.0
+
+    result: Dict[str, List[Neighbour]] = {}
+    for r, product in enumerate(rows):
+        start, end = co.indptr[r], co.indptr[r + 1]
+        row_scores = scores[start:end]
+        keep = top_n + 1  # the product itself may be among the candidates
+        if end - start > keep:
+            top = np.argpartition(-row_scores, keep)[:keep]
+        else:
+            top = np.arange(end - start)
+        top = top[np.lexsort((-co.data[start:end][top], -row_scores[top]))]
+        result[ids[product]] = [
+            (ids[co.indices[start + t]], round(float(row_scores[t]), 4), int(co.data[start + t]))
+            for t in top
+            if row_scores[t] > 0
+        ][:top_n]
+    return result
+
+
+class CoPurchaseIndexer:
+    """
+    Maintains the `related_items` collection ("frequently bought together").
+
+    A basket is everything one buyer bought within a CO_PURCHASE_WINDOW_DAYS
+    window, cancelled orders excluded. `rebuild` recomputes every product;
+    `update` recomputes only the products whose neighbours can have changed
+    because of purchases since `since`. Each neighbour list is rebuilt from
+    scratch, so running an update twice is harmless. Both are meant to run
+    on one worker at a time (see the leases in main.py).
+
+    A rebuild resaves every list and deletes the rest, so the oldest list
+    tells when the last one ran (`rebuild_due`).
+    """
+
+    def __init__(self, db, top_n: int = settings.RELATED_ITEMS_TOP_N):
+        self.purchases = db[settings.MONGO_PURCHASES_COLLECTION]
+        self.items = MongoItemRepo(db)
+        self.related = MongoRelatedItemsRepo(db)
+        self.top_n = top_n
+
+    async def _baskets(self, match: dict) -> List[List[str]]:
+        pipeline = [
+            {"$match": {**match, "status": {"$ne": PurchaseStatus.CANCELLED}}},
+            {
+                "$group": {
+                    "_id": {
+                        "buyer": "$buyer_user_id",
+                        "window": {
+                            "$dateTrunc": {
+                                "date": "$purchase_date",
+                                "unit": "day",
+                                "binSize": settings.CO_PURCHASE_WINDOW_DAYS,
+                            }
+                        },
+                    },
+                    "products": {"$addToSet": "$product_id"},
+                }
+            },
+            {"$match": {"products.1": {"$exists": True}}},  # a single product has no pairs
+            {"$project": {"_id": 0, "products": 1}},
+        ]
+        docs = await self.purchases.aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+        return [d["products"] for d in docs]
+
+    async def _distinct_in(self, field: str, key: str, values: List[str]) -> List[str]:
+        found = set()
+        for start in range(0, len(values), IN_BATCH):
+            found.update(await self.purchases.distinct(
+                field, {key: {"$in": values[start:start + IN_BATCH]}}
+            ))
+        return list(found)
+
+    async def _save(self, neighbours: Dict[str, List[Neighbour]]):
+        ids = list({n[0] for ns in neighbours.values() for n in ns})
+        items = {}
+        for start in range(0, len(ids), IN_BATCH):
+            items.update(await self.items.get_many(ids[start:start + IN_BATCH]))
+        related = {}
+        for product_id, ns in neighbours.items():
+            rows = []
+            for pid, score, count in ns:
+                item = items.get(pid)
+                if item is None or not item.is_seller:
+                    continue  # deleted or no longer for sale
+                rows.append(RelatedItem(
+                    product_id=pid,
+                    product_name=item.product_name,
+                    category=item.category,
+                    price_cents=item.price_cents,
+                    photo=item.photos[0] if item.photos else None,
+                    score=score,
+                    co_purchases=count,
+                ))
+            related[product_id] = rows
+        await self.related.save_related(related)
+
+    async def rebuild_due(self, every_seconds: float) -> bool:
+        oldest = await self.related.oldest_update()
+        return oldest is None or (datetime.utcnow() - oldest).total_seconds() >= every_seconds
+
+    async def rebuild(self) -> int:
+        started = datetime.utcnow()
+        baskets = await self._baskets({})
+        neighbours = await asyncio.to_thread(co_purchase_neighbours, baskets, self.top_n)
+        await self._save(neighbours)
+        # Lists this rebuild did not write (and no update since it began) are stale
+        await self.related.delete_older(started)
+        return len(neighbours)
+
+    async def update(self, since: datetime) -> int:
+        buyers = await self.purchases.distinct("buyer_user_id", {"purchase_date": {"$gte": since}})
+        if not buyers:
+            return 0
+        # Products in the recent buyers' baskets get new pairs...
+        affected = await self._distinct_in("product_id", "buyer_user_id", buyers)
+        # ...and their lists depend on every basket that contains one of them
+        co_buyers = await self._distinct_in("buyer_user_id", "product_id", affected)
+        # A basket is one buyer's, so batches of buyers split no basket
+        baskets = []
+        for start in range(0, len(co_buyers), IN_BATCH):
+            baskets += await self._baskets(
+                {"buyer_user_id": {"$in": co_buyers[start:start + IN_BATCH]}}
+            )
+        neighbours = await asyncio.to_thread(
+            co_purchase_neighbours, baskets, self.top_n, affected
+        )
+        await self._save(neighbours)
+        return len(neighbours)
@@ -0,0 +1,35 @@
+# app/infrastructure/collection_versions.py
+from datetime import datetime
+
+from app.config import settings
+from app.domain.entities import CollectionVersion
+from app.domain.repositories import CollectionVersionRepo
+
+
+class MongoCollectionVersions(CollectionVersionRepo):
+    """
+    One counter document per collection, the validator of its list
+    responses: a list is unchanged while its collection's version is.
+
+    Repos bump after their write has committed, never inside it, so a
+    transaction does not hold the shared counter document. Readers take
+    the version before loading, so a response is never tagged with a
+    version newer than its data. A crash between write and bump leaves
+    lists revalidating as unchanged until the collection's next write.
+    """
+
+    def __init__(self, db):
+        self.collection = db[settings.MONGO_COLLECTION_VERSIONS_COLLECTION]
+
+    async def bump(self, name: str) -> None:
+        await self.collection.update_one(
+            {"_id": name},
+            {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    async def get(self, name: str) -> CollectionVersion:
+        doc = await self.collection.find_one({"_id": name})
+        if not doc:
+            return CollectionVersion(name=name, version=0, updated_at=None)
+        return CollectionVersion(name=name, version=doc["version"], updated_at=doc["updated_at"])
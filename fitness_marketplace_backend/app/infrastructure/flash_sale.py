@@ -0,0 +1,256 @@
+# app/infrastructure/flash_sale.py
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from pymongo import ReturnDocument
+
+from app.config import settings
+from app.domain.entities import Item, Purchase
+from app.domain.events import OutboxEvent, purchase_created
+from app.infrastructure.collection_versions import MongoCollectionVersions
+from app.infrastructure.database import get_database
+from app.infrastructure.item_repo import MongoItemRepo
+from app.infrastructure.purchase_repo import MongoPurchaseRepo
+
+logger = logging.getLogger(__name__)
+
+
+class TokenPool:
+    """
+    Stock for one product that this worker may sell without touching MongoDB.
+
+    Tokens are claimed from the item's `qty` in chunks; each claim is one
+    atomic update, so workers pre-allocate disjoint quotas and the item
+    document is written once per chunk instead of once per purchase.
+    Admission itself is a plain integer decrement.
+    """
+
+    def __init__(self, claim: Callable[[int], Awaitable[int]], chunk_size: int):
+        self._claim = claim
+        self.chunk_size = chunk_size
+        self.available = 0
+        self.claimed = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.exhausted = False
+        self._lock = asyncio.Lock()
+
+    def try_acquire(self, quantity: int) -> bool:
+        if self.available >= quantity:
+            self.available -= quantity
+            self.admitted += quantity
+            return True
+        return False
+
+    async def acquire(self, quantity: int) -> bool:
+        if self.try_acquire(quantity):
+            return True
+        if not self.exhausted:
+            async with self._lock:
+                # Another buyer may have refilled the pool while we waited
+                while self.available < quantity and not self.exhausted:
+                    got = await self._claim(max(self.chunk_size, quantity - self.available))
+                    if got == 0:
+                        self.exhausted = True
+                    self.available += got
+                    self.claimed += got
+            if self.try_acquire(quantity):
+                return True
+        self.rejected += 1
+        return False
+
+    def drain(self) -> int:
+        """Take back every unsold token (to be returned to the item's stock)."""
+        remaining, self.available = self.available, 0
+        self.exhausted = True
+        return remaining
+
+
+@dataclass
+class FlashSale:
+    item: Item  # snapshot used to price and validate purchases
+    pool: TokenPool
+
+
+@dataclass
+class FlashSaleStats:
+    product_id: str
+    available: int
+    claimed: int
+    admitted: int
+    rejected: int
+    exhausted: bool
+
+
+class FlashSaleRegistry:
+    """
+    Flash sales active in this worker plus the buffer of admitted purchases.
+
+    Which products are on flash sale is stored in the `flash_sales`
+    collection and picked up by every worker on `refresh`. Admitted
+    purchases are written with one insert_many per `flush`.
+
+    The buffer is in memory only: a purchase is answered 201 up to
+    FLASH_SALE_FLUSH_SECONDS before it is stored. A clean shutdown flushes
+    it; a worker that crashes loses what it held, along with its unsold
+    tokens (stock is then under-counted, never oversold).
+    """
+
+    def __init__(self):
+        self.sales: Dict[str, FlashSale] = {}
+        # Admitted purchases with their events, made once so a retried flush
+        # writes the same event ids
+        self.pending: List[Tuple[Purchase, OutboxEvent]] = []
+        self.written = 0
+        self._flush_lock = asyncio.Lock()
+        # The event loop keeps only weak references to tasks
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+    def get(self, product_id: str) -> Optional[FlashSale]:
+        return self.sales.get(product_id)
+
+    def enqueue(self, purchase: Purchase):
+        self.pending.append((purchase, purchase_created(purchase)))
+        if len(self.pending) >= settings.FLASH_SALE_BATCH_SIZE:
+            task = asyncio.get_running_loop().create_task(self._flush_in_background())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    def stats(self) -> List[FlashSaleStats]:
+        return [
+            FlashSaleStats(
+                product_id=pid,
+                available=s.pool.available,
+                claimed=s.pool.claimed,
+                admitted=s.pool.admitted,
+                rejected=s.pool.rejected,
+                exhausted=s.pool.exhausted,
+            )
+            for pid, s in self.sales.items()
+        ]
+
+    async def _flush_in_background(self):
+        try:
+            await self.flush(get_database())
+        except Exception:
+            logger.exception("Flash sale purchase flush failed")
+
+    async def flush(self, db):
+        async with self._flush_lock:
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, []
+            try:
+                failed = await MongoPurchaseRepo(db).create_many(
+                    [p for p, _ in batch], events=[e for _, e in batch]
+                )
+            except Exception:
+                # Keep the admitted purchases for the next flush; what was
+                # written already is skipped then
+                self.pending[:0] = batch
+                raise
+            if failed:
+                failed_ids = {p.purchase_id for p in failed}
+                self.pending[:0] = [(p, e) for p, e in batch if p.purchase_id in failed_ids]
+                logger.warning("Flash sale flush: %d purchases kept for the next flush", len(failed))
+            self.written += len(batch) - len(failed)
+
+    async def activate(self, db, product_id: str, chunk_size: int) -> bool:
+        item = await MongoItemRepo(db).get_by_id(product_id)
+        if not item:
+            return False
+
+        items = db[settings.MONGO_ITEMS_COLLECTION]
+        versions = MongoCollectionVersions(db)
+        sale = self.sales.get(product_id)
+        if sale:
+            sale.item = item
+            sale.pool.chunk_size = chunk_size
+            sale.pool.exhausted = False  # pick up any restock on the next claim
+            return True
+
+        async def claim(n: int) -> int:
+            # Atomically take min(qty, n) tokens; BEFORE tells us how many we got
+            before = await items.find_one_and_update(
+                {"productId": product_id, "qty": {"$gt": 0}},
+                [{"$set": {
+                    "qty": {"$max": [0, {"$subtract": ["$qty", n]}]},
+                    "updatedAt": datetime.utcnow(),
+                }}],
+                return_document=ReturnDocument.BEFORE,
+            )
+            if not before:
+                return 0
+            await versions.bump(items.name)
+            return min(before["qty"], n)
+
+        self.sales[product_id] = FlashSale(item=item, pool=TokenPool(claim, chunk_size))
+        return True
+
+    async def deactivate(self, db, product_id: str):
+        sale = self.sales.pop(product_id, None)
+        if sale is None:
+            return
+        remaining = sale.pool.drain()
+        if remaining:
+            await db[settings.MONGO_ITEMS_COLLECTION].update_one(
+                {"productId": product_id},
+                {"$inc": {"qty": remaining}, "$set": {"updatedAt": datetime.utcnow()}},
+            )
+            await MongoCollectionVersions(db).bump(settings.MONGO_ITEMS_COLLECTION)
+
+    async def refresh(self, db):
+        """
+        Sync the active sales with the flash_sales collection.
+
+        Only sales turned on or off elsewhere are activated or deactivated.
+        Running ones keep their pools; their item snapshots are reloaded in
+        one query, and an exhausted pool claims again once stock is back.
+        """
+        configs = await db[settings.MONGO_FLASH_SALES_COLLECTION].find(
+            {"enabled": True}
+        ).to_list(length=None)
+        wanted = {c["_id"]: c.get("chunk_size", settings.FLASH_SALE_CHUNK_SIZE) for c in configs}
+
+        for product_id in list(self.sales):
+            if product_id not in wanted:
+                await self.deactivate(db, product_id)
+        running = [product_id for product_id in wanted if product_id in self.sales]
+        items = await MongoItemRepo(db).get_many(running)
+        for product_id, chunk_size in wanted.items():
+            sale = self.sales.get(product_id)
+            if sale is None:
+                await self.activate(db, product_id, chunk_size)
+                continue
+            sale.pool.chunk_size = chunk_size
+            item = items.get(product_id)
+            if item is not None:
+                sale.item = item
+                if item.qty > 0:
+                    sale.pool.exhausted = False  # restocked
+
+    async def configure(self, db, product_id: str, enabled: bool, chunk_size: int) -> bool:
+        await db[settings.MONGO_FLASH_SALES_COLLECTION].update_one(
+            {"_id": product_id},
+            {"$set": {"enabled": enabled, "chunk_size": chunk_size, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+        if enabled:
+            return await self.activate(db, product_id, chunk_size)
+        await self.deactivate(db, product_id)
+        return True
+
+    async def shutdown(self, db):
+        """Write buffered purchases and hand unsold tokens back to stock."""
+        try:
+            await self.flush(db)
+        finally:
+            for product_id in list(self.sales):
+                await self.deactivate(db, product_id)
+
+
+# One registry per worker process
+flash_sales = FlashSaleRegistry()
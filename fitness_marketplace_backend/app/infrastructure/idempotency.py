@@ -0,0 +1,216 @@
+# app/infrastructure/idempotency.py
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from pymongo.errors import DuplicateKeyError
+
+from app.config import settings
+from app.infrastructure.cache import TTLCache
+
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+FAILED = "failed"  # the operation broke off after it may have written something
+
+# Completed responses, so a retry that lands on the same worker skips MongoDB
+_responses = TTLCache(
+    maxsize=settings.IDEMPOTENCY_CACHE_SIZE,
+    ttl_seconds=settings.IDEMPOTENCY_CACHE_TTL_SECONDS,
+)
+# Requests currently executing in this worker, with their fingerprints;
+# duplicates await these instead. A future resolves to the stored response,
+# or to None if the attempt failed.
+_in_flight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    status_code: int
+    body: Any  # JSON-compatible
+    fingerprint: str = ""
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a different request payload."""
+
+
+class IdempotencyInProgress(Exception):
+    """Another worker is still executing the request for this key."""
+
+
+class IdempotencyOutcomeUnknown(Exception):
+    """An earlier attempt with this key failed or died after it may have written."""
+
+
+class NotApplied(Exception):
+    """
+    Raised by an operation that failed before writing anything (e.g. a 4xx
+    from validation): the key is released so a retry can execute again.
+    The original error is the first argument.
+    """
+
+
+def fingerprint(payload: Any) -> str:
+    raw = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class MongoIdempotencyStore:
+    """
+    Stores the first response for each (scope, Idempotency-Key) and replays it.
+
+    A key is claimed by inserting an in-progress document (the _id makes the
+    claim atomic across workers); the response is written to the same
+    document once the operation finishes. Documents expire through a TTL
+    index. In-process, concurrent duplicates wait on the running request's
+    future instead of polling MongoDB.
+
+    An operation runs at most once per key. If it fails with NotApplied
+    the key is released; any other failure may come after a write, so the
+    key is marked failed and retries get IdempotencyOutcomeUnknown. The
+    claiming worker renews its claim while the operation runs, so a claim
+    only lapses when that worker is gone, and a lapsed claim is marked
+    failed too rather than executed a second time.
+    """
+
+    def __init__(self, db):
+        self.collection = db[settings.MONGO_IDEMPOTENCY_COLLECTION]
+
+    async def ensure_indexes(self):
+        await self.collection.create_index(
+            "created_at", expireAfterSeconds=settings.IDEMPOTENCY_TTL_SECONDS
+        )
+
+    async def run(
+        self,
+        key: str,
+        scope: str,
+        request_fingerprint: str,
+        operation: Callable[[], Awaitable[StoredResponse]],
+    ) -> Tuple[StoredResponse, bool]:
+        """Return (response, replayed)."""
+        doc_id = f"{scope}:{key}"
+        while True:
+            cached = _responses.get(doc_id)
+            if cached is not None:
+                return self._replay(cached, request_fingerprint), True
+
+            in_flight = _in_flight.get(doc_id)
+            if in_flight is None:
+                break
+            running_fingerprint, pending = in_flight
+            if running_fingerprint != request_fingerprint:
+                raise IdempotencyKeyReused()
+            record = await asyncio.shield(pending)
+            if record is None:
+                continue  # the first attempt failed and released the key; try ourselves
+            return self._replay(record, request_fingerprint), True
+
+        future = asyncio.get_running_loop().create_future()
+        _in_flight[doc_id] = (request_fingerprint, future)
+        try:
+            record = await self._claim_or_wait(doc_id, request_fingerprint)
+            replayed = record is not None
+            if record is None:
+                record = await self._execute(doc_id, request_fingerprint, operation)
+        except BaseException:
+            _in_flight.pop(doc_id, None)
+            future.set_result(None)
+            raise
+
+        _in_flight.pop(doc_id, None)
+        _responses.set(doc_id, record)
+        future.set_result(record)
+        return (self._replay(record, request_fingerprint) if replayed else record), replayed
+
+    async def _execute(
+        self,
+        doc_id: str,
+        request_fingerprint: str,
+        operation: Callable[[], Awaitable[StoredResponse]],
+    ) -> StoredResponse:
+        heartbeat = asyncio.create_task(self._renew_claim(doc_id))
+        try:
+            response = await operation()
+        except NotApplied:
+            # Nothing was written: release the key so a retry can execute again
+            await self.collection.delete_one({"_id": doc_id, "state": IN_PROGRESS})
+            raise
+        except BaseException as e:
+            # Possibly after a write: never run this key again
+            await self.collection.update_one(
+                {"_id": doc_id, "state": IN_PROGRESS},
+                {"$set": {"state": FAILED, "error": repr(e)}},
+            )
+            raise
+        finally:
+            heartbeat.cancel()
+
+        record = StoredResponse(response.status_code, response.body, request_fingerprint)
+        await self.collection.update_one(
+            {"_id": doc_id},
+            {"$set": {
+                "state": COMPLETED,
+                "status_code": record.status_code,
+                "body": record.body,
+            }},
+        )
+        return record
+
+    async def _renew_claim(self, doc_id: str):
+        while True:
+            await asyncio.sleep(settings.IDEMPOTENCY_LOCK_SECONDS / 3)
+            await self.collection.update_one(
+                {"_id": doc_id, "state": IN_PROGRESS},
+                {"$set": {"locked_until": datetime.utcnow() + timedelta(
+                    seconds=settings.IDEMPOTENCY_LOCK_SECONDS
+                )}},
+            )
+
+    async def _claim_or_wait(self, doc_id: str, request_fingerprint: str) -> Optional[StoredResponse]:
+        """Claim the key (returns None) or wait for the worker holding it to finish."""
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            now = datetime.utcnow()
+            lock_until = now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+            try:
+                await self.collection.insert_one({
+                    "_id": doc_id,
+                    "state": IN_PROGRESS,
+                    "fingerprint": request_fingerprint,
+                    "created_at": now,
+                    "locked_until": lock_until,
+                })
+                return None
+            except DuplicateKeyError:
+                pass
+
+            doc = await self.collection.find_one({"_id": doc_id})
+            if doc is None:
+                continue  # released after a failure; claim it again
+            if doc["fingerprint"] != request_fingerprint:
+                raise IdempotencyKeyReused()
+            if doc["state"] == COMPLETED:
+                return StoredResponse(doc["status_code"], doc["body"], doc["fingerprint"])
+            if doc["state"] == FAILED:
+                raise IdempotencyOutcomeUnknown(doc_id)
+            if doc["locked_until"] < now:
+                # Not renewed: the worker that claimed the key died, maybe mid-write
+                await self.collection.update_one(
+                    {"_id": doc_id, "state": IN_PROGRESS, "locked_until": doc["locked_until"]},
+                    {"$set": {"state": FAILED, "error": "claim lapsed"}},
+                )
+                raise IdempotencyOutcomeUnknown(doc_id)
+            if time.monotonic() > deadline:
+                raise IdempotencyInProgress(doc_id)
+            await asyncio.sleep(settings.IDEMPOTENCY_POLL_SECONDS)
+
+    @staticmethod
+    def _replay(record: StoredResponse, request_fingerprint: str) -> StoredResponse:
+        if record.fingerprint != request_fingerprint:
+            raise IdempotencyKeyReused()
+        return record
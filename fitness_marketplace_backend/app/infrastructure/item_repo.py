@@ -1,88 +1,272 @@
-from typing import Iterable, Optional, List
+from datetime import datetime
+from typing import Iterable, Optional, List, Dict, Sequence
 from app.domain.repositories import ItemRepo
 from app.domain.entities import Item
+from app.domain.events import OutboxEvent
+from app.infrastructure.collection_versions import MongoCollectionVersions
+from app.infrastructure.mapping import DocMapper, doc_field
+from app.infrastructure.outbox import MongoOutbox
 from app.db import db
 from app.config import settings
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+ITEMS = DocMapper(
+    Item,
+    # Every listing is created with these
+    product_id="productId",
+    product_name="productName",
+    category="category",
+    price_cents="priceCents",
+    qty="qty",
+    is_seller="isSeller",
+    owner_user_id="ownerUserId",
+    photos="photos",
+    description="description",
+    # Maintained in the database by view flushes and review events; listings
+    # predate them. avgRating is stored rounded, so it is read as is
+    avg_rating=doc_field("avgRating", write=False),
+    view_count=doc_field("viewCount", write=False),
+    rating_count=doc_field("ratingCount", write=False),
+    rating_score=doc_field("ratingScore", default=settings.RATING_PRIOR_MEAN, write=False),
+    updated_at=doc_field("updatedAt", write=False),  # set by every write below but view flushes
+)
+
+# Sort orders of list(); each has an index led by isSeller and category.
+# _id breaks ties so pages do not shuffle between requests.
+_SORTS = {
+    "rating": [("ratingScore", -1), ("_id", -1)],
+    "price": [("priceCents", 1), ("_id", 1)],
+    "newest": [("_id", -1)],  # ObjectIds are ordered by insert time
+}
+
+
+def _rating_stages(count, total) -> list:
+    """Update pipeline setting an item's rating counters and deriving its score.
+
+    The score is a Bayesian average: RATING_PRIOR_COUNT reviews at
+    RATING_PRIOR_MEAN are added to every product's own, so a single
+    five-star review does not outrank hundreds of four-star ones.
+    """
+    m, mean = settings.RATING_PRIOR_COUNT, settings.RATING_PRIOR_MEAN
+    unchanged = {"$and": [{"$eq": ["$ratingCount", count]}, {"$eq": ["$ratingSum", total]}]}
+    return [
+        {
+            "$set": {
+                "ratingCount": count,
+                "ratingSum": total,
+                # A rebuild that finds nothing to fix leaves the listing's version alone
+                "updatedAt": {"$cond": [unchanged, "$updatedAt", datetime.utcnow()]},
+            }
+        },
+        {
+            "$set": {
+                "ratingScore": {
+                    "$divide": [{"$add": ["$ratingSum", m * mean]}, {"$add": ["$ratingCount", m]}]
+                },
+                # Rounded for display here rather than on every read
+                "avgRating": {"$cond": [
+                    {"$gt": ["$ratingCount", 0]},
+                    {"$round": [{"$divide": ["$ratingSum", "$ratingCount"]}, 1]},
+                    0,
+                ]},
+            }
+        },
+    ]
+
 
 class MongoItemRepo(ItemRepo):
     def __init__(self, db: AsyncIOMotorDatabase):
         self.collection = db[settings.MONGO_ITEMS_COLLECTION]
+        self.reviews = db[settings.MONGO_REVIEWS_COLLECTION]
+        self.outbox = MongoOutbox(db)
+        self.versions = MongoCollectionVersions(db)
 
-    def _doc_to_item(self, doc: dict) -> Item:
-        return Item(
-            product_id=doc.get("productId"),
-            product_name=doc.get("productName"),
-            category=doc.get("category"),
-            photos=doc.get("photos", []),
-            price_cents=doc.get("priceCents"),
-            qty=doc.get("qty"),
-            description=doc.get("description"),
-            is_seller=doc.get("isSeller"),
-            owner_user_id=doc.get("ownerUserId"),
-            avg_rating=round(doc.get("avgRating", 0) or 0, 1)  # added
-        )
+    async def ensure_indexes(self):
+        await self.collection.create_index("productId")
+        await self.collection.create_index("ownerUserId")
+        for keys in _SORTS.values():
+            await self.collection.create_index([("isSeller", 1), ("category", 1), *keys])
+            await self.collection.create_index([("isSeller", 1), *keys])
 
-    def _item_to_doc(self, item: Item) -> dict:
-        return {
-            "productId": item.product_id,
-            "productName": item.product_name,
-            "category": item.category,
-            "photos": item.photos,
-            "priceCents": item.price_cents,
-            "qty": item.qty,
-            "description": item.description,
-            "isSeller": item.is_seller,
-            "ownerUserId": item.owner_user_id,
-        }
+    async def create(self, item: Item, events: Sequence[OutboxEvent] = ()) -> Item:
+        doc = ITEMS.to_doc(item)
+        # Unreviewed listings rank at the prior in sort=rating
+        doc.update(ratingCount=0, ratingSum=0, ratingScore=settings.RATING_PRIOR_MEAN)
+        doc["updatedAt"] = datetime.utcnow()
 
-    async def create(self, item: Item) -> Item:
-        doc = self._item_to_doc(item)
-        await self.collection.insert_one(doc)
+        async def write(session):
+            await self.collection.insert_one(doc, session=session)
+
+        await self.outbox.write_with(write, events)
+        await self.versions.bump(self.collection.name)
         return item
 
-    async def get_by_id(self, product_id: str) -> Optional[Item]:
-        doc = await self.collection.find_one({"productId": product_id})
+    async def get_by_id(
+        self, product_id: str, fields: Optional[Sequence[str]] = None
+    ) -> Optional[Item]:
+        if fields:
+            doc = await self.collection.find_one({"productId": product_id}, ITEMS.projection(fields))
+        else:
+            doc = await self.collection.find_one({"productId": product_id})
         if not doc:
             return None
-        return self._doc_to_item(doc)
+        return ITEMS.from_partial_doc(doc) if fields else ITEMS.from_doc(doc)
+
+    async def get_many(self, product_ids: List[str]) -> Dict[str, Item]:
+        if not product_ids:
+            return {}
+        cursor = self.collection.find({"productId": {"$in": list(product_ids)}})
+        docs = await cursor.to_list(length=None)
+        return {doc["productId"]: ITEMS.from_doc(doc) for doc in docs}
 
-    async def list(self, *, is_seller: Optional[bool] = None, category: Optional[str] = None) -> List[Item]:
+    async def list(
+        self,
+        *,
+        is_seller: Optional[bool] = None,
+        category: Optional[str] = None,
+        sort: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Item]:
         query = {}
         if is_seller is not None:
             query["isSeller"] = is_seller
+        elif sort:
+            # Both values, so the sort indexes (led by isSeller) still apply:
+            # the two ranges are merged instead of sorting in memory
+            query["isSeller"] = {"$in": [True, False]}
         if category:
             query["category"] = category
 
-        pipeline = [
-            {"$match": query},
-            {
-                "$lookup": {
-                    "from": "reviews",
-                    "localField": "productId",
-                    "foreignField": "product_id",
-                    "as": "reviews"
-                }
-            },
-            {
-                "$addFields": {
-                    "avgRating": {"$avg": "$reviews.rating"}
-                }
-            }
-        ]
+        if fields:
+            cursor = self.collection.find(query, ITEMS.projection(fields))
+        else:
+            cursor = self.collection.find(query)
+        if sort:
+            cursor = cursor.sort(_SORTS[sort])
+        if offset:
+            cursor = cursor.skip(offset)
+        if limit:
+            cursor = cursor.limit(limit)
+        docs = await cursor.to_list(length=limit)
+        from_doc = ITEMS.from_partial_doc if fields else ITEMS.from_doc
+        return [from_doc(doc) for doc in docs]
 
-        cursor = self.collection.aggregate(pipeline)
-        docs = await cursor.to_list(length=None)
-        return [self._doc_to_item(doc) for doc in docs]
+    async def list_newest(self, limit: int) -> List[Item]:
+        # Items have no creation date; ObjectIds are ordered by insert time
+        cursor = self.collection.find({"isSeller": True}).sort("_id", -1).limit(limit)
+        return [ITEMS.from_doc(doc) for doc in await cursor.to_list(length=limit)]
 
     async def list_by_owner(self, owner_user_id: str) -> List[Item]:
         cursor = self.collection.find({"ownerUserId": owner_user_id})
         docs = await cursor.to_list(length=None)
-        return [self._doc_to_item(doc) for doc in docs]
+        return [ITEMS.from_doc(doc) for doc in docs]
+
+    async def add_views(self, counts: Dict[str, int]) -> None:
+        if counts:
+            await self.collection.bulk_write(
+                [
+                    UpdateOne({"productId": pid}, {"$inc": {"viewCount": n}})
+                    for pid, n in counts.items()
+                ],
+                ordered=False
+            )
+
+    async def rebuild_ratings(self, product_ids: Optional[Sequence[str]] = None) -> int:
+        match = {"product_id": {"$in": list(product_ids)}} if product_ids is not None else {}
+        cursor = self.reviews.aggregate([
+            {"$match": match},
+            {"$group": {"_id": "$product_id", "count": {"$sum": 1}, "sum": {"$sum": "$rating"}}},
+        ])
+        stats = {doc["_id"]: (doc["count"], doc["sum"]) async for doc in cursor}
+
+        # Items never scored, or whose counters say reviews exist that no longer do
+        scope = {"productId": {"$in": list(product_ids)}} if product_ids is not None else {}
+        stale = self.collection.find(
+            {**scope, "$or": [{"ratingCount": {"$ne": 0}}, {"ratingScore": {"$exists": False}}]},
+            {"productId": 1},
+        )
+        async for doc in stale:
+            stats.setdefault(doc["productId"], (0, 0))
+
+        ops = [
+            UpdateOne({"productId": pid}, _rating_stages(count, total))
+            for pid, (count, total) in stats.items()
+        ]
+        modified = 0
+        for start in range(0, len(ops), 1000):
+            result = await self.collection.bulk_write(ops[start:start + 1000], ordered=False)
+            modified += result.modified_count
+        if modified:
+            await self.versions.bump(self.collection.name)
+        return len(ops)
+
+    async def get_owner_summary(self, owner_user_id: str, low_stock_threshold: int = 2) -> dict:
+        pipeline = [
+            {"$match": {"ownerUserId": owner_user_id}},
+            {
+                "$facet": {
+                    "totals": [
+                        {
+                            "$group": {
+                                "_id": None,
+                                "total": {"$sum": 1},
+                                "active": {"$sum": {"$cond": [
+                                    {"$and": ["$isSeller", {"$gt": ["$qty", 0]}]}, 1, 0
+                                ]}},
+                                "out_of_stock": {"$sum": {"$cond": [{"$lte": ["$qty", 0]}, 1, 0]}},
+                                "units_in_stock": {"$sum": "$qty"},
+                                "inventory_value_cents": {
+                                    "$sum": {"$multiply": ["$qty", "$priceCents"]}
+                                },
+                            }
+                        }
+                    ],
+                    # Older listings may lack a category; the dashboard keys counts by string
+                    "categories": [
+                        {"$group": {"_id": {"$ifNull": ["$category", ""]}, "count": {"$sum": 1}}}
+                    ],
+                    "low_stock": [
+                        {"$match": {"qty": {"$gt": 0, "$lte": low_stock_threshold}}},
+                        {"$sort": {"qty": 1}},
+                        {"$limit": 5},
+                        # Older listings may lack a name; the dashboard needs a string
+                        {"$project": {
+                            "_id": 0, "productId": 1, "qty": 1,
+                            "productName": {"$ifNull": ["$productName", ""]},
+                        }},
+                    ],
+                }
+            },
+        ]
+        result = (await self.collection.aggregate(pipeline).to_list(1))[0]
+        totals = result["totals"][0] if result["totals"] else {}
+        return {
+            "total": totals.get("total", 0),
+            "active": totals.get("active", 0),
+            "out_of_stock": totals.get("out_of_stock", 0),
+            "units_in_stock": totals.get("units_in_stock", 0),
+            "inventory_value_cents": totals.get("inventory_value_cents", 0),
+            "categories": {c["_id"]: c["count"] for c in result["categories"]},
+            "low_stock": result["low_stock"],
+        }
 
     async def update_quantity(self, product_id: str, new_qty: int) -> bool:
         result = await self.collection.update_one(
             {"productId": product_id},
-            {"$set": {"qty": new_qty}}
+            {"$set": {"qty": new_qty, "updatedAt": datetime.utcnow()}}
+        )
+        if result.modified_count:
+            await self.versions.bump(self.collection.name)
+        return result.modified_count > 0
+
+    async def adjust_quantity(self, product_id: str, delta: int) -> bool:
+        result = await self.collection.update_one(
+            {"productId": product_id},
+            {"$inc": {"qty": delta}, "$set": {"updatedAt": datetime.utcnow()}}
         )
+        if result.modified_count:
+            await self.versions.bump(self.collection.name)
         return result.modified_count > 0
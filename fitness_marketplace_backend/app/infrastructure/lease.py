@@ -0,0 +1,39 @@
+# app/infrastructure/lease.py
+import os
+import socket
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+from app.config import settings
+
+
+class Lease:
+    """
+    A named lease in the `locks` collection, for jobs that one worker
+    should run for all of them.
+
+    Held until released, or until `seconds` pass so a worker that died
+    mid-job does not block the others for good; pick `seconds` above the
+    job's longest run. Taken the same way as the outbox dispatcher's lease.
+    """
+
+    def __init__(self, name: str, seconds: float):
+        self.name = name
+        self.seconds = seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def acquire(self, db) -> bool:
+        now = datetime.utcnow()
+        try:
+            await db[settings.MONGO_LOCKS_COLLECTION].update_one(
+                {"_id": self.name, "$or": [{"owner": self.owner}, {"lease_until": {"$lt": now}}]},
+                {"$set": {"owner": self.owner, "lease_until": now + timedelta(seconds=self.seconds)}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False  # another worker holds it
+        return True
+
+    async def release(self, db) -> None:
+        await db[settings.MONGO_LOCKS_COLLECTION].delete_one({"_id": self.name, "owner": self.owner})
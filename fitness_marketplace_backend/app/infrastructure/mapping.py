@@ -0,0 +1,123 @@
+# app/infrastructure/mapping.py
+"""
+Declarative mapping between domain entities and MongoDB documents.
+
+A DocMapper is declared once per entity type with the document key of each
+field, and generates its two converters as plain Python source when it is
+created. A converter does only dict reads and writes, with no per-row
+loops over field lists, getattr or keyword arguments. Reading fills the
+entity's slots directly, which also skips a frozen dataclass's
+per-field `object.__setattr__`.
+
+    ITEMS = DocMapper(Item, product_id="productId", avg_rating=doc_field("avgRating", convert=...))
+    item = ITEMS.from_doc(doc)
+    doc = ITEMS.to_doc(item)
+
+For sparse reads, `projection(names)` loads only some fields and
+`from_partial_doc` leaves the others at their defaults, or None.
+"""
+import dataclasses
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generic, Iterable, Optional, Type, TypeVar, Union
+
+T = TypeVar("T")
+
+REQUIRED = object()
+
+
+@dataclass(frozen=True, slots=True)
+class DocField:
+    key: Optional[str]  # None: not stored in the document, passed to from_doc by the caller
+    default: Any = REQUIRED  # used when the key is missing; REQUIRED raises KeyError
+    convert: Optional[Callable[[Any], Any]] = None  # applied to the stored value on read
+    write: bool = True  # False: derived or maintained by the database, left out of to_doc
+
+
+def doc_field(
+    key: Optional[str],
+    *,
+    default: Any = REQUIRED,
+    convert: Optional[Callable[[Any], Any]] = None,
+    write: bool = True,
+) -> DocField:
+    return DocField(key, default, convert, write)
+
+
+class DocMapper(Generic[T]):
+    """
+    Converters between a slotted dataclass and its documents.
+
+    Every field of the dataclass is mapped; a field given as a plain key
+    is required when the dataclass has no default for it and falls back to
+    that default otherwise. Fields mapped to key None become extra
+    arguments of from_doc, for values kept outside the document itself
+    (a cart line's user id lives on the cart).
+    """
+
+    def __init__(self, cls: Type[T], **fields: Union[str, DocField, None]):
+        if not hasattr(cls, "__slots__"):
+            raise TypeError(f"{cls.__name__} must be a slotted dataclass")
+        self.cls = cls
+        self.fields: Dict[str, DocField] = {}
+        for f in dataclasses.fields(cls):
+            if f.name not in fields:
+                raise TypeError(f"{cls.__name__}.{f.name} has no document key")
+            spec = fields.pop(f.name)
+            if not isinstance(spec, DocField):
+                spec = DocField(spec)
+            if spec.default is REQUIRED and f.default is not dataclasses.MISSING:
+                spec = dataclasses.replace(spec, default=f.default)
+            self.fields[f.name] = spec
+        if fields:
+            raise TypeError(f"{cls.__name__} has no field(s) {', '.join(fields)}")
+        # attribute -> document key, for queries, sorts and projections
+        self.keys: Dict[str, str] = {
+            name: spec.key for name, spec in self.fields.items() if spec.key is not None
+        }
+        self.from_doc: Callable[..., T] = self._compile_from_doc()
+        self.from_partial_doc: Callable[..., T] = self._compile_from_doc(partial=True)
+        self.to_doc: Callable[[T], dict] = self._compile_to_doc()
+
+    def projection(self, names: Iterable[str]) -> Dict[str, int]:
+        """Mongo projection loading only the given fields; read it with from_partial_doc"""
+        projection = {self.keys[name]: 1 for name in names}
+        projection.setdefault("_id", 0)
+        return projection
+
+    def _compile_from_doc(self, partial: bool = False) -> Callable[..., T]:
+        ns: Dict[str, Any] = {"_new": object.__new__, "_cls": self.cls}
+        params, body = ["doc"], ["    o = _new(_cls)", "    get = doc.get"]
+        for n, (name, spec) in enumerate(self.fields.items()):
+            # Slots are member descriptors; their __set__ works on frozen instances too
+            ns[f"_set{n}"] = getattr(self.cls, name).__set__
+            if spec.key is None:
+                params.append(name)
+                value = name
+            elif spec.default is REQUIRED and not partial:
+                value = f"doc[{spec.key!r}]"
+            else:
+                ns[f"_default{n}"] = None if spec.default is REQUIRED else spec.default
+                value = f"get({spec.key!r}, _default{n})"
+            if spec.convert is not None and not (partial and spec.default is REQUIRED):
+                ns[f"_convert{n}"] = spec.convert
+                value = f"_convert{n}({value})"
+            body.append(f"    _set{n}(o, {value})")
+        body.append("    return o")
+        name = "from_partial_doc" if partial else "from_doc"
+        return self._define(f"def {name}({', '.join(params)}):", body, ns)
+
+    def _compile_to_doc(self) -> Callable[[T], dict]:
+        items = [
+            f"        {spec.key!r}: obj.{name},"
+            for name, spec in self.fields.items()
+            if spec.key is not None and spec.write
+        ]
+        return self._define("def to_doc(obj):", ["    return {", *items, "    }"], {})
+
+    def _define(self, signature: str, body, ns: Dict[str, Any]) -> Callable:
+        source = "\n".join([signature, *body])
+        exec(compile(source, f"<{self.cls.__name__} mapper>", "exec"), ns)
+        name = signature[4:signature.index("(")]
+        fn = ns[name]
+        fn.__qualname__ = f"{self.cls.__name__}Mapper.{name}"
+        return fn
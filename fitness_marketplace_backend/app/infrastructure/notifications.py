@@ -0,0 +1,151 @@
+# app/infrastructure/notifications.py
+import asyncio
+import json
+from collections import deque
+from typing import Dict, Optional, Set
+
+from app.config import settings
+from app.domain.entities import Purchase
+
+HEARTBEAT = b": keep-alive\n\n"
+
+
+class Subscription:
+    """
+    One SSE connection: a bounded queue of encoded messages.
+
+    Kept deliberately small (slots, a deque and a lazily created future)
+    so a worker can hold tens of thousands of idle connections.
+    """
+
+    __slots__ = ("topic", "queue", "maxsize", "closed", "active", "_waiter")
+
+    def __init__(self, topic: str, maxsize: int):
+        self.topic = topic
+        self.queue: deque = deque()
+        self.maxsize = maxsize
+        self.closed = False
+        self.active = False  # got something since the last heartbeat tick
+        self._waiter: Optional[asyncio.Future] = None
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def offer(self, message: bytes) -> bool:
+        """Queue a message; False if the consumer is too far behind."""
+        if len(self.queue) >= self.maxsize:
+            return False
+        self.queue.append(message)
+        self.active = True
+        self._wake()
+        return True
+
+    def close(self):
+        self.closed = True
+        self._wake()
+
+    async def next(self) -> Optional[bytes]:
+        """Next message to send, or None once the subscription is closed."""
+        while not self.queue:
+            if self.closed:
+                return None
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self.queue.popleft()
+
+
+class NotificationHub:
+    """
+    In-process pub/sub for server-sent events, keyed by topic (e.g. a seller id).
+
+    A message is encoded once and shared by every subscriber. A subscriber
+    whose queue is full is dropped instead of buffering without bound; its
+    stream ends and the browser's EventSource reconnects. Heartbeats come
+    from one hub-wide tick instead of a timer per connection, and only go
+    to connections that were idle since the previous tick.
+
+    Each worker process has its own hub, so a purchase reaches the sellers
+    connected to the worker that handled it.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.topics: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, topic: str) -> Subscription:
+        sub = Subscription(topic, self.queue_size)
+        self.topics.setdefault(topic, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        subs = self.topics.get(sub.topic)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self.topics[sub.topic]
+        sub.close()
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(s) for s in self.topics.values())
+
+    def publish(self, topic: str, event: str, data: dict, event_id: Optional[str] = None) -> int:
+        """Send an event to every subscriber of `topic`; returns how many got it."""
+        subs = self.topics.get(topic)
+        if not subs:
+            return 0
+        message = format_event(event, data, event_id)
+        delivered = 0
+        for sub in list(subs):
+            if sub.offer(message):
+                delivered += 1
+            else:
+                self.dropped += 1
+                self.unsubscribe(sub)
+        self.published += 1
+        return delivered
+
+    async def heartbeat(self):
+        for subs in list(self.topics.values()):
+            for sub in subs:
+                if not sub.active:
+                    sub.offer(HEARTBEAT)
+                sub.active = False
+
+    def close_all(self):
+        for subs in list(self.topics.values()):
+            for sub in list(subs):
+                self.unsubscribe(sub)
+
+
+def format_event(event: str, data: dict, event_id: Optional[str] = None) -> bytes:
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":"), default=str))
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+def purchase_notification(purchase: Purchase) -> dict:
+    return {
+        "purchaseId": purchase.purchase_id,
+        "buyerUserId": purchase.buyer_user_id,
+        "sellerUserId": purchase.seller_user_id,
+        "productId": purchase.product_id,
+        "productName": purchase.product_name,
+        "quantity": purchase.quantity,
+        "totalPriceCents": purchase.total_price_cents,
+        "purchaseDate": purchase.purchase_date.isoformat(),
+        "status": purchase.status,
+    }
+
+
+# One hub per worker process
+seller_notifications = NotificationHub(queue_size=settings.SSE_QUEUE_SIZE)
@@ -0,0 +1,312 @@
+# app/infrastructure/outbox.py
+import asyncio
+import logging
+import os
+import socket
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.config import settings
+from app.domain.events import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+PENDING = "pending"
+DISPATCHED = "dispatched"
+DEAD = "dead"
+
+# Handlers receive a batch of events of one type, in per-aggregate order.
+# Each handler that finishes is recorded on the events (done_handlers), so
+# a retry only runs the handlers that failed. Delivery is still
+# at-least-once: a crash between a handler and that record repeats it.
+EventHandler = Callable[[List[OutboxEvent]], Awaitable[None]]
+
+
+def _event_to_doc(event: OutboxEvent) -> dict:
+    return {
+        "_id": event.event_id,
+        "event_type": event.event_type,
+        "aggregate_type": event.aggregate_type,
+        "aggregate_id": event.aggregate_id,
+        "payload": event.payload,
+        "created_at": event.created_at,
+        "status": PENDING,
+        "attempts": 0,
+        "available_at": event.created_at,
+        "dispatched_at": None,
+        "done_handlers": [],
+    }
+
+
+def _doc_to_event(doc: dict) -> OutboxEvent:
+    return OutboxEvent(
+        event_type=doc["event_type"],
+        aggregate_type=doc["aggregate_type"],
+        aggregate_id=doc["aggregate_id"],
+        payload=doc["payload"],
+        event_id=doc["_id"],
+        created_at=doc["created_at"],
+    )
+
+
+class MongoOutbox:
+    """
+    Writes outbox entries in the same transaction as the business write.
+
+    Requires a replica set (Atlas always is). With OUTBOX_USE_TRANSACTIONS
+    off, e.g. against a standalone dev mongod, the entries are written right
+    after the business write instead.
+    """
+
+    def __init__(self, db):
+        self.collection = db[settings.MONGO_OUTBOX_COLLECTION]
+        self.client = db.client
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("status", 1), ("created_at", 1), ("_id", 1)])
+        # Aggregates with an event waiting out a retry backoff
+        await self.collection.create_index([("status", 1), ("available_at", 1)])
+        # Dispatched entries are kept for a while for debugging, then expire
+        await self.collection.create_index(
+            "dispatched_at", expireAfterSeconds=settings.OUTBOX_RETENTION_SECONDS
+        )
+
+    async def write_with(
+        self,
+        write: Callable[[Optional[object]], Awaitable[object]],
+        events: Sequence[OutboxEvent],
+        applied: Callable[[object], bool] = lambda result: True,
+    ):
+        """
+        Run `write(session)` and store `events` atomically with it.
+
+        `applied(result)` says whether the write changed anything; if not
+        (e.g. the review to update was already gone) no events are stored.
+        """
+        if not events:
+            return await write(None)
+
+        docs = [_event_to_doc(e) for e in events]
+        if not settings.OUTBOX_USE_TRANSACTIONS:
+            result = await write(None)
+            if applied(result):
+                await self.collection.insert_many(docs)
+                dispatcher.wake()
+            return result
+
+        async with await self.client.start_session() as session:
+            async with session.start_transaction():
+                result = await write(session)
+                if applied(result):
+                    await self.collection.insert_many(docs, session=session)
+        dispatcher.wake()
+        return result
+
+    async def insert(self, events: Sequence[OutboxEvent]) -> None:
+        """
+        Store events on their own, for writes already made without them.
+        Events already stored (same event_id) are skipped, so a retry is safe.
+        """
+        if not events:
+            return
+        try:
+            await self.collection.insert_many([_event_to_doc(e) for e in events], ordered=False)
+        except BulkWriteError as e:
+            if any(err["code"] != DUPLICATE_KEY for err in e.details["writeErrors"]):
+                raise
+        dispatcher.wake()
+
+
+class OutboxDispatcher:
+    """
+    Delivers outbox events to in-process handlers off the request path.
+
+    One worker at a time holds a lease in the `locks` collection and
+    dispatches; the others stand by. Each round reads a batch of due
+    events in creation order, leaving out aggregates with an event still
+    waiting for its retry, and dispatches them in waves: a wave holds at
+    most one event per aggregate, and an aggregate whose event failed is
+    skipped until the retry, so events of one aggregate never overtake each
+    other. Within a wave, events are grouped by type and each handler gets
+    the whole group.
+    """
+
+    LOCK_ID = "outbox-dispatcher"
+
+    def __init__(self):
+        self.handlers: Dict[str, List[Tuple[str, EventHandler]]] = defaultdict(list)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.dispatched = 0
+        self.failed = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lease_until = datetime.min
+
+    def register(self, event_type: str, handler: EventHandler, name: Optional[str] = None):
+        """`name` records the handler on delivered events; it defaults to its qualified name"""
+        name = name or getattr(handler, "__qualname__", None) or type(handler).__qualname__
+        if any(n == name for n, _ in self.handlers[event_type]):
+            raise ValueError(f"Handler {name!r} is already registered for {event_type}")
+        self.handlers[event_type].append((name, handler))
+
+    def wake(self):
+        """Called after an outbox write so this worker dispatches without waiting a full poll."""
+        if self._wake is not None:
+            self._wake.set()
+
+    def start(self, db):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._loop(db), name="outbox-dispatcher")
+
+    async def stop(self, db=None):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if db is not None and self._lease_until > datetime.utcnow():
+            await db[settings.MONGO_LOCKS_COLLECTION].delete_one(
+                {"_id": self.LOCK_ID, "owner": self.owner}
+            )
+
+    async def _loop(self, db):
+        while True:
+            try:
+                # Backlog: keep going without sleeping while full batches are
+                # delivered, renewing the lease so no other worker takes over
+                while (
+                    await self._hold_lease(db)
+                    and await self.dispatch_once(db) == settings.OUTBOX_BATCH_SIZE
+                ):
+                    pass
+            except Exception:
+                logger.exception("Outbox dispatch failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _hold_lease(self, db) -> bool:
+        now = datetime.utcnow()
+        if self._lease_until - now > timedelta(seconds=settings.OUTBOX_LEASE_SECONDS / 2):
+            return True
+        lease_until = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+        try:
+            await db[settings.MONGO_LOCKS_COLLECTION].update_one(
+                {"_id": self.LOCK_ID, "$or": [{"owner": self.owner}, {"lease_until": {"$lt": now}}]},
+                {"$set": {"owner": self.owner, "lease_until": lease_until}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False  # another worker holds a live lease
+        self._lease_until = lease_until
+        return True
+
+    async def dispatch_once(self, db) -> int:
+        """Dispatch one batch; returns how many events were delivered or failed."""
+        outbox = db[settings.MONGO_OUTBOX_COLLECTION]
+        now = datetime.utcnow()
+        # An event in backoff holds back the later events of its aggregate
+        waiting = await outbox.find(
+            {"status": PENDING, "available_at": {"$gt": now}},
+            {"_id": 0, "aggregate_type": 1, "aggregate_id": 1},
+        ).to_list(length=None)
+        query = {"status": PENDING, "available_at": {"$lte": now}}
+        if waiting:
+            blocked_aggregates = {(d["aggregate_type"], d["aggregate_id"]) for d in waiting}
+            query["$nor"] = [
+                {"aggregate_type": t, "aggregate_id": i} for t, i in blocked_aggregates
+            ]
+        # Creation order, not available_at: a retried event must still go
+        # before the later events of its aggregate
+        docs = await outbox.find(query).sort(
+            [("created_at", 1), ("_id", 1)]
+        ).limit(settings.OUTBOX_BATCH_SIZE).to_list(length=None)
+        if not docs:
+            return 0
+
+        queues: Dict[tuple, List[dict]] = defaultdict(list)
+        for doc in docs:
+            queues[(doc["aggregate_type"], doc["aggregate_id"])].append(doc)
+
+        blocked, handled = set(), 0
+        while True:
+            wave = []
+            for key, queue in queues.items():
+                if key in blocked or not queue:
+                    continue
+                wave.append(queue.pop(0))
+            if not wave:
+                break
+            # An aggregate that failed here waits for the retry with the rest of its events
+            blocked |= await self._dispatch_wave(outbox, wave)
+            handled += len(wave)
+        return handled
+
+    async def _dispatch_wave(self, outbox, wave: List[dict]) -> set:
+        by_type: Dict[str, List[dict]] = defaultdict(list)
+        for doc in wave:
+            by_type[doc["event_type"]].append(doc)
+
+        async def run(event_type: str, docs: List[dict]):
+            error = None
+            for name, handler in self.handlers.get(event_type, ()):
+                todo = [d for d in docs if name not in d.get("done_handlers", ())]
+                if not todo:
+                    continue  # already ran before an earlier attempt failed
+                try:
+                    await handler([_doc_to_event(d) for d in todo])
+                except Exception as e:
+                    # The other handlers still run; only the failed ones are retried
+                    error = error or e
+                    continue
+                await outbox.update_many(
+                    {"_id": {"$in": [d["_id"] for d in todo]}},
+                    {"$addToSet": {"done_handlers": name}},
+                )
+            if error is not None:
+                raise error
+
+        results = await asyncio.gather(
+            *(run(t, d) for t, d in by_type.items()), return_exceptions=True
+        )
+
+        now = datetime.utcnow()
+        delivered, failed_keys = [], set()
+        for (event_type, docs), result in zip(by_type.items(), results):
+            if not isinstance(result, Exception):
+                delivered.extend(d["_id"] for d in docs)
+                continue
+            logger.warning("Outbox handler for %s failed: %r", event_type, result)
+            self.failed += len(docs)
+            for d in docs:
+                failed_keys.add((d["aggregate_type"], d["aggregate_id"]))
+                attempts = d["attempts"] + 1
+                backoff = min(settings.OUTBOX_MAX_BACKOFF_SECONDS, 2 ** attempts)
+                await outbox.update_one({"_id": d["_id"]}, {"$set": {
+                    "attempts": attempts,
+                    "last_error": repr(result),
+                    "available_at": now + timedelta(seconds=backoff),
+                    "status": DEAD if attempts >= settings.OUTBOX_MAX_ATTEMPTS else PENDING,
+                }})
+
+        if delivered:
+            await outbox.update_many(
+                {"_id": {"$in": delivered}},
+                {"$set": {"status": DISPATCHED, "dispatched_at": now}},
+            )
+            self.dispatched += len(delivered)
+        return failed_keys
+
+
+# One dispatcher per worker process
+dispatcher = OutboxDispatcher()
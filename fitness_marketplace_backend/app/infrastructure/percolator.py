@@ -0,0 +1,150 @@
+# app/infrastructure/percolator.py
+import asyncio
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.domain.entities import Item, SavedSearch
+from app.domain.repositories import SavedSearchRepository
+from app.infrastructure.suggest import tokens
+
+# Prices are bucketed by quarter octaves: 4 buckets per doubling
+MAX_PRICE_BUCKET = 4 * 32
+ALL = "*"
+
+# (search_id, user_id, terms, category, min_price_cents, max_price_cents)
+Compiled = Tuple[str, str, frozenset, Optional[str], Optional[int], Optional[int]]
+
+
+def price_bucket(cents: int) -> int:
+    return min(int(math.log2(max(cents, 0) + 1) * 4), MAX_PRICE_BUCKET)
+
+
+def _category(category: Optional[str]) -> Optional[str]:
+    return category.strip().lower() if category and category.strip() else None
+
+
+def _price_key(lo: Optional[int], hi: Optional[int]) -> Optional[str]:
+    # An upper bound is indexed under its bucket; a listing probes every
+    # bucket at or above its own price, so nearly all candidates match
+    if hi is not None:
+        return f"lt:{price_bucket(hi)}"
+    if lo is not None:
+        return f"gt:{price_bucket(lo)}"
+    return None
+
+
+class SearchPercolator:
+    """
+    Reverse index of saved searches: instead of running every search
+    against a new listing, the listing's features pick the few searches
+    that can match it.
+
+    Each search is filed under one key, its most selective predicate: its
+    rarest word ("t:<word>", scoped to its category if it has one), else
+    its category combined with its price bound ("c:<category>|lt:<bucket>"),
+    its category, its price bound, or "*" for a search without predicates.
+    A listing probes the keys of its own words, category and price buckets,
+    and only the searches found there are checked in full.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, Compiled]] = {}
+        self.key_of: Dict[str, str] = {}
+        self.synced_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self.key_of)
+
+    def _key(self, terms: frozenset, category: Optional[str], lo, hi) -> str:
+        if terms:
+            scope = f"|c:{category}" if category else ""
+            word = min(terms, key=lambda t: (len(self.postings.get(f"t:{t}{scope}", ())), t))
+            return f"t:{word}{scope}"
+        price = _price_key(lo, hi)
+        if category and price:
+            return f"c:{category}|{price}"
+        if category:
+            return f"c:{category}"
+        return price or ALL
+
+    def add(self, search: SavedSearch) -> None:
+        self.remove(search.search_id)
+        terms = frozenset(tokens(search.query or ""))
+        category = _category(search.category)
+        lo, hi = search.min_price_cents, search.max_price_cents
+        key = self._key(terms, category, lo, hi)
+        self.postings.setdefault(key, {})[search.search_id] = (
+            search.search_id, search.user_id, terms, category, lo, hi
+        )
+        self.key_of[search.search_id] = key
+
+    def remove(self, search_id: str) -> None:
+        key = self.key_of.pop(search_id, None)
+        if key is None:
+            return
+        posting = self.postings[key]
+        posting.pop(search_id, None)
+        if not posting:
+            del self.postings[key]
+
+    def _probe_keys(self, words: Set[str], category: Optional[str], price: int) -> List[str]:
+        b = price_bucket(price)
+        prices = [f"lt:{i}" for i in range(b, MAX_PRICE_BUCKET + 1)]
+        prices += [f"gt:{i}" for i in range(0, b + 1)]
+        keys = ["t:" + w for w in words] + prices + [ALL]
+        if category:
+            keys += [f"t:{w}|c:{category}" for w in words]
+            keys.append(f"c:{category}")
+            keys += [f"c:{category}|{p}" for p in prices]
+        return keys
+
+    def match(self, item: Item) -> List[Tuple[str, str]]:
+        """(search_id, user_id) of every saved search `item` satisfies."""
+        words = set(tokens(f"{item.product_name or ''} {item.description or ''}"))
+        category = _category(item.category)
+        price = item.price_cents
+        matches = []
+        for key in self._probe_keys(words, category, price):
+            posting = self.postings.get(key)
+            if not posting:
+                continue
+            for search_id, user_id, terms, want_category, lo, hi in posting.values():
+                if (
+                    (want_category is None or want_category == category)
+                    and (lo is None or price >= lo)
+                    and (hi is None or price <= hi)
+                    and terms <= words
+                ):
+                    matches.append((search_id, user_id))
+        return matches
+
+    async def sync(self, repo: SavedSearchRepository) -> None:
+        """Catch up with searches created or deleted since the last sync."""
+        now = datetime.utcnow()
+        since = self.synced_at
+        tombstones = timedelta(seconds=settings.SAVED_SEARCH_TOMBSTONE_SECONDS)
+        if since is not None and now - since > tombstones:
+            since = None  # deletions older than the tombstones may be gone: reload
+        if since is None:
+            self.postings, self.key_of = {}, {}
+        else:
+            since -= timedelta(seconds=settings.SAVED_SEARCH_SYNC_OVERLAP_SECONDS)
+        created, deleted = await repo.changes_since(since)
+        if since is None:
+            # A full load is large; index it off the event loop
+            await asyncio.to_thread(self._apply, created, deleted)
+        else:
+            self._apply(created, deleted)
+        self.synced_at = now
+
+    def _apply(self, created: List[SavedSearch], deleted: List[str]) -> None:
+        for search in created:
+            self.add(search)
+        for search_id in deleted:
+            self.remove(search_id)
+
+
+# Loaded on first use by whichever worker dispatches outbox events
+percolator = SearchPercolator()
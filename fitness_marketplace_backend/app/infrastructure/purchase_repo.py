@@ -1,87 +1,230 @@
-from typing import Optional, List
+import logging
+from collections import defaultdict
+from typing import Dict, Optional, List, Sequence
 from datetime import datetime
+
+from pymongo.errors import BulkWriteError, OperationFailure
 from app.domain.entities import Purchase
+from app.domain.events import OutboxEvent
 from app.domain.repositories import PurchaseRepository
+from app.infrastructure.collection_versions import MongoCollectionVersions
+from app.infrastructure.mapping import DocMapper
+from app.infrastructure.outbox import DUPLICATE_KEY, MongoOutbox
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+PURCHASES = DocMapper(
+    Purchase,
+    purchase_id="purchase_id",
+    buyer_user_id="buyer_user_id",
+    seller_user_id="seller_user_id",
+    product_id="product_id",
+    product_name="product_name",
+    quantity="quantity",
+    total_price_cents="total_price_cents",
+    purchase_date="purchase_date",
+    status="status",
+    photo="photo",
+)
+
 class MongoPurchaseRepo(PurchaseRepository):
     def __init__(self, db):
         self.collection = db[settings.MONGO_PURCHASES_COLLECTION]
+        self.items = db[settings.MONGO_ITEMS_COLLECTION]
+        self.outbox = MongoOutbox(db)
+        self.versions = MongoCollectionVersions(db)
 
-    async def create(self, purchase: Purchase) -> Purchase:
-        doc = {
-            "purchase_id": purchase.purchase_id,
-            "buyer_user_id": purchase.buyer_user_id,
-            "seller_user_id": purchase.seller_user_id,
-            "product_id": purchase.product_id,
-            "product_name": purchase.product_name,
-            "quantity": purchase.quantity,
-            "total_price_cents": purchase.total_price_cents,
-            "purchase_date": purchase.purchase_date,
-            "status": purchase.status,
-            "photo": purchase.photo  # 🔥 store image
-        }
-        await self.collection.insert_one(doc)
+    async def ensure_indexes(self):
+        try:
+            # Unique: a batch written again after a partial failure cannot duplicate orders
+            await self.collection.create_index("purchase_id", unique=True)
+        except OperationFailure as e:
+            if e.code not in (85, 86):  # IndexOptionsConflict, IndexKeySpecsConflict
+                logger.exception("Could not make purchase_id unique; check for duplicate orders")
+            else:
+                await self.collection.drop_index("purchase_id_1")
+                await self.collection.create_index("purchase_id", unique=True)
+        await self.collection.create_index([("buyer_user_id", 1), ("purchase_date", -1)])
+        await self.collection.create_index([("seller_user_id", 1), ("purchase_date", -1)])
+        # Status-filtered views ("open orders") read only the matching statuses
+        await self.collection.create_index(
+            [("seller_user_id", 1), ("status", 1), ("purchase_date", -1)]
+        )
+        await self.collection.create_index(
+            [("buyer_user_id", 1), ("status", 1), ("purchase_date", -1)]
+        )
+        # Co-purchase index updates: recent buyers, and buyers of given products
+        await self.collection.create_index("purchase_date")
+        await self.collection.create_index([("product_id", 1), ("buyer_user_id", 1)])
+
+    async def create(self, purchase: Purchase, events: Sequence[OutboxEvent] = ()) -> Purchase:
+        async def write(session):
+            await self.collection.insert_one(PURCHASES.to_doc(purchase), session=session)
+
+        await self.outbox.write_with(write, events)
         return purchase
 
+    async def create_many(
+        self, purchases: List[Purchase], events: Sequence[OutboxEvent] = ()
+    ) -> List[Purchase]:
+        """
+        Insert a batch. An event goes with the purchase whose id is its aggregate id.
+
+        Safe to repeat with the same purchases and events: purchases already
+        stored are skipped, and their events are added if an earlier attempt
+        stored the purchases but not the events. Returns the purchases that
+        could not be written, for the caller to retry.
+        """
+        if not purchases:
+            return []
+        events_of: Dict[str, List[OutboxEvent]] = defaultdict(list)
+        for event in events:
+            events_of[event.aggregate_id].append(event)
+
+        stored = set(await self.collection.distinct(
+            "purchase_id", {"purchase_id": {"$in": [p.purchase_id for p in purchases]}}
+        ))
+        await self.outbox.insert(
+            [e for p in purchases if p.purchase_id in stored for e in events_of[p.purchase_id]]
+        )
+        new = [p for p in purchases if p.purchase_id not in stored]
+        if not new:
+            return []
+        docs = [PURCHASES.to_doc(p) for p in new]
+
+        if settings.OUTBOX_USE_TRANSACTIONS:
+            async def write(session):
+                await self.collection.insert_many(docs, ordered=False, session=session)
+
+            # All or nothing
+            await self.outbox.write_with(write, [e for p in new for e in events_of[p.purchase_id]])
+            return []
+
+        # Without a transaction part of the batch can fail: retry only that part
+        failed = []
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            rejected = {
+                err["index"] for err in e.details["writeErrors"] if err["code"] != DUPLICATE_KEY
+            }
+            failed = [new[i] for i in sorted(rejected)]
+        failed_ids = {p.purchase_id for p in failed}
+        await self.outbox.insert(
+            [e for p in new if p.purchase_id not in failed_ids for e in events_of[p.purchase_id]]
+        )
+        return failed
+
     async def get_by_id(self, purchase_id: str) -> Optional[Purchase]:
         doc = await self.collection.find_one({"purchase_id": purchase_id})
         if not doc:
             return None
-        return Purchase(
-            purchase_id=doc["purchase_id"],
-            buyer_user_id=doc["buyer_user_id"],
-            seller_user_id=doc["seller_user_id"],
-            product_id=doc["product_id"],
-            product_name=doc["product_name"],
-            quantity=doc["quantity"],
-            total_price_cents=doc["total_price_cents"],
-            purchase_date=doc["purchase_date"],
-            status=doc["status"],
-            photo=doc.get("photo")
-        )
+        return PURCHASES.from_doc(doc)
 
-    async def list_by_buyer(self, buyer_user_id: str) -> List[Purchase]:
-        cursor = self.collection.find({"buyer_user_id": buyer_user_id})
+    async def _list(
+        self,
+        query: dict,
+        statuses: Optional[Sequence[str]],
+        limit: Optional[int],
+        offset: int,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Purchase]:
+        if statuses:
+            query["status"] = {"$in": list(statuses)}
+        projection = PURCHASES.projection(fields) if fields else None
+        cursor = self.collection.find(query, projection).sort("purchase_date", -1).skip(offset)
+        if limit:
+            cursor = cursor.limit(limit)
         docs = await cursor.to_list(length=None)
-        return [
-            Purchase(
-                purchase_id=doc["purchase_id"],
-                buyer_user_id=doc["buyer_user_id"],
-                seller_user_id=doc["seller_user_id"],
-                product_id=doc["product_id"],
-                product_name=doc["product_name"],
-                quantity=doc["quantity"],
-                total_price_cents=doc["total_price_cents"],
-                purchase_date=doc["purchase_date"],
-                status=doc["status"],
-                photo=doc.get("photo")
-            )
-            for doc in docs
-        ]
+        from_doc = PURCHASES.from_partial_doc if fields else PURCHASES.from_doc
+        return [from_doc(doc) for doc in docs]
 
-    async def list_by_seller(self, seller_user_id: str) -> List[Purchase]:
-        cursor = self.collection.find({"seller_user_id": seller_user_id})
-        docs = await cursor.to_list(length=None)
-        return [
-            Purchase(
-                purchase_id=doc["purchase_id"],
-                buyer_user_id=doc["buyer_user_id"],
-                seller_user_id=doc["seller_user_id"],
-                product_id=doc["product_id"],
-                product_name=doc["product_name"],
-                quantity=doc["quantity"],
-                total_price_cents=doc["total_price_cents"],
-                purchase_date=doc["purchase_date"],
-                status=doc["status"],
-                photo=doc.get("photo")
+    async def list_by_buyer(
+        self,
+        buyer_user_id: str,
+        statuses: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Purchase]:
+        return await self._list({"buyer_user_id": buyer_user_id}, statuses, limit, offset, fields)
+
+    async def list_by_seller(
+        self,
+        seller_user_id: str,
+        statuses: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Purchase]:
+        return await self._list({"seller_user_id": seller_user_id}, statuses, limit, offset, fields)
+
+    async def update_status(
+        self,
+        purchase_id: str,
+        status: str,
+        expected_status: Optional[str] = None,
+        events: Sequence[OutboxEvent] = (),
+        restock: bool = False
+    ) -> bool:
+        query = {"purchase_id": purchase_id}
+        if expected_status is not None:
+            query["status"] = expected_status
+
+        async def write(session):
+            purchase = await self.collection.find_one_and_update(
+                query,
+                {"$set": {"status": status}},
+                projection={"_id": 0, "product_id": 1, "quantity": 1},
+                session=session,
             )
-            for doc in docs
-        ]
+            if purchase and restock:
+                await self.items.update_one(
+                    {"productId": purchase["product_id"]},
+                    {
+                        "$inc": {"qty": purchase["quantity"]},
+                        "$set": {"updatedAt": datetime.utcnow()},
+                    },
+                    session=session,
+                )
+            return purchase
 
-    async def update_status(self, purchase_id: str, status: str) -> bool:
-        result = await self.collection.update_one(
-            {"purchase_id": purchase_id},
-            {"$set": {"status": status}}
+        purchase = await self.outbox.write_with(
+            write, events, applied=lambda p: p is not None
         )
-        return result.modified_count > 0
+        if purchase and restock:
+            await self.versions.bump(self.items.name)
+        return purchase is not None
+
+    async def get_seller_sales_summary(self, seller_user_id: str, recent_limit: int = 10) -> dict:
+        pipeline = [
+            {"$match": {"seller_user_id": seller_user_id}},
+            {
+                "$facet": {
+                    "totals": [
+                        {"$match": {"status": {"$ne": "cancelled"}}},
+                        {
+                            "$group": {
+                                "_id": None,
+                                "orders": {"$sum": 1},
+                                "units": {"$sum": "$quantity"},
+                                "revenue_cents": {"$sum": "$total_price_cents"},
+                            }
+                        },
+                    ],
+                    "recent": [
+                        {"$sort": {"purchase_date": -1}},
+                        {"$limit": recent_limit},
+                    ],
+                }
+            },
+        ]
+        result = (await self.collection.aggregate(pipeline).to_list(1))[0]
+        totals = result["totals"][0] if result["totals"] else {}
+        return {
+            "orders": totals.get("orders", 0),
+            "units": totals.get("units", 0),
+            "revenue_cents": totals.get("revenue_cents", 0),
+            "recent": [PURCHASES.from_doc(doc) for doc in result["recent"]],
+        }
@@ -0,0 +1,78 @@
+# app/infrastructure/related_items_repo.py
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pymongo import ReplaceOne
+
+from app.config import settings
+from app.domain.entities import RelatedItem
+from app.domain.repositories import RelatedItemsRepository
+
+
+class MongoRelatedItemsRepo(RelatedItemsRepository):
+    """
+    One document per product, keyed by product id, holding its neighbours
+    with the listing fields needed to render them, so a product page reads
+    its recommendations with a single _id lookup.
+    """
+
+    def __init__(self, db):
+        self.collection = db[settings.MONGO_RELATED_ITEMS_COLLECTION]
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("updated_at")
+
+    async def get_related(self, product_id: str, limit: int) -> List[RelatedItem]:
+        doc = await self.collection.find_one(
+            {"_id": product_id}, {"related": {"$slice": limit}}
+        )
+        if not doc:
+            return []
+        return [
+            RelatedItem(
+                product_id=r["product_id"],
+                product_name=r["product_name"],
+                category=r["category"],
+                price_cents=r["price_cents"],
+                photo=r.get("photo"),
+                score=r["score"],
+                co_purchases=r["co_purchases"],
+            )
+            for r in doc["related"]
+        ]
+
+    async def save_related(self, related: Dict[str, List[RelatedItem]]) -> None:
+        if not related:
+            return
+        now = datetime.utcnow()
+        ops = [
+            ReplaceOne(
+                {"_id": product_id},
+                {
+                    "related": [
+                        {
+                            "product_id": r.product_id,
+                            "product_name": r.product_name,
+                            "category": r.category,
+                            "price_cents": r.price_cents,
+                            "photo": r.photo,
+                            "score": r.score,
+                            "co_purchases": r.co_purchases,
+                        }
+                        for r in neighbours
+                    ],
+                    "updated_at": now,
+                },
+                upsert=True,
+            )
+            for product_id, neighbours in related.items()
+        ]
+        await self.collection.bulk_write(ops, ordered=False)
+
+    async def oldest_update(self) -> Optional[datetime]:
+        doc = await self.collection.find_one({}, {"updated_at": 1}, sort=[("updated_at", 1)])
+        return doc["updated_at"] if doc else None
+
+    async def delete_older(self, than: datetime) -> int:
+        result = await self.collection.delete_many({"updated_at": {"$lt": than}})
+        return result.deleted_count
@@ -1,63 +1,194 @@
 # app/infrastructure/review_repo.py
 
-from typing import Optional, List
-from datetime import datetime
+import base64
+from typing import Dict, Optional, List, Sequence, Tuple
+from datetime import datetime, timedelta
+
+from bson import ObjectId
 from app.domain.entities import Review
+from app.domain.events import OutboxEvent
 from app.domain.repositories import ReviewRepository
+from app.infrastructure.cache import TTLCache
+from app.infrastructure.collection_versions import MongoCollectionVersions
+from app.infrastructure.mapping import DocMapper, doc_field
+from app.infrastructure.outbox import MongoOutbox
 from app.config import settings
 
+REVIEWS = DocMapper(
+    Review,
+    review_id="review_id",
+    purchase_id="purchase_id",
+    reviewer_user_id="reviewer_user_id",
+    reviewed_user_id="reviewed_user_id",
+    product_id="product_id",
+    rating="rating",
+    comment="comment",
+    created_at="created_at",
+    updated_at="updated_at",
+    comment_truncated=doc_field("comment_truncated", write=False),  # set by list projections
+)
+
+# Per-product rating stats shared by every MongoReviewRepo in this process.
+# Review writes made through this process drop their product's entry;
+# writes on other workers show up once the entry expires.
+_rating_cache = TTLCache(
+    maxsize=settings.RATING_CACHE_MAX_PRODUCTS,
+    ttl_seconds=settings.RATING_CACHE_TTL_SECONDS,
+)
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _forget_ratings(events: Sequence[OutboxEvent]) -> None:
+    for event in events:
+        product_id = event.payload.get("product_id")
+        if product_id:
+            _rating_cache.pop(product_id)
+
 
 class MongoReviewRepo(ReviewRepository):
     def __init__(self, db):
         self.collection = db[settings.MONGO_REVIEWS_COLLECTION]
+        self.outbox = MongoOutbox(db)
+        self.versions = MongoCollectionVersions(db)
 
-    async def create(self, review: Review) -> Review:
-        doc = {
-            "review_id": review.review_id,
-            "purchase_id": review.purchase_id,
-            "reviewer_user_id": review.reviewer_user_id,
-            "reviewed_user_id": review.reviewed_user_id,
-            "product_id": review.product_id,
-            "rating": review.rating,
-            "comment": review.comment,
-            "created_at": review.created_at or datetime.utcnow(),
-            "updated_at": review.updated_at,
-        }
-        await self.collection.insert_one(doc)
+    async def ensure_indexes(self):
+        await self.collection.create_index("review_id")
+        await self.collection.create_index("purchase_id")
+        # Review pages: newest first, _id breaks ties between equal timestamps
+        await self.collection.create_index([("product_id", 1), ("created_at", -1), ("_id", -1)])
+        await self.collection.create_index([("reviewed_user_id", 1), ("created_at", -1), ("_id", -1)])
+        await self.collection.create_index([("reviewer_user_id", 1), ("created_at", -1), ("_id", -1)])
+
+    async def create(self, review: Review, events: Sequence[OutboxEvent] = ()) -> Review:
+        doc = REVIEWS.to_doc(review)
+        doc["created_at"] = review.created_at or datetime.utcnow()
+
+        async def write(session):
+            await self.collection.insert_one(doc, session=session)
+
+        await self.outbox.write_with(write, events)
+        await self.versions.bump(self.collection.name)
+        _forget_ratings(events)
         return review
 
     async def get_by_id(self, review_id: str) -> Optional[Review]:
         doc = await self.collection.find_one({"review_id": review_id})
-        return self._doc_to_review(doc) if doc else None
+        return REVIEWS.from_doc(doc) if doc else None
 
     async def get_by_purchase_id(self, purchase_id: str) -> Optional[Review]:
         doc = await self.collection.find_one({"purchase_id": purchase_id})
-        return self._doc_to_review(doc) if doc else None
+        return REVIEWS.from_doc(doc) if doc else None
 
     async def list_by_seller(self, seller_user_id: str) -> List[Review]:
         cursor = self.collection.find({"reviewed_user_id": seller_user_id}).sort("created_at", -1)
         docs = await cursor.to_list(length=None)
-        return [self._doc_to_review(doc) for doc in docs]
+        return [REVIEWS.from_doc(doc) for doc in docs]
 
     async def list_by_product(self, product_id: str) -> List[Review]:
         cursor = self.collection.find({"product_id": product_id}).sort("created_at", -1)
         docs = await cursor.to_list(length=None)
-        return [self._doc_to_review(doc) for doc in docs]
+        return [REVIEWS.from_doc(doc) for doc in docs]
 
     async def list_by_reviewer(self, reviewer_user_id: str) -> List[Review]:
         cursor = self.collection.find({"reviewer_user_id": reviewer_user_id}).sort("created_at", -1)
         docs = await cursor.to_list(length=None)
-        return [self._doc_to_review(doc) for doc in docs]
+        return [REVIEWS.from_doc(doc) for doc in docs]
+
+    @staticmethod
+    def _encode_cursor(doc: dict) -> str:
+        millis = (doc["created_at"] - _EPOCH) // timedelta(milliseconds=1)
+        raw = f"{millis}:{doc['_id']}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
 
-    async def update(self, review_id: str, rating: int, comment: str) -> bool:
-        result = await self.collection.update_one(
-            {"review_id": review_id},
-            {"$set": {"rating": rating, "comment": comment, "updated_at": datetime.utcnow()}}
+    @staticmethod
+    def _decode_cursor(cursor: str) -> dict:
+        try:
+            millis, oid = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+            created_at = _EPOCH + timedelta(milliseconds=int(millis))
+            oid = ObjectId(oid)
+        except Exception:
+            raise ValueError("Invalid cursor")
+        return {
+            "$or": [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": oid}},
+            ]
+        }
+
+    async def _page(
+        self, match: dict, limit: int, cursor: Optional[str], comment_chars: Optional[int],
+        fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Review], Optional[str]]:
+        if cursor:
+            match = {**match, **self._decode_cursor(cursor)}
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"created_at": -1, "_id": -1}},
+            {"$limit": limit + 1},  # one more tells whether there is a next page
+        ]
+        if comment_chars is not None:
+            pipeline.append({
+                "$addFields": {
+                    "comment_truncated": {"$gt": [{"$strLenCP": "$comment"}, comment_chars]},
+                    "comment": {"$substrCP": ["$comment", 0, comment_chars]},
+                }
+            })
+        if fields:
+            # The cursor is built from created_at and _id, whatever was asked for
+            pipeline.append({"$project": {**REVIEWS.projection(fields), "_id": 1, "created_at": 1}})
+        docs = await self.collection.aggregate(pipeline).to_list(length=None)
+        next_cursor = self._encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+        from_doc = REVIEWS.from_partial_doc if fields else REVIEWS.from_doc
+        return [from_doc(doc) for doc in docs[:limit]], next_cursor
+
+    async def page_by_product(
+        self, product_id: str, limit: int, cursor: Optional[str] = None,
+        comment_chars: Optional[int] = None, fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Review], Optional[str]]:
+        return await self._page({"product_id": product_id}, limit, cursor, comment_chars, fields)
+
+    async def page_by_seller(
+        self, seller_user_id: str, limit: int, cursor: Optional[str] = None,
+        comment_chars: Optional[int] = None, fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Review], Optional[str]]:
+        return await self._page({"reviewed_user_id": seller_user_id}, limit, cursor, comment_chars, fields)
+
+    async def page_by_reviewer(
+        self, reviewer_user_id: str, limit: int, cursor: Optional[str] = None,
+        comment_chars: Optional[int] = None, fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Review], Optional[str]]:
+        return await self._page({"reviewer_user_id": reviewer_user_id}, limit, cursor, comment_chars, fields)
+
+    async def update(
+        self, review_id: str, rating: int, comment: str, events: Sequence[OutboxEvent] = ()
+    ) -> bool:
+        async def write(session):
+            return await self.collection.update_one(
+                {"review_id": review_id},
+                {"$set": {"rating": rating, "comment": comment, "updated_at": datetime.utcnow()}},
+                session=session,
+            )
+
+        result = await self.outbox.write_with(
+            write, events, applied=lambda r: r.modified_count > 0
         )
+        if result.modified_count:
+            await self.versions.bump(self.collection.name)
+        _forget_ratings(events)
         return result.modified_count > 0
 
-    async def delete(self, review_id: str) -> bool:
-        result = await self.collection.delete_one({"review_id": review_id})
+    async def delete(self, review_id: str, events: Sequence[OutboxEvent] = ()) -> bool:
+        async def write(session):
+            return await self.collection.delete_one({"review_id": review_id}, session=session)
+
+        result = await self.outbox.write_with(
+            write, events, applied=lambda r: r.deleted_count > 0
+        )
+        if result.deleted_count:
+            await self.versions.bump(self.collection.name)
+        _forget_ratings(events)
         return result.deleted_count > 0
 
     async def get_seller_average_rating(self, seller_user_id: str) -> Optional[float]:
@@ -76,24 +207,21 @@ class MongoReviewRepo(ReviewRepository):
         result = await self.collection.aggregate(pipeline).to_list(1)
         return round(result[0]["avgRating"], 2) if result else None
 
-    async def get_seller_rating_stats(self, seller_user_id: str) -> dict:
-        pipeline = [
-            {"$match": {"reviewed_user_id": seller_user_id}},
-            {
-                "$group": {
-                    "_id": None,
-                    "avg_rating": {"$avg": "$rating"},
-                    "total_reviews": {"$sum": 1},
-                    "five_star": {"$sum": {"$cond": [{"$eq": ["$rating", 5]}, 1, 0]}},
-                    "four_star": {"$sum": {"$cond": [{"$eq": ["$rating", 4]}, 1, 0]}},
-                    "three_star": {"$sum": {"$cond": [{"$eq": ["$rating", 3]}, 1, 0]}},
-                    "two_star": {"$sum": {"$cond": [{"$eq": ["$rating", 2]}, 1, 0]}},
-                    "one_star": {"$sum": {"$cond": [{"$eq": ["$rating", 1]}, 1, 0]}},
-                }
-            },
-        ]
-        result = await self.collection.aggregate(pipeline).to_list(1)
+    _RATING_STATS_GROUP = {
+        "$group": {
+            "_id": None,
+            "avg_rating": {"$avg": "$rating"},
+            "total_reviews": {"$sum": 1},
+            "five_star": {"$sum": {"$cond": [{"$eq": ["$rating", 5]}, 1, 0]}},
+            "four_star": {"$sum": {"$cond": [{"$eq": ["$rating", 4]}, 1, 0]}},
+            "three_star": {"$sum": {"$cond": [{"$eq": ["$rating", 3]}, 1, 0]}},
+            "two_star": {"$sum": {"$cond": [{"$eq": ["$rating", 2]}, 1, 0]}},
+            "one_star": {"$sum": {"$cond": [{"$eq": ["$rating", 1]}, 1, 0]}},
+        }
+    }
 
+    @staticmethod
+    def _format_rating_stats(result: list) -> dict:
         if result:
             stats = result[0]
             return {
@@ -114,15 +242,47 @@ class MongoReviewRepo(ReviewRepository):
             "rating_distribution": {"5": 0, "4": 0, "3": 0, "2": 0, "1": 0},
         }
 
-    def _doc_to_review(self, doc: dict) -> Review:
-        return Review(
-            review_id=doc["review_id"],
-            purchase_id=doc["purchase_id"],
-            reviewer_user_id=doc["reviewer_user_id"],
-            reviewed_user_id=doc["reviewed_user_id"],
-            product_id=doc["product_id"],
-            rating=doc["rating"],
-            comment=doc["comment"],
-            created_at=doc["created_at"],
-            updated_at=doc.get("updated_at"),
-        )
+    async def get_product_rating_stats(self, product_ids: Sequence[str]) -> Dict[str, dict]:
+        stats = {}
+        missing = []
+        for pid in dict.fromkeys(product_ids):
+            cached = _rating_cache.get(pid)
+            if cached is None:
+                missing.append(pid)
+            else:
+                stats[pid] = cached
+        if missing:
+            pipeline = [
+                {"$match": {"product_id": {"$in": missing}}},
+                {"$group": {**self._RATING_STATS_GROUP["$group"], "_id": "$product_id"}},
+            ]
+            docs = await self.collection.aggregate(pipeline).to_list(length=None)
+            found = {d["_id"]: d for d in docs}
+            for pid in missing:
+                # Products without reviews are cached too
+                stats[pid] = self._format_rating_stats([found[pid]] if pid in found else [])
+                _rating_cache.set(pid, stats[pid])
+        return {pid: stats[pid] for pid in product_ids if pid in stats}
+
+    async def get_seller_rating_stats(self, seller_user_id: str) -> dict:
+        pipeline = [
+            {"$match": {"reviewed_user_id": seller_user_id}},
+            self._RATING_STATS_GROUP,
+        ]
+        result = await self.collection.aggregate(pipeline).to_list(1)
+        return self._format_rating_stats(result)
+
+    async def get_seller_review_summary(self, seller_user_id: str, recent_limit: int = 5) -> dict:
+        pipeline = [
+            {"$match": {"reviewed_user_id": seller_user_id}},
+            {
+                "$facet": {
+                    "stats": [self._RATING_STATS_GROUP],
+                    "recent": [{"$sort": {"created_at": -1}}, {"$limit": recent_limit}],
+                }
+            },
+        ]
+        result = (await self.collection.aggregate(pipeline).to_list(1))[0]
+        summary = self._format_rating_stats(result["stats"])
+        summary["recent"] = [REVIEWS.from_doc(doc) for doc in result["recent"]]
+        return summary
@@ -0,0 +1,153 @@
+# app/infrastructure/sales_rollup_repo.py
+from typing import Optional, List
+from datetime import datetime
+from app.domain.entities import Purchase, DailySales
+from app.domain.repositories import SalesRollupRepository
+from app.config import settings
+from pymongo import UpdateOne
+
+
+def _day(ts: datetime) -> datetime:
+    return datetime(ts.year, ts.month, ts.day)
+
+
+class MongoSalesRollupRepo(SalesRollupRepository):
+    """
+    One document per (seller_user_id, day, product_id) holding units,
+    revenue and order count, so a seller's stats for a date range read
+    O(days x products sold) rows instead of every purchase.
+    """
+
+    def __init__(self, db):
+        self.collection = db[settings.MONGO_SALES_DAILY_COLLECTION]
+        self.purchases = db[settings.MONGO_PURCHASES_COLLECTION]
+
+    async def ensure_indexes(self):
+        await self.collection.create_index(
+            [("seller_user_id", 1), ("day", 1), ("product_id", 1)], unique=True
+        )
+        await self.collection.create_index("day")
+
+    @staticmethod
+    def _sale_update(purchase: Purchase, sign: int = 1) -> UpdateOne:
+        return UpdateOne(
+            {
+                "seller_user_id": purchase.seller_user_id,
+                "day": _day(purchase.purchase_date),
+                "product_id": purchase.product_id,
+            },
+            {
+                "$inc": {
+                    "units": sign * purchase.quantity,
+                    "revenue_cents": sign * purchase.total_price_cents,
+                    "orders": sign,
+                },
+                "$set": {"product_name": purchase.product_name, "updated_at": datetime.utcnow()},
+            },
+            upsert=True,
+        )
+
+    async def record_sale(self, purchase: Purchase) -> None:
+        await self.record_sales([purchase])
+
+    async def record_sales(self, purchases: List[Purchase]) -> None:
+        if purchases:
+            await self.collection.bulk_write(
+                [self._sale_update(p) for p in purchases], ordered=False
+            )
+
+    async def remove_sales(self, purchases: List[Purchase]) -> None:
+        if purchases:
+            await self.collection.bulk_write(
+                [self._sale_update(p, sign=-1) for p in purchases], ordered=False
+            )
+
+    async def list_daily(
+        self, seller_user_id: str, start: datetime, end: datetime
+    ) -> List[DailySales]:
+        cursor = self.collection.find(
+            {"seller_user_id": seller_user_id, "day": {"$gte": start, "$lt": end}}
+        ).sort("day", 1)
+        docs = await cursor.to_list(length=None)
+        return [
+            DailySales(
+                seller_user_id=doc["seller_user_id"],
+                day=doc["day"],
+                product_id=doc["product_id"],
+                product_name=doc.get("product_name", ""),
+                units=doc["units"],
+                revenue_cents=doc["revenue_cents"],
+                orders=doc["orders"],
+            )
+            for doc in docs
+        ]
+
+    async def rebuild(self, seller_user_id: Optional[str] = None) -> int:
+        """
+        Recompute the rollups from the purchases, replacing rows in place so
+        readers never see them missing.
+
+        Not safe against concurrent record_sales/remove_sales: an increment
+        that lands between the $group and the $merge is overwritten, and one
+        for a purchase the $group already counted is applied twice. Run it
+        while no purchase events are being dispatched.
+        """
+        match = {"status": {"$ne": "cancelled"}}
+        scope = {}
+        if seller_user_id:
+            match["seller_user_id"] = seller_user_id
+            scope["seller_user_id"] = seller_user_id
+
+        started = datetime.utcnow()
+        pipeline = [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": {
+                        "seller_user_id": "$seller_user_id",
+                        "day": {"$dateTrunc": {"date": "$purchase_date", "unit": "day"}},
+                        "product_id": "$product_id",
+                    },
+                    "product_name": {"$last": "$product_name"},
+                    "units": {"$sum": "$quantity"},
+                    "revenue_cents": {"$sum": "$total_price_cents"},
+                    "orders": {"$sum": 1},
+                }
+            },
+            {
+                "$project": {
+                    "_id": 0,
+                    "seller_user_id": "$_id.seller_user_id",
+                    "day": "$_id.day",
+                    "product_id": "$_id.product_id",
+                    "product_name": 1,
+                    "units": 1,
+                    "revenue_cents": 1,
+                    "orders": 1,
+                    "updated_at": started,
+                }
+            },
+            {
+                "$merge": {
+                    "into": self.collection.name,
+                    "on": ["seller_user_id", "day", "product_id"],
+                    "whenMatched": "replace",
+                    "whenNotMatched": "insert",
+                }
+            },
+        ]
+        await self.purchases.aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+        # Rows with no purchases left, unless a sale was recorded since the rebuild began
+        await self.collection.delete_many({**scope, "updated_at": {"$not": {"$gte": started}}})
+        return await self.collection.count_documents(scope)
+
+    async def top_products(self, since: datetime, limit: int) -> List[tuple]:
+        pipeline = [
+            {"$match": {"day": {"$gte": _day(since)}}},
+            {"$group": {"_id": "$product_id", "units": {"$sum": "$units"}}},
+            {"$match": {"units": {"$gt": 0}}},
+            {"$sort": {"units": -1, "_id": 1}},
+            {"$limit": limit},
+        ]
+        docs = await self.collection.aggregate(pipeline).to_list(length=None)
+        return [(d["_id"], d["units"]) for d in docs]
@@ -0,0 +1,132 @@
+# app/infrastructure/saved_search_repo.py
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from app.config import settings
+from app.domain.entities import SavedSearch, SearchAlert
+from app.domain.repositories import SavedSearchRepository
+from app.infrastructure.mapping import DocMapper
+
+SEARCHES = DocMapper(
+    SavedSearch,
+    search_id="_id",
+    user_id="user_id",
+    query="query",
+    category="category",
+    min_price_cents="min_price_cents",
+    max_price_cents="max_price_cents",
+    created_at="created_at",
+)
+
+ALERTS = DocMapper(
+    SearchAlert,
+    alert_id="_id",
+    search_id="search_id",
+    user_id="user_id",
+    product_id="product_id",
+    product_name="product_name",
+    category="category",
+    price_cents="price_cents",
+    created_at="created_at",
+    read="read",
+)
+
+
+class MongoSavedSearchRepo(SavedSearchRepository):
+    """
+    Saved searches, keyed by search id, and the alerts they raised.
+
+    Deleting a search leaves a tombstone (`deleted_at`) for
+    SAVED_SEARCH_TOMBSTONE_SECONDS so the matcher, which follows changes
+    through `updated_at`, sees deletions too.
+    """
+
+    def __init__(self, db):
+        self.collection = db[settings.MONGO_SAVED_SEARCHES_COLLECTION]
+        self.alerts = db[settings.MONGO_SEARCH_ALERTS_COLLECTION]
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("user_id", ASCENDING), ("deleted_at", ASCENDING)])
+        await self.collection.create_index("updated_at")
+        await self.collection.create_index(
+            "deleted_at", expireAfterSeconds=settings.SAVED_SEARCH_TOMBSTONE_SECONDS
+        )
+        await self.alerts.create_index([("user_id", ASCENDING), ("created_at", DESCENDING)])
+        await self.alerts.create_index(
+            "created_at", expireAfterSeconds=settings.SEARCH_ALERT_RETENTION_DAYS * 86400
+        )
+
+    async def create(self, search: SavedSearch) -> SavedSearch:
+        await self.collection.insert_one(
+            {**SEARCHES.to_doc(search), "updated_at": search.created_at}
+        )
+        return search
+
+    async def count_by_user(self, user_id: str) -> int:
+        return await self.collection.count_documents({"user_id": user_id, "deleted_at": None})
+
+    async def list_by_user(self, user_id: str) -> List[SavedSearch]:
+        cursor = self.collection.find({"user_id": user_id, "deleted_at": None}).sort("created_at", -1)
+        return [SEARCHES.from_doc(d) async for d in cursor]
+
+    async def delete(self, search_id: str, user_id: str) -> bool:
+        now = datetime.utcnow()
+        result = await self.collection.update_one(
+            {"_id": search_id, "user_id": user_id, "deleted_at": None},
+            {"$set": {"deleted_at": now, "updated_at": now}},
+        )
+        return result.modified_count > 0
+
+    async def changes_since(
+        self, since: Optional[datetime]
+    ) -> Tuple[List[SavedSearch], List[str]]:
+        if since is None:
+            cursor = self.collection.find({"deleted_at": None})
+            return [SEARCHES.from_doc(d) async for d in cursor], []
+        created, deleted = [], []
+        async for doc in self.collection.find({"updated_at": {"$gte": since}}):
+            if doc.get("deleted_at"):
+                deleted.append(doc["_id"])
+            else:
+                created.append(SEARCHES.from_doc(doc))
+        return created, deleted
+
+    async def add_alerts(self, alerts: List[SearchAlert]) -> None:
+        if not alerts:
+            return
+        ops = [
+            UpdateOne(
+                {"_id": a.alert_id},
+                {"$setOnInsert": {
+                    "search_id": a.search_id,
+                    "user_id": a.user_id,
+                    "product_id": a.product_id,
+                    "product_name": a.product_name,
+                    "category": a.category,
+                    "price_cents": a.price_cents,
+                    "created_at": a.created_at,
+                    "read": False,
+                }},
+                upsert=True,
+            )
+            for a in alerts
+        ]
+        await self.alerts.bulk_write(ops, ordered=False)
+
+    async def list_alerts(
+        self, user_id: str, unread_only: bool = False, limit: int = 50
+    ) -> List[SearchAlert]:
+        query = {"user_id": user_id}
+        if unread_only:
+            query["read"] = False
+        cursor = self.alerts.find(query).sort("created_at", -1).limit(limit)
+        return [ALERTS.from_doc(d) async for d in cursor]
+
+    async def mark_alerts_read(self, user_id: str, alert_ids: List[str]) -> int:
+        result = await self.alerts.update_many(
+            {"_id": {"$in": alert_ids}, "user_id": user_id, "read": False},
+            {"$set": {"read": True}},
+        )
+        return result.modified_count
@@ -0,0 +1,54 @@
+# app/infrastructure/scheduler.py
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """
+    Runs an async function every `interval_seconds` inside the worker's event loop.
+
+    Started from the app's startup event and stopped from the shutdown event.
+    A failing run is logged and retried on the next tick; it never kills the loop.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval_seconds: float,
+        func: Callable[[], Awaitable[object]],
+        run_on_stop: bool = False,
+    ):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.run_on_stop = run_on_stop
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.run_on_stop:
+            await self.run_once()
+
+    async def run_once(self):
+        try:
+            await self.func()
+        except Exception:
+            logger.exception("Background job %s failed", self.name)
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self.run_once()
@@ -0,0 +1,411 @@
+# app/infrastructure/similar_items.py
+import asyncio
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from bson import ObjectId
+from scipy import sparse
+
+from app.config import settings
+from app.domain.entities import Item
+from app.infrastructure.lease import Lease
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+N_FEATURES = 1 << 18  # hashed vocabulary
+NNZ_PER_FEATURE = 4  # non-zeros per row of the random projection
+PROJECTION_SEED = 20240611
+QUERY_CHUNK_ROWS = 65_536  # rows of the matrix scored per matrix product
+
+
+def _hash(token: str) -> int:
+    # crc32, not hash(): feature ids must agree across processes and restarts
+    return zlib.crc32(token.encode()) & (N_FEATURES - 1)
+
+
+def item_terms(item: Item) -> Dict[int, float]:
+    """Hashed term counts; the name and category weigh twice the description."""
+    counts: Dict[int, float] = {}
+    fields = (
+        (item.product_name or "", 2.0),
+        (item.description or "", 1.0),
+    )
+    for text, weight in fields:
+        for token in _TOKEN.findall(text.lower()):
+            f = _hash(token)
+            counts[f] = counts.get(f, 0.0) + weight
+    if item.category:
+        f = _hash("category:" + item.category.lower())
+        counts[f] = counts.get(f, 0.0) + 2.0
+    return counts
+
+
+def _projection(dim: int) -> sparse.csr_matrix:
+    """
+    Fixed sparse random projection from the hashed vocabulary to `dim`
+    dense dimensions. Random signs keep dot products (and so cosine
+    similarity) approximately intact.
+    """
+    rng = np.random.default_rng(PROJECTION_SEED)
+    cols = rng.integers(0, dim, size=N_FEATURES * NNZ_PER_FEATURE)
+    signs = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), size=N_FEATURES * NNZ_PER_FEATURE)
+    rows = np.repeat(np.arange(N_FEATURES), NNZ_PER_FEATURE)
+    return sparse.csr_matrix(
+        (signs / np.sqrt(NNZ_PER_FEATURE), (rows, cols)), shape=(N_FEATURES, dim), dtype=np.float32
+    )
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+class SimilarItemsIndex:
+    """
+    Content-based "similar items" over listing name, description and category.
+
+    Listings become sublinear TF-IDF vectors over a hashed vocabulary,
+    projected to SIMILAR_ITEMS_DIM dimensions and L2-normalised, so cosine
+    similarity is a dot product. The catalog's vectors are one float32 matrix
+    on disk that every worker memory-maps (the pages are shared through the
+    OS page cache). Listings created since the last build live in a small
+    in-memory tail; the next build folds them in.
+
+    Builds are written to a new version directory and published by
+    replacing the CURRENT file, so readers never see a partial index.
+
+    Queries run in a worker thread (see `similar`), so they take a
+    snapshot of the rows under a lock that `add` and `load` also hold.
+    """
+
+    def __init__(self, directory: str, dim: int):
+        self.directory = directory
+        self.dim = dim
+        self.version: Optional[str] = None
+        self.base: Optional[np.ndarray] = None  # memmap, rows = listings
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}  # product id -> row (base rows first, then tail)
+        self.replaced = np.zeros(0, dtype=bool)  # base rows superseded by a tail row
+        self.tail: List[np.ndarray] = []  # rows added since the build
+        self.tail_items: List[Item] = []
+        self._tail_matrix: Optional[np.ndarray] = None
+        self.idf = np.ones(N_FEATURES, dtype=np.float32)
+        self._proj: Optional[sparse.csr_matrix] = None
+        self._lock = threading.RLock()
+
+    # ---------- vectors ----------
+
+    @property
+    def projection(self) -> sparse.csr_matrix:
+        if self._proj is None:
+            self._proj = _projection(self.dim)
+        return self._proj
+
+    def _vectorize(
+        self, terms: Sequence[Dict[int, float]], idf: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        indptr, indices, data = [0], [], []
+        for counts in terms:
+            indices.extend(counts.keys())
+            data.extend(counts.values())
+            indptr.append(len(indices))
+        x = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int64), indptr),
+            shape=(len(terms), N_FEATURES),
+        )
+        x.data = 1.0 + np.log(x.data)  # sublinear tf
+        x = x.multiply(self.idf if idf is None else idf).tocsr()
+        return _normalize((x @ self.projection).toarray())
+
+    def vector(self, item: Item) -> np.ndarray:
+        return self._vectorize([item_terms(item)])[0]
+
+    # ---------- build / load ----------
+
+    def _current_path(self) -> str:
+        return os.path.join(self.directory, "CURRENT")
+
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(self._current_path()) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def build(self, items: Iterable[Item], snapshot_time: Optional[float] = None) -> str:
+        """
+        Vectorise the whole catalog and publish it as the current version.
+
+        `snapshot_time` (epoch seconds) is when `items` were read; it names
+        the version, so listings created after it are known to be missing.
+        """
+        ids, terms = [], []
+        for item in items:
+            ids.append(item.product_id)
+            terms.append(item_terms(item))
+
+        # Document frequencies over the catalog
+        df = np.zeros(N_FEATURES, dtype=np.int64)
+        for counts in terms:
+            df[np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))] += 1
+        idf = (np.log((1 + len(ids)) / (1 + df)) + 1).astype(np.float32)
+
+        version = f"{int((snapshot_time or time.time()) * 1000)}-{os.getpid()}"
+        path = os.path.join(self.directory, version)
+        os.makedirs(path, exist_ok=True)
+        matrix = np.lib.format.open_memmap(
+            os.path.join(path, "vectors.npy"), mode="w+", dtype=np.float32,
+            shape=(len(ids), self.dim),
+        )
+        for start in range(0, len(ids), QUERY_CHUNK_ROWS):
+            matrix[start:start + QUERY_CHUNK_ROWS] = self._vectorize(
+                terms[start:start + QUERY_CHUNK_ROWS], idf
+            )
+        matrix.flush()
+        del matrix
+        np.save(os.path.join(path, "idf.npy"), idf)
+        with open(os.path.join(path, "ids.json"), "w") as f:
+            json.dump(ids, f)
+
+        tmp = self._current_path() + f".{os.getpid()}"
+        with open(tmp, "w") as f:
+            f.write(version)
+        os.replace(tmp, self._current_path())
+        self._prune(keep=version)
+        return version
+
+    def _prune(self, keep: str):
+        # Keep the previous version for workers that still have it mapped
+        versions = sorted(
+            d for d in os.listdir(self.directory)
+            if os.path.isdir(os.path.join(self.directory, d))
+        )
+        for old in versions[:-2]:
+            if old != keep:
+                shutil.rmtree(os.path.join(self.directory, old), ignore_errors=True)
+
+    def load(self) -> bool:
+        """Map the current version if it is not loaded yet; False if there is none."""
+        version = self.current_version()
+        if version is None:
+            return False
+        if version == self.version:
+            return True
+        path = os.path.join(self.directory, version)
+        base = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        with open(os.path.join(path, "ids.json")) as f:
+            ids = json.load(f)
+        idf = np.load(os.path.join(path, "idf.npy"))
+        rows = {pid: i for i, pid in enumerate(ids)}
+        with self._lock:
+            pending = self.tail_items
+            self.base, self.ids, self.version, self.idf = base, ids, version, idf
+            self.rows = rows
+            self.replaced = np.zeros(len(ids), dtype=bool)
+            self.tail, self.tail_items, self._tail_matrix = [], [], None
+            # Listings created while the build was running are not in it yet
+            for item in pending:
+                if item.product_id not in self.rows:
+                    self.add(item)
+        return True
+
+    # ---------- incremental ----------
+
+    def add(self, item: Item) -> None:
+        with self._lock:
+            vector = self.vector(item)
+            row = self.rows.get(item.product_id)
+            if row is not None and row >= len(self.ids):
+                self.tail[row - len(self.ids)] = vector  # re-added since the build
+                self.tail_items[row - len(self.ids)] = item
+            else:
+                if row is not None:
+                    self.replaced[row] = True
+                self.rows[item.product_id] = len(self.ids) + len(self.tail)
+                self.tail_items.append(item)
+                self.tail.append(vector)
+            self._tail_matrix = None
+
+    @property
+    def size(self) -> int:
+        return len(self.ids) + len(self.tail) - int(self.replaced.sum())
+
+    # ---------- queries ----------
+
+    def query(
+        self, vectors: np.ndarray, k: int, exclude: Sequence[Optional[str]] = ()
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Top-k most similar listings for each row of `vectors` (a batch).
+
+        The matrix is scored in chunks of QUERY_CHUNK_ROWS rows with one
+        matrix product per chunk; each chunk's best k+1 candidates are kept
+        with argpartition and merged at the end.
+        """
+        with self._lock:
+            base, ids, tail_items = self.base, self.ids, list(self.tail_items)
+            replaced = self.replaced.copy()
+            if self.tail and self._tail_matrix is None:
+                self._tail_matrix = np.vstack(self.tail)
+            tail_matrix = self._tail_matrix if self.tail else None
+
+        vectors = np.atleast_2d(vectors).astype(np.float32, copy=False)
+        b = len(vectors)
+        want = k + 1  # the listing itself is usually its own best match
+        cand_scores, cand_rows = [], []
+
+        def score(block: np.ndarray, offset: int, mask: Optional[np.ndarray]):
+            s = vectors @ block.T
+            if mask is not None:
+                s[:, mask] = -np.inf
+            if s.shape[1] > want:
+                top = np.argpartition(-s, want - 1, axis=1)[:, :want]
+            else:
+                top = np.broadcast_to(np.arange(s.shape[1]), (b, s.shape[1]))
+            cand_scores.append(np.take_along_axis(s, top, axis=1))
+            cand_rows.append(top + offset)
+
+        if base is not None:
+            for start in range(0, len(ids), QUERY_CHUNK_ROWS):
+                block = base[start:start + QUERY_CHUNK_ROWS]
+                mask = replaced[start:start + QUERY_CHUNK_ROWS]
+                score(block, start, mask if mask.any() else None)
+        if tail_matrix is not None:
+            score(tail_matrix, len(ids), None)
+        if not cand_scores:
+            return [[] for _ in range(b)]
+
+        all_scores = np.concatenate(cand_scores, axis=1)
+        all_rows = np.concatenate(cand_rows, axis=1)
+        order = np.argsort(-all_scores, axis=1)
+        results = []
+        for q in range(b):
+            skip = exclude[q] if q < len(exclude) else None
+            hits = []
+            for j in order[q]:
+                s = all_scores[q, j]
+                if s <= 0 or len(hits) == k:
+                    break
+                row = int(all_rows[q, j])
+                pid = ids[row] if row < len(ids) else tail_items[row - len(ids)].product_id
+                if pid != skip:
+                    hits.append((pid, float(s)))
+            results.append(hits)
+        return results
+
+    def similar(self, item: Item, k: int) -> List[Tuple[str, float]]:
+        """
+        Listings most similar to `item`, which need not be indexed yet.
+
+        Scores the whole catalog (tens of ms for large ones): call it from
+        a thread, e.g. `await asyncio.to_thread(similar_items.similar, ...)`.
+        """
+        with self._lock:
+            row = self.rows.get(item.product_id)
+            if row is None:
+                vector = self.vector(item)
+            elif row < len(self.ids):
+                vector = np.array(self.base[row])
+            else:
+                vector = self.tail[row - len(self.ids)]
+        return self.query(vector, k, exclude=[item.product_id])[0]
+
+
+class SimilarItemsJob:
+    """
+    Rebuilds the index from the items collection and keeps workers on the latest version.
+
+    One worker rebuilds, under a lease, once the published build is
+    older than SIMILAR_ITEMS_REBUILD_SECONDS. Every worker reloads every
+    SIMILAR_ITEMS_RELOAD_SECONDS and adds the listings created since the
+    build, including those created on other workers, to its tail. So a new
+    listing shows up in similar items everywhere within a reload interval.
+    """
+
+    def __init__(self, index: SimilarItemsIndex, rebuild_seconds: float):
+        self.index = index
+        self.rebuild_seconds = rebuild_seconds
+        self.lease = Lease("similar-items-rebuild", settings.SIMILAR_ITEMS_LEASE_SECONDS)
+        self._seen_until: Optional[float] = None  # creation time of the newest listing added
+        self._loaded_version: Optional[str] = None
+
+    def _age_seconds(self) -> Optional[float]:
+        version = self.index.current_version()
+        if version is None:
+            return None
+        return time.time() - int(version.split("-")[0]) / 1000
+
+    async def rebuild(self, db):
+        snapshot_time = time.time()
+        docs = await db[settings.MONGO_ITEMS_COLLECTION].find({}, _FIELDS).to_list(length=None)
+        items = [_item(d) for d in docs if d.get("productId")]
+        start = time.perf_counter()
+        version = await asyncio.to_thread(self.index.build, items, snapshot_time)
+        logger.info(
+            "Similar items index %s: %d listings in %.1fs",
+            version, len(items), time.perf_counter() - start,
+        )
+
+    def _stale(self) -> bool:
+        age = self._age_seconds()
+        return age is None or age >= self.rebuild_seconds
+
+    async def catch_up(self, db):
+        """Add the listings created since the loaded build that this worker has not indexed."""
+        if self.index.version is None:
+            return
+        since = int(self.index.version.split("-")[0]) / 1000
+        if self._seen_until is not None:
+            since = max(since, self._seen_until)
+        # ObjectIds carry the inserting client's clock; allow for skew between workers
+        first = ObjectId.from_datetime(
+            datetime.fromtimestamp(since - settings.SIMILAR_ITEMS_CLOCK_SKEW_SECONDS, timezone.utc)
+        )
+        cursor = db[settings.MONGO_ITEMS_COLLECTION].find({"_id": {"$gte": first}}, {**_FIELDS, "_id": 1})
+        async for d in cursor.sort("_id", 1):
+            self._seen_until = max(self._seen_until or 0, d["_id"].generation_time.timestamp())
+            if d.get("productId") and d["productId"] not in self.index.rows:
+                self.index.add(_item(d))
+
+    async def run(self, db):
+        """Rebuild if the published index is stale (or missing), load the latest, catch up."""
+        if self._stale() and await self.lease.acquire(db):
+            try:
+                if self._stale():  # another worker may have published meanwhile
+                    await self.rebuild(db)
+            finally:
+                await self.lease.release(db)
+        if self.index.load() and self.index.version != self._loaded_version:
+            self._loaded_version, self._seen_until = self.index.version, None
+        await self.catch_up(db)
+
+
+_FIELDS = {"productId": 1, "productName": 1, "category": 1, "description": 1}
+
+
+def _item(doc: dict) -> Item:
+    return Item(
+        product_id=doc["productId"],
+        product_name=doc.get("productName") or "",
+        category=doc.get("category") or "",
+        price_cents=0,
+        qty=0,
+        is_seller=True,
+        owner_user_id="",
+        description=doc.get("description"),
+    )
+
+
+# One index per worker process, backed by files shared between workers
+similar_items = SimilarItemsIndex(settings.SIMILAR_ITEMS_DIR, settings.SIMILAR_ITEMS_DIM)
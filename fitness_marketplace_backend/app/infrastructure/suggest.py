@@ -0,0 +1,240 @@
+# app/infrastructure/suggest.py
+import asyncio
+import heapq
+import logging
+import re
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Tuple
+
+from app.config import settings
+from app.domain.entities import Item, Suggestion
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+MAX_TEXT = 100  # longer product names are cut for display
+MAX_TOKENS = 8  # words of a suggestion that typing can start from
+PRODUCT, CATEGORY = "product", "category"
+
+
+def tokens(text: str) -> List[str]:
+    """Lower-cased, accent-free alphanumeric words."""
+    folded = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode()
+    return _TOKEN.findall(folded)
+
+
+def _keys(words: Tuple[str, ...]) -> set:
+    # Every word-aligned tail, so typing can start at any word: "adjustable
+    # dumbbell set" is found by "adj", "dumbbell s" and "set"
+    return {" ".join(words[i:]) for i in range(len(words))}
+
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index over suggestion words.
+
+    Every word-aligned tail of every suggestion's normalised text is one
+    entry in `keys` (sorted), with the suggestion it belongs to at the same
+    position in `postings`, so the suggestions matching what was typed are
+    one contiguous range found with two binary searches. Prefixes whose range is longer than `scan_limit` (short
+    ones, like "d") get their best `max_results` precomputed, so no lookup
+    ranks more than about `scan_limit` candidates.
+
+    Suggestions are capped at `max_entries`: a build keeps the most popular
+    ones and incremental adds stop once the cap is reached.
+    """
+
+    def __init__(self, max_entries: int, max_results: int, scan_limit: int):
+        self.max_entries = max_entries
+        self.max_results = max_results
+        self.scan_limit = scan_limit
+        self.entries: Dict[Tuple[str, str], int] = {}  # (kind, normalised text) -> id
+        self.text: List[str] = []
+        self.kind: List[str] = []
+        self.weight: List[float] = []
+        self.keys: List[str] = []
+        self.postings: List[int] = []
+        self.top: Dict[str, List[int]] = {}  # precomputed best ids per long-range prefix
+
+    @classmethod
+    def build(
+        cls,
+        suggestions: Iterable[Tuple[str, str, float]],
+        max_entries: int,
+        max_results: int,
+        scan_limit: int,
+    ) -> "PrefixIndex":
+        """Index `(text, kind, weight)` rows; rows with the same normalised text add up."""
+        index = cls(max_entries, max_results, scan_limit)
+        merged: Dict[Tuple[str, str], List] = {}
+        for text, kind, weight in suggestions:
+            words = tuple(tokens(text)[:MAX_TOKENS])
+            if not words:
+                continue
+            row = merged.get((kind, " ".join(words)))
+            if row is None:
+                merged[(kind, " ".join(words))] = [text.strip()[:MAX_TEXT], words, weight]
+            else:
+                row[2] += weight
+
+        kept = heapq.nlargest(max_entries, merged.items(), key=lambda kv: kv[1][2])
+        pairs = []
+        for eid, ((kind, norm), (text, words, weight)) in enumerate(kept):
+            index.entries[(kind, norm)] = eid
+            index.text.append(text)
+            index.kind.append(kind)
+            index.weight.append(weight)
+            pairs.extend((key, eid) for key in _keys(words))
+        pairs.sort()
+        index.keys = [p[0] for p in pairs]
+        index.postings = [p[1] for p in pairs]
+        index._precompute()
+        return index
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        return bisect_left(self.keys, prefix), bisect_left(self.keys, prefix + "\uffff")
+
+    def _best(self, ids: Iterable[int], k: int) -> List[int]:
+        return heapq.nlargest(k, set(ids), key=self.weight.__getitem__)
+
+    def _precompute(self):
+        # Only descend into prefixes whose range is still too long to scan
+        frontier = [""]
+        depth = 0
+        while frontier:
+            depth += 1
+            longer = []
+            for parent in frontier:
+                lo, hi = self._range(parent)
+                i = lo
+                while i < hi:
+                    if len(self.keys[i]) < depth:
+                        i += 1
+                        continue
+                    prefix = self.keys[i][:depth]
+                    end = bisect_left(self.keys, prefix + "\uffff", i, hi)
+                    if end - i > self.scan_limit:
+                        self.top[prefix] = self._best(self.postings[i:end], self.max_results)
+                        longer.append(prefix)
+                    i = end
+            frontier = longer
+
+    def add(self, text: str, kind: str, weight: float) -> bool:
+        """Add a suggestion or its weight; False if the index is full."""
+        words = tuple(tokens(text)[:MAX_TOKENS])
+        if not words:
+            return False
+        key = (kind, " ".join(words))
+        eid = self.entries.get(key)
+        if eid is not None:
+            self.weight[eid] += weight
+        else:
+            if len(self.text) >= self.max_entries:
+                return False
+            eid = self.entries[key] = len(self.text)
+            self.text.append(text.strip()[:MAX_TEXT])
+            self.kind.append(kind)
+            self.weight.append(weight)
+            for k in _keys(words):
+                at = bisect_right(self.keys, k)
+                self.keys.insert(at, k)
+                self.postings.insert(at, eid)
+        # Keep the precomputed lists of this suggestion's prefixes current
+        for k in _keys(words):
+            for n in range(1, len(k) + 1):
+                best = self.top.get(k[:n])
+                if best is None:
+                    break
+                if eid not in best:
+                    best.append(eid)
+                best.sort(key=self.weight.__getitem__, reverse=True)
+                del best[self.max_results:]
+        return True
+
+    def suggest(self, prefix: str, k: int) -> List[Suggestion]:
+        """Best `k` suggestions with a word sequence starting with what was typed."""
+        typed = " ".join(tokens(prefix))
+        if not typed:
+            return []
+        if typed in self.top and k <= self.max_results:
+            ids = self.top[typed][:k]
+        else:
+            lo, hi = self._range(typed)
+            ids = self._best(self.postings[lo:hi], k)
+        return [Suggestion(text=self.text[i], kind=self.kind[i], weight=self.weight[i]) for i in ids]
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+
+def _listing_suggestions(name: str, category: str, views: int):
+    weight = 1.0 + (views or 0)
+    if name:
+        yield name, PRODUCT, weight
+    if category:
+        yield category, CATEGORY, weight
+
+
+class Autocomplete:
+    """
+    Type-ahead over listing names and categories, served from memory.
+
+    Popularity is the number of listings plus their views. `refresh`
+    rebuilds the index from the items collection off the event loop and
+    swaps it in; listings created meanwhile are replayed onto the new
+    index. Each worker holds its own copy, so a listing created on another
+    worker shows up after the next refresh.
+    """
+
+    def __init__(self, max_entries: int, max_results: int, scan_limit: int):
+        self.max_entries = max_entries
+        self.max_results = max_results
+        self.scan_limit = scan_limit
+        self.index = PrefixIndex(max_entries, max_results, scan_limit)
+        self.added: Dict[str, Item] = {}  # listings added since the last refresh started
+
+    def add(self, item: Item) -> None:
+        self.added[item.product_id] = item
+        for text, kind, weight in _listing_suggestions(item.product_name, item.category, 0):
+            self.index.add(text, kind, weight)
+
+    def suggest(self, prefix: str, k: int) -> List[Suggestion]:
+        return self.index.suggest(prefix, k)
+
+    async def refresh(self, db):
+        self.added = {}
+        fields = {"_id": 0, "productId": 1, "productName": 1, "category": 1, "viewCount": 1}
+        docs = await db[settings.MONGO_ITEMS_COLLECTION].find(
+            {"isSeller": True}, fields
+        ).to_list(length=None)
+        rows = [
+            row
+            for d in docs
+            for row in _listing_suggestions(
+                d.get("productName") or "", d.get("category") or "", d.get("viewCount", 0)
+            )
+        ]
+        start = time.perf_counter()
+        index = await asyncio.to_thread(
+            PrefixIndex.build, rows, self.max_entries, self.max_results, self.scan_limit
+        )
+        # Listings created while the query and build ran, unless the query saw them
+        scanned = {d.get("productId") for d in docs}
+        for item in [i for pid, i in self.added.items() if pid not in scanned]:
+            for text, kind, weight in _listing_suggestions(item.product_name, item.category, 0):
+                index.add(text, kind, weight)
+        self.index = index
+        logger.info(
+            "Autocomplete index: %d suggestions from %d listings in %.2fs",
+            len(index), len(docs), time.perf_counter() - start,
+        )
+
+
+# One index per worker process
+autocomplete = Autocomplete(
+    max_entries=settings.SUGGEST_MAX_ENTRIES,
+    max_results=settings.SUGGEST_MAX_RESULTS,
+    scan_limit=settings.SUGGEST_SCAN_LIMIT,
+)
@@ -0,0 +1,124 @@
+# app/infrastructure/trending.py
+import heapq
+import time
+from datetime import datetime, timedelta, timezone
+from operator import attrgetter
+from typing import Dict, List, Optional
+
+from app.config import settings
+from app.domain.entities import Item, TrendingProduct
+from app.infrastructure.item_repo import MongoItemRepo
+from app.infrastructure.trending_repo import MongoTrendingRepo
+
+
+def _hour(ts: float) -> datetime:
+    # Naive UTC, like the stored dates
+    return datetime.fromtimestamp(ts - ts % 3600, timezone.utc).replace(tzinfo=None)
+
+
+class TrendingTracker:
+    """
+    Recent popularity from listing views and purchases.
+
+    Each worker counts the views it serves per product and hour, and
+    `merge` adds them to the shared `trending` collection in one bulk
+    write. Purchases are counted by the outbox handler, so only on the
+    worker holding the dispatcher lease; they reach the others through the
+    same collection. `refresh` pulls the top products across all workers,
+    with their listings, so `top` is a heap over an in-memory snapshot and
+    never touches MongoDB.
+    """
+
+    def __init__(self, window_hours: int, purchase_weight: float):
+        self.window_hours = window_hours
+        self.purchase_weight = purchase_weight
+        self.pending: Dict[tuple, List[int]] = {}
+        self.scores: Dict[str, TrendingProduct] = {}
+        self.items: Dict[str, Item] = {}
+        self.refreshed_at: Optional[datetime] = None
+
+    def _since(self, now: float) -> datetime:
+        """First hour of the window"""
+        return _hour(now) - timedelta(hours=self.window_hours - 1)
+
+    def _pending(self, product_id: str, hour: datetime) -> List[int]:
+        key = (product_id, hour)
+        counts = self.pending.get(key)
+        if counts is None:
+            counts = self.pending[key] = [0, 0]
+        return counts
+
+    def record_view(self, product_id: str, now: Optional[float] = None):
+        ts = now if now is not None else time.time()
+        self._pending(product_id, _hour(ts))[0] += 1
+
+    def record_purchase(self, product_id: str, units: int, at: Optional[datetime] = None):
+        ts = (at - datetime(1970, 1, 1)).total_seconds() if at else time.time()
+        hour = _hour(ts)
+        # An event delivered late may be older than the window
+        if hour >= self._since(time.time()):
+            self._pending(product_id, hour)[1] += units
+
+    async def merge(self, db):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, {}
+        try:
+            await MongoTrendingRepo(db).add_counts({k: tuple(v) for k, v in batch.items()})
+        except Exception:
+            # Keep the increments for the next merge
+            for key, (views, purchases) in batch.items():
+                counts = self.pending.setdefault(key, [0, 0])
+                counts[0] += views
+                counts[1] += purchases
+            raise
+
+    async def refresh(self, db):
+        top = await MongoTrendingRepo(db).top(
+            self._since(time.time()), self.purchase_weight, settings.TRENDING_TRACKED_PRODUCTS
+        )
+        items = await MongoItemRepo(db).get_many([t.product_id for t in top])
+        # Listings that were deleted drop out of the ranking
+        self.scores = {t.product_id: t for t in top if t.product_id in items}
+        self.items = items
+        self.refreshed_at = datetime.utcnow()
+
+    def _local_scores(self) -> List[TrendingProduct]:
+        # Counts not merged yet: all this worker has before its first refresh
+        since = self._since(time.time())
+        views: Dict[str, int] = {}
+        purchases: Dict[str, int] = {}
+        for (pid, hour), (v, p) in self.pending.items():
+            if hour >= since:
+                views[pid] = views.get(pid, 0) + v
+                purchases[pid] = purchases.get(pid, 0) + p
+        return [
+            TrendingProduct(
+                product_id=pid,
+                views=views.get(pid, 0),
+                purchases=purchases.get(pid, 0),
+                score=views.get(pid, 0) + self.purchase_weight * purchases.get(pid, 0),
+            )
+            for pid in views.keys() | purchases.keys()
+        ]
+
+    def top(self, k: int, category: Optional[str] = None) -> List[TrendingProduct]:
+        """The `k` highest scoring products, optionally within one category."""
+        if self.refreshed_at is None:
+            # Not refreshed yet: rank what this worker has seen so far
+            candidates = self._local_scores()
+        else:
+            candidates = self.scores.values()
+        if category:
+            candidates = [
+                t for t in candidates
+                if t.product_id in self.items and self.items[t.product_id].category == category
+            ]
+        return heapq.nlargest(k, candidates, key=attrgetter("score"))
+
+
+# One tracker per worker process
+trending = TrendingTracker(
+    window_hours=settings.TRENDING_WINDOW_HOURS,
+    purchase_weight=settings.TRENDING_PURCHASE_WEIGHT,
+)
@@ -0,0 +1,66 @@
+# app/infrastructure/trending_repo.py
+from datetime import datetime
+from typing import Dict, List
+
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.domain.entities import TrendingProduct
+from app.domain.repositories import TrendingRepository
+
+
+class MongoTrendingRepo(TrendingRepository):
+    """
+    One document per (product_id, hour) with view and purchase counts from
+    all workers. Hours older than the trending window expire via a TTL index,
+    so the collection stays at O(active products x window hours).
+    """
+
+    def __init__(self, db):
+        self.collection = db[settings.MONGO_TRENDING_COLLECTION]
+
+    async def ensure_indexes(self):
+        await self.collection.create_index(
+            "hour", expireAfterSeconds=(settings.TRENDING_WINDOW_HOURS + 1) * 3600
+        )
+
+    async def add_counts(self, counts: Dict[tuple, tuple]) -> None:
+        if not counts:
+            return
+        ops = [
+            UpdateOne(
+                {"_id": f"{product_id}:{hour:%Y%m%d%H}"},
+                {
+                    "$inc": {"views": views, "purchases": purchases},
+                    "$setOnInsert": {"product_id": product_id, "hour": hour},
+                },
+                upsert=True,
+            )
+            for (product_id, hour), (views, purchases) in counts.items()
+        ]
+        await self.collection.bulk_write(ops, ordered=False)
+
+    async def top(self, since: datetime, purchase_weight: float, limit: int) -> List[TrendingProduct]:
+        pipeline = [
+            {"$match": {"hour": {"$gte": since}}},
+            {
+                "$group": {
+                    "_id": "$product_id",
+                    "views": {"$sum": "$views"},
+                    "purchases": {"$sum": "$purchases"},
+                }
+            },
+            {"$addFields": {"score": {"$add": ["$views", {"$multiply": ["$purchases", purchase_weight]}]}}},
+            {"$sort": {"score": -1, "_id": 1}},
+            {"$limit": limit},
+        ]
+        docs = await self.collection.aggregate(pipeline).to_list(length=None)
+        return [
+            TrendingProduct(
+                product_id=d["_id"],
+                views=d["views"],
+                purchases=d["purchases"],
+                score=float(d["score"]),
+            )
+            for d in docs
+        ]
@@ -1,14 +1,29 @@
 # app/infrastructure/user_repo.py
-from typing import Optional, List
+from typing import Dict, Optional, List, Sequence
 from app.domain.repositories import UserRepository
 from app.domain.entities import User
+from app.infrastructure.mapping import DocMapper
 from app.db import db
 
+USERS = DocMapper(
+    User,
+    user_id="user_id",
+    name="name",
+    email="email",
+    username="username",
+    password="password",
+    status="status",
+    role="role",
+)
+
 
 class MongoUserRepo(UserRepository):
     def __init__(self):
         self.collection = db.users
         self.counter_collection = db.counters
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("user_id")
     
     async def _get_next_user_id(self) -> int:
         """Get next auto-incremented user ID."""
@@ -49,13 +64,7 @@ class MongoUserRepo(UserRepository):
         
         await self.collection.insert_one(user_doc)
         
-        return User(
-            user_id=user_id_str,
-            name=name,
-            email=email,
-            username=username,
-            password=password
-        )
+        return USERS.from_doc(user_doc)
     
     async def get_by_id(self, user_id: str) -> Optional[User]:
         doc = await self.collection.find_one({"user_id": user_id})
@@ -63,13 +72,7 @@ class MongoUserRepo(UserRepository):
         if not doc:
             return None
         
-        return User(
-            user_id=doc["user_id"],
-            name=doc["name"],
-            email=doc["email"],
-            username=doc["username"],
-            password=doc["password"]
-        )
+        return USERS.from_doc(doc)
     
     async def get_by_username(self, username: str) -> Optional[User]:
         doc = await self.collection.find_one({"username": username})
@@ -77,15 +80,7 @@ class MongoUserRepo(UserRepository):
         if not doc:
             return None
         
-        return User(
-            user_id=doc["user_id"],
-            name=doc["name"],
-            email=doc["email"],
-            username=doc["username"],
-            password=doc["password"],
-            status = doc['status'],
-            role = doc['status']
-        )
+        return USERS.from_doc(doc)
     
     async def get_by_email(self, email: str) -> Optional[User]:
         doc = await self.collection.find_one({"email": email})
@@ -93,28 +88,14 @@ class MongoUserRepo(UserRepository):
         if not doc:
             return None
         
-        return User(
-            user_id=doc["user_id"],
-            name=doc["name"],
-            email=doc["email"],
-            username=doc["username"],
-            password=doc["password"]
-        )
+        return USERS.from_doc(doc)
     
     async def list_all(self) -> List[User]:
         cursor = self.collection.find({})
         users = []
         
         async for doc in cursor:
-            users.append(User(
-                user_id=doc["user_id"],
-                name=doc["name"],
-                email=doc["email"],
-                username=doc["username"],
-                password=doc["password"],
-                status = doc['status'],
-                role = doc['role']
-            ))
+            users.append(USERS.from_doc(doc))
         
         return users
     
@@ -133,4 +114,12 @@ class MongoUserRepo(UserRepository):
 
     async def update_status(self,user_id,new_status) -> bool:
         result = await self.collection.update_one({"user_id":user_id},{"$set": {"status":new_status}})
-        return result.modified_count > 0
\ No newline at end of file
+        return result.modified_count > 0
+
+    async def get_names(self, user_ids: Sequence[str]) -> Dict[str, str]:
+        if not user_ids:
+            return {}
+        cursor = self.collection.find(
+            {"user_id": {"$in": list(set(user_ids))}}, {"_id": 0, "user_id": 1, "name": 1}
+        )
+        return {doc["user_id"]: doc.get("name") async for doc in cursor}
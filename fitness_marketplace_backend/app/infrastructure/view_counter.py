@@ -0,0 +1,78 @@
+# app/infrastructure/view_counter.py
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from app.infrastructure.item_repo import MongoItemRepo
+
+
+@dataclass
+class ViewCounterStats:
+    pending_products: int
+    pending_views: int
+    flush_lag_seconds: float  # age of the oldest view not written yet
+    last_batch_size: int  # products in the last bulk write
+    last_flush_ms: float
+    flushes: int
+    views_flushed: int
+    failed_flushes: int
+
+
+class ViewCounter:
+    """
+    Per-product view counts, coalesced in memory and written periodically.
+
+    Every view of a product between two flushes becomes one `$inc` in a
+    single bulk_write, so the write load follows the number of distinct
+    products viewed rather than the number of page views.
+    """
+
+    def __init__(self):
+        self.pending: Dict[str, int] = {}
+        self._oldest: Optional[float] = None
+        self.last_batch_size = 0
+        self.last_flush_ms = 0.0
+        self.flushes = 0
+        self.views_flushed = 0
+        self.failed_flushes = 0
+
+    def record(self, product_id: str, n: int = 1):
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        self.pending[product_id] = self.pending.get(product_id, 0) + n
+
+    async def flush(self, db):
+        if not self.pending:
+            return
+        batch, oldest = self.pending, self._oldest
+        self.pending, self._oldest = {}, None
+        start = time.perf_counter()
+        try:
+            await MongoItemRepo(db).add_views(batch)
+        except Exception:
+            # Keep the counts for the next flush
+            self.failed_flushes += 1
+            for pid, n in batch.items():
+                self.pending[pid] = self.pending.get(pid, 0) + n
+            self._oldest = oldest
+            raise
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+        self.last_batch_size = len(batch)
+        self.flushes += 1
+        self.views_flushed += sum(batch.values())
+
+    def stats(self) -> ViewCounterStats:
+        return ViewCounterStats(
+            pending_products=len(self.pending),
+            pending_views=sum(self.pending.values()),
+            flush_lag_seconds=time.monotonic() - self._oldest if self._oldest else 0.0,
+            last_batch_size=self.last_batch_size,
+            last_flush_ms=self.last_flush_ms,
+            flushes=self.flushes,
+            views_flushed=self.views_flushed,
+            failed_flushes=self.failed_flushes,
+        )
+
+
+# One counter per worker process
+view_counter = ViewCounter()
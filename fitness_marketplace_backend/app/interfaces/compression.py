@@ -0,0 +1,203 @@
+# app/interfaces/compression.py
+"""
+Response compression: brotli when the client takes it and the `brotli`
+package is installed, gzip otherwise.
+
+CompressionMiddleware compresses complete responses (a single body
+message) of compressible types once they reach COMPRESSION_MIN_BYTES.
+Streams such as server-sent events and responses that already carry a
+Content-Encoding pass through untouched. The level follows the size:
+small bodies get a high level for little CPU, large catalog pages a low
+one, and bodies above COMPRESSION_THREAD_BYTES are compressed off the
+event loop.
+
+Cached responses should not pay for compression on every hit: build a
+Precompressed once with the cached body and serve it with
+`precompressed_response`.
+"""
+import asyncio
+import gzip
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+
+from fastapi import Response
+
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional: without it every client gets gzip
+    brotli = None
+
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+_COMPRESSIBLE = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+# (largest body, gzip level, brotli quality): cheaper levels for larger bodies
+_LEVELS = (
+    (64 * 1024, 6, 5),
+    (1024 * 1024, 4, 4),
+    (float("inf"), 1, 1),
+)
+
+
+@dataclass
+class CompressionStats:
+    compressed: int = 0  # responses compressed by the middleware
+    precompressed: int = 0  # responses served from a cached compressed body
+    skipped_small: int = 0  # below COMPRESSION_MIN_BYTES
+    bytes_in: int = 0  # uncompressed size of compressed and precompressed responses
+    bytes_out: int = 0  # what was sent for them
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+    def record(self, size: int, sent: int, precompressed: bool = False) -> None:
+        if precompressed:
+            self.precompressed += 1
+        else:
+            self.compressed += 1
+        self.bytes_in += size
+        self.bytes_out += sent
+
+
+# Per worker process
+compression_stats = CompressionStats()
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """The best encoding we offer that the Accept-Encoding header allows, or None"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding] = q
+    wildcard = accepted.get("*", 0.0)
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """`level` defaults to one chosen by the body's size"""
+    if level is None:
+        for limit, gzip_level, brotli_quality in _LEVELS:
+            if len(body) <= limit:
+                level = brotli_quality if encoding == "br" else gzip_level
+                break
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class Precompressed:
+    """A cached body with every encoding computed once, at the best level"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.encoded = {
+            encoding: compress(body, encoding, level=11 if encoding == "br" else 9)
+            for encoding in ENCODINGS
+        }
+
+
+def precompressed_response(
+    cached: Precompressed,
+    accept_encoding: str,
+    headers: Mapping[str, str],
+    media_type: str = "application/json",
+) -> Response:
+    headers = {**headers, "Vary": "Accept-Encoding"}
+    encoding = negotiate(accept_encoding)
+    if encoding is None:
+        return Response(cached.body, media_type=media_type, headers=headers)
+    sent = cached.encoded[encoding]
+    compression_stats.record(len(cached.body), len(sent), precompressed=True)
+    headers["Content-Encoding"] = encoding
+    return Response(sent, media_type=media_type, headers=headers)
+
+
+class CompressionMiddleware:
+    """ASGI middleware; see the module docstring"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                if b"content-encoding" in headers or not content_type.startswith(_COMPRESSIBLE):
+                    passthrough = True
+                    await send(start)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if start is None or message.get("more_body", False):
+                # Streamed: sent as it comes
+                passthrough = True
+                if start is not None:
+                    await send(start)
+                await send(message)
+                return
+            if len(body) < settings.COMPRESSION_MIN_BYTES:
+                compression_stats.skipped_small += 1
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) > settings.COMPRESSION_THREAD_BYTES:
+                compressed = await asyncio.to_thread(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            compression_stats.record(len(body), len(compressed))
+            headers = [
+                (k, v) for k, v in start.get("headers", [])
+                if k.lower() not in (b"content-length", b"vary")
+            ]
+            vary = [v for k, v in start.get("headers", []) if k.lower() == b"vary"]
+            if not any(b"accept-encoding" in v.lower() for v in vary):
+                vary.append(b"Accept-Encoding")
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", b", ".join(vary)),
+            ]
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
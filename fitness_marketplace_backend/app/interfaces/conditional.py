@@ -0,0 +1,71 @@
+# app/interfaces/conditional.py
+"""
+Conditional GET: validators for a response and the 304 that answers a
+client still holding it.
+
+Routes build their Validators before loading anything: from the
+resource's `updatedAt`, or for lists from the collection's change counter
+(app/infrastructure/collection_versions.py). A client that revalidates
+then costs one small read, with no query for the body and no
+serialising.
+
+View counts are not versioned: flushes write them every few seconds and
+would make every list stale. A listing's own ETag includes its count (and
+it sends no Last-Modified, which could not), but list responses show
+counts as of their last change.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from app.domain.entities import CollectionVersion
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison, as If-None-Match asks for"""
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags or "*" in tags
+
+
+@dataclass(frozen=True, slots=True)
+class Validators:
+    etag: str
+    last_modified: Optional[datetime] = None  # naive UTC, like the stored dates
+
+    @classmethod
+    def of_collection(cls, version: CollectionVersion) -> "Validators":
+        return cls(f'W/"{version.name}-{version.version}"', version.updated_at)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        # no-cache: stored, but revalidated before every use
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(
+                self.last_modified.replace(tzinfo=timezone.utc), usegmt=True
+            )
+        return headers
+
+    def not_modified(self, request: Request) -> bool:
+        """If-None-Match wins; If-Modified-Since only counts without it"""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, self.etag)
+        if_modified_since = request.headers.get("if-modified-since")
+        if not if_modified_since or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        # HTTP dates have whole seconds
+        modified = self.last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+        return modified <= since
+
+    def response(self) -> Response:
+        return Response(status_code=304, headers=self.headers)
@@ -0,0 +1,110 @@
+# app/interfaces/homepage.py
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.application.use_cases import BuildHomepage, HomepageSections
+from app.config import settings
+from app.domain.entities import Item
+from app.infrastructure.item_repo import MongoItemRepo
+from app.infrastructure.sales_rollup_repo import MongoSalesRollupRepo
+from app.infrastructure.trending import trending
+from app.interfaces.compression import Precompressed
+from app.interfaces.schemas import (
+    BestSellerItemOut, CategoryBestSellersOut, HomepageOut, ItemOut, TopRatedItemOut,
+    TrendingItemOut
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HomepageSnapshot:
+    body: Precompressed  # JSON, with its gzip and brotli encodings
+    etag: str
+    built_at: datetime
+
+
+def _item_fields(i: Item) -> dict:
+    return dict(
+        productId=i.product_id,
+        productName=i.product_name,
+        category=i.category,
+        priceCents=i.price_cents,
+        qty=i.qty,
+        ownerUserId=i.owner_user_id,
+        isSeller=i.is_seller,
+        description=i.description,
+        photos=i.photos,
+        avgRating=i.avg_rating,
+        viewCount=i.view_count,
+        updatedAt=i.updated_at,
+        ratingCount=i.rating_count,
+    )
+
+
+def homepage_out(sections: HomepageSections) -> HomepageOut:
+    return HomepageOut(
+        topRated=[
+            TopRatedItemOut(**_item_fields(i), ratingScore=i.rating_score)
+            for i in sections.top_rated
+        ],
+        newArrivals=[ItemOut(**_item_fields(i)) for i in sections.new_arrivals],
+        trending=[
+            TrendingItemOut(**_item_fields(i), views=t.views, purchases=t.purchases, score=t.score)
+            for i, t in sections.trending
+        ],
+        bestSellers=[
+            CategoryBestSellersOut(
+                category=category,
+                items=[BestSellerItemOut(**_item_fields(i), unitsSold=units) for i, units in rows],
+            )
+            for category, rows in sections.best_sellers.items()
+        ],
+    )
+
+
+class HomepageCache:
+    """
+    The homepage, built every HOMEPAGE_REFRESH_SECONDS and kept as ready
+    bytes: serialised and compressed once per build, so a request only picks
+    the encoding and compares ETags. The ETag is a hash of the JSON, so
+    workers that built the same content agree on it.
+    """
+
+    def __init__(self):
+        self.snapshot: Optional[HomepageSnapshot] = None
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, db):
+        uc = BuildHomepage(
+            MongoItemRepo(db),
+            MongoSalesRollupRepo(db),
+            trending,
+            section_size=settings.HOMEPAGE_SECTION_SIZE,
+            best_seller_days=settings.HOMEPAGE_BEST_SELLER_DAYS,
+            best_sellers_per_category=settings.HOMEPAGE_BEST_SELLERS_PER_CATEGORY,
+        )
+        body = homepage_out(await uc.execute()).model_dump_json().encode()
+        if self.snapshot and self.snapshot.body.body == body:
+            return  # unchanged: keep the ETag clients already hold
+        self.snapshot = HomepageSnapshot(
+            body=Precompressed(body),
+            etag='"' + hashlib.sha1(body).hexdigest()[:20] + '"',
+            built_at=datetime.utcnow(),
+        )
+
+    async def get(self, db) -> HomepageSnapshot:
+        """The current snapshot; builds the first one if the refresh job has not yet."""
+        if self.snapshot is None:
+            async with self._lock:
+                if self.snapshot is None:
+                    await self.refresh(db)
+        return self.snapshot
+
+
+# One snapshot per worker process
+homepage = HomepageCache()
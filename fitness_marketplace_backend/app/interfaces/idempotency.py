@@ -0,0 +1,77 @@
+# app/interfaces/idempotency.py
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.infrastructure.database import get_database
+from app.infrastructure.idempotency import (
+    MongoIdempotencyStore,
+    StoredResponse,
+    IdempotencyInProgress,
+    IdempotencyKeyReused,
+    IdempotencyOutcomeUnknown,
+    NotApplied,
+    fingerprint,
+)
+
+
+# Dependency
+def idempotency_store() -> MongoIdempotencyStore:
+    return MongoIdempotencyStore(get_database())
+
+
+async def idempotent(
+    store: MongoIdempotencyStore,
+    key: Optional[str],
+    scope: str,
+    payload: Any,
+    operation: Callable[[], Awaitable[Any]],
+    status_code: int = status.HTTP_200_OK,
+):
+    """
+    Run a route body at most once per Idempotency-Key.
+
+    Without a key the operation runs as usual. With a key, the first
+    successful response is stored and replayed for repeats of the same
+    request. A 4xx is raised before anything is written, so it releases
+    the key and the client can retry once it is fixed. After a 5xx or an
+    unexpected error the outcome is unknown: retries with the key get 409
+    and the client checks its orders before trying a new key.
+    """
+    if not key:
+        return await operation()
+
+    async def run() -> StoredResponse:
+        try:
+            result = await operation()
+        except HTTPException as e:
+            if e.status_code >= 500:
+                raise
+            raise NotApplied(e) from e
+        return StoredResponse(status_code, jsonable_encoder(result))
+
+    try:
+        record, replayed = await store.run(key, scope, fingerprint(payload), run)
+    except NotApplied as e:
+        raise e.args[0]
+    except IdempotencyKeyReused:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request"
+        )
+    except IdempotencyInProgress:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed"
+        )
+    except IdempotencyOutcomeUnknown:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An earlier request with this Idempotency-Key failed and may have been "
+                   "applied; check before retrying with a new key"
+        )
+
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return JSONResponse(status_code=record.status_code, content=record.body, headers=headers)
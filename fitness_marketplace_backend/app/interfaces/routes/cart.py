@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException
+from typing import List, Optional
 
 from app.infrastructure.cart_repo import MongoCartRepo
 from app.infrastructure.item_repo import MongoItemRepo
+from app.infrastructure.idempotency import MongoIdempotencyStore
+from app.interfaces.idempotency import idempotency_store, idempotent
 from app.interfaces.schemas import CartItemIn, CartItemOut
+from app.interfaces.serializers import cart_line_row, json_rows
 from app.application.cart import (
     AddToCart, GetCart, RemoveFromCart, ClearCart
 )
@@ -25,53 +28,72 @@ def item_repo() -> MongoItemRepo:
 async def add_cart_item(
         user_id: str,
         item: CartItemIn,
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
         c_repo: MongoCartRepo = Depends(cart_repo),
-        i_repo: MongoItemRepo = Depends(item_repo)
+        i_repo: MongoItemRepo = Depends(item_repo),
+        store: MongoIdempotencyStore = Depends(idempotency_store)
 ):
-    uc = AddToCart(c_repo, i_repo)
-    result, err = await uc.execute(user_id, item.productId, item.quantity)
-
-    if err:
-        raise HTTPException(400, err)
-
-    return CartItemOut(
-        userId=result.user_id,
-        productId=result.product_id,
-        productName=result.product_name,
-        priceCents=result.price_cents,
-        quantity=result.quantity,
-        sellerUserId=result.seller_user_id,
-        photo=result.photo
+    async def add():
+        uc = AddToCart(c_repo, i_repo)
+        result, err = await uc.execute(user_id, item.productId, item.quantity)
+
+        if err:
+            raise HTTPException(400, err)
+
+        return CartItemOut(
+            userId=result.user_id,
+            productId=result.product_id,
+            productName=result.product_name,
+            priceCents=result.price_cents,
+            quantity=result.quantity,
+            sellerUserId=result.seller_user_id,
+            photo=result.photo
+        )
+
+    return await idempotent(
+        store, idempotency_key, f"cart-add:{user_id}", item.model_dump(), add
     )
 
 
 @router.get("/{user_id}", response_model=List[CartItemOut])
-async def get_cart(user_id: str, repo: MongoCartRepo = Depends(cart_repo)):
-    uc = GetCart(repo)
-    items = await uc.execute(user_id)
-    return [
-        CartItemOut(
-            userId=i.user_id,
-            productId=i.product_id,
-            productName=i.product_name,
-            priceCents=i.price_cents,
-            quantity=i.quantity,
-            sellerUserId=i.seller_user_id,
-            photo=i.photo
-        )
-        for i in items
-    ]
+async def get_cart(
+        user_id: str,
+        repo: MongoCartRepo = Depends(cart_repo),
+        i_repo: MongoItemRepo = Depends(item_repo)
+):
+    uc = GetCart(repo, i_repo)
+    lines = await uc.execute(user_id)
+    return json_rows(cart_line_row(l) for l in lines)
 
 
 @router.delete("/{user_id}/{product_id}")
-async def remove_item(user_id: str, product_id: str, repo: MongoCartRepo = Depends(cart_repo)):
-    uc = RemoveFromCart(repo)
-    await uc.execute(user_id, product_id)
-    return {"ok": True}
+async def remove_item(
+        user_id: str,
+        product_id: str,
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+        repo: MongoCartRepo = Depends(cart_repo),
+        store: MongoIdempotencyStore = Depends(idempotency_store)
+):
+    async def remove():
+        uc = RemoveFromCart(repo)
+        await uc.execute(user_id, product_id)
+        return {"ok": True}
+
+    return await idempotent(
+        store, idempotency_key, f"cart-remove:{user_id}", {"productId": product_id}, remove
+    )
 
 
 @router.delete("/{user_id}")
-async def clear_cart(user_id: str, repo: MongoCartRepo = Depends(cart_repo)):
-    uc = ClearCart(repo)
-    await uc.execute(user_id)
-    return {"ok": True}
+async def clear_cart(
+        user_id: str,
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+        repo: MongoCartRepo = Depends(cart_repo),
+        store: MongoIdempotencyStore = Depends(idempotency_store)
+):
+    async def clear():
+        uc = ClearCart(repo)
+        await uc.execute(user_id)
+        return {"ok": True}
+
+    return await idempotent(store, idempotency_key, f"cart-clear:{user_id}", {}, clear)
@@ -1,11 +1,23 @@
-from fastapi import APIRouter, UploadFile, File, Form, Query, Depends, HTTPException
-from typing import Optional, List
+import asyncio
+from fastapi import APIRouter, UploadFile, File, Form, Query, Depends, HTTPException, Request, Response
+from typing import Literal, Optional, List
 from datetime import datetime
 
-from app.application.use_cases import CreateItem, ListItems, ListItemsByOwner
+from app.application.use_cases import CreateItem, ListItems, ListItemsByOwner, RebuildProductRatings
+from app.domain.entities import Item
+from app.infrastructure.collection_versions import MongoCollectionVersions
 from app.infrastructure.item_repo import MongoItemRepo
+from app.infrastructure.related_items_repo import MongoRelatedItemsRepo
 from app.infrastructure.local_storage_service import LocalStorageService
-from app.interfaces.schemas import ItemOut
+from app.infrastructure.trending import trending
+from app.infrastructure.view_counter import view_counter
+from app.infrastructure.similar_items import similar_items
+from app.infrastructure.suggest import autocomplete
+from app.interfaces.compression import precompressed_response
+from app.interfaces.conditional import Validators, etag_matches
+from app.interfaces.homepage import homepage
+from app.interfaces.schemas import HomepageOut, ItemOut, TrendingItemOut, RelatedItemOut, SimilarItemOut, SuggestionOut
+from app.interfaces.serializers import ITEM_FIELDS, Fieldset, SparseFields, item_row, json_rows
 from app.db import db
 from app.config import settings
 import logging
@@ -16,9 +28,22 @@ router = APIRouter(prefix="/api/v1/listings", tags=["Listings"])
 def item_repo() -> MongoItemRepo:
     return MongoItemRepo(db=db)
 
+def related_items_repo() -> MongoRelatedItemsRepo:
+    return MongoRelatedItemsRepo(db=db)
+
 def storage() -> LocalStorageService:
     return LocalStorageService()
 
+def collection_versions() -> MongoCollectionVersions:
+    return MongoCollectionVersions(db=db)
+
+
+def _item_validators(i: Item) -> Validators:
+    # The listing's version plus its view count, which writes do not version.
+    # No Last-Modified: updatedAt misses view count changes the ETag catches
+    version = f"{i.updated_at:%Y%m%d%H%M%S%f}" if i.updated_at else "0"
+    return Validators(f'W/"{version}-{i.view_count}"')
+
 
 @router.post("", response_model=ItemOut)
 async def create_listing(
@@ -37,7 +62,7 @@ async def create_listing(
     contents = [await f.read() for f in photos]
     names = [f.filename for f in photos]
 
-    uc = CreateItem(repo, store)
+    uc = CreateItem(repo, store, indexers=[similar_items, autocomplete])
     created = await uc.execute(
         product_id=productId,
         product_name=productName,
@@ -66,14 +91,89 @@ async def create_listing(
 
 @router.get("", response_model=list[ItemOut])
 async def list_listings(
+    request: Request,
     isSeller: Optional[bool] = Query(None),
     category: Optional[str] = Query(None),
+    sort: Optional[Literal["rating", "price", "newest"]] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    fields: Optional[Fieldset] = Depends(SparseFields(ITEM_FIELDS)),
     repo: MongoItemRepo = Depends(item_repo),
+    versions: MongoCollectionVersions = Depends(collection_versions),
 ):
-    items = await repo.list(is_seller=isSeller, category=category)
+    """
+    `sort=rating` orders by the listings' Bayesian rating score, `price` cheapest first.
+    Cards can ask for `fields=productId,productName,priceCents,photos,avgRating`.
+    Answers 304 while no listing has changed since the client's ETag.
+    """
+    # Versioned before loading: the tag is never newer than the rows
+    validators = Validators.of_collection(await versions.get(settings.MONGO_ITEMS_COLLECTION))
+    if validators.not_modified(request):
+        return validators.response()
+
+    uc = ListItems(repo)
+    items = await uc.execute(
+        is_seller=isSeller, category=category, sort=sort, limit=limit, offset=offset,
+        fields=fields.attributes if fields else None
+    )
+
+    return json_rows((item_row(i) for i in items), validators.headers, fields)
+
+
+@router.post("/ratings/rebuild")
+async def rebuild_ratings(
+    product_id: Optional[str] = Query(None, alias="productId"),
+    repo: MongoItemRepo = Depends(item_repo),
+):
+    """Recompute rating scores from reviews (all listings, or one listing)"""
+    uc = RebuildProductRatings(repo)
+    items = await uc.execute(product_id=product_id)
+    return {"items": items}
+
+
+@router.get("/home", response_model=None, responses={200: {"model": HomepageOut}})
+async def get_homepage(request: Request):
+    """Curated homepage sections, served from a snapshot rebuilt every HOMEPAGE_REFRESH_SECONDS"""
+    snapshot = await homepage.get(db)
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": f"public, max-age={settings.HOMEPAGE_MAX_AGE_SECONDS}",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match", ""), snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return precompressed_response(
+        snapshot.body, request.headers.get("accept-encoding", ""), headers
+    )
+
+
+@router.get("/suggest", response_model=list[SuggestionOut])
+async def suggest(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=settings.SUGGEST_MAX_RESULTS),
+):
+    """Type-ahead: product names and categories with a word starting with `prefix`"""
+    return [
+        SuggestionOut(text=s.text, kind=s.kind, weight=s.weight)
+        for s in autocomplete.suggest(prefix, limit)
+    ]
+
+
+@router.get("/trending", response_model=list[TrendingItemOut])
+async def list_trending(
+    limit: int = Query(20, ge=1, le=100),
+    category: Optional[str] = Query(None),
+    repo: MongoItemRepo = Depends(item_repo),
+):
+    """Most viewed and bought listings over the last TRENDING_WINDOW_HOURS"""
+    top = trending.top(limit, category=category)
+    items = trending.items
+    missing = [t.product_id for t in top if t.product_id not in items]
+    if missing:
+        items = {**items, **await repo.get_many(missing)}
 
     return [
-        ItemOut(
+        TrendingItemOut(
             productId=i.product_id,
             productName=i.product_name,
             category=i.category,
@@ -83,37 +183,109 @@ async def list_listings(
             isSeller=i.is_seller,
             description=i.description,
             photos=i.photos,
-            avgRating=getattr(i, "avg_rating", 0)
+            avgRating=getattr(i, "avg_rating", 0),
+            views=t.views,
+            purchases=t.purchases,
+            score=t.score
         )
-        for i in items
+        for t in top
+        if (i := items.get(t.product_id))
     ]
 
 
 @router.get("/{productId}", response_model=ItemOut)
-async def get_item(productId: str, repo: MongoItemRepo = Depends(item_repo)):
-    items = await repo.list()
-    for i in items:
-        if i.product_id == productId:
-            return ItemOut(
-                productId=i.product_id,
-                productName=i.product_name,
-                category=i.category,
-                priceCents=i.price_cents,
-                qty=i.qty,
-                ownerUserId=i.owner_user_id,
-                isSeller=i.is_seller,
-                description=i.description,
-                photos=i.photos,
-                avgRating=getattr(i, "avg_rating", 0)
-            )
-    raise HTTPException(status_code=404, detail="Item not found")
+async def get_item(
+    productId: str,
+    request: Request,
+    response: Response,
+    repo: MongoItemRepo = Depends(item_repo),
+):
+    """Answers 304 while the listing and its view count are as the client's ETag says"""
+    if "if-none-match" in request.headers:
+        # Only what the validators need; the listing itself is loaded if they fail
+        probe = await repo.get_by_id(productId, fields=("updated_at", "view_count"))
+        if probe is not None and (validators := _item_validators(probe)).not_modified(request):
+            view_counter.record(productId)
+            trending.record_view(productId)
+            return validators.response()
+
+    i = await repo.get_by_id(productId)
+    if i is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    view_counter.record(productId)
+    trending.record_view(productId)
+    response.headers.update(_item_validators(i).headers)
+    return ItemOut(
+        productId=i.product_id,
+        productName=i.product_name,
+        category=i.category,
+        priceCents=i.price_cents,
+        qty=i.qty,
+        ownerUserId=i.owner_user_id,
+        isSeller=i.is_seller,
+        description=i.description,
+        photos=i.photos,
+        avgRating=getattr(i, "avg_rating", 0),
+        viewCount=i.view_count,
+        ratingCount=i.rating_count,
+        updatedAt=i.updated_at
+    )
+
+@router.get("/{productId}/related", response_model=list[RelatedItemOut])
+async def get_related_items(
+    productId: str,
+    limit: int = Query(settings.RELATED_ITEMS_TOP_N, ge=1, le=settings.RELATED_ITEMS_TOP_N),
+    repo: MongoRelatedItemsRepo = Depends(related_items_repo),
+):
+    """Frequently bought together, precomputed by the co-purchase job"""
+    related = await repo.get_related(productId, limit)
+    return [
+        RelatedItemOut(
+            productId=r.product_id,
+            productName=r.product_name,
+            category=r.category,
+            priceCents=r.price_cents,
+            photo=r.photo,
+            score=r.score,
+            coPurchases=r.co_purchases
+        )
+        for r in related
+    ]
+
+@router.get("/{productId}/similar", response_model=list[SimilarItemOut])
+async def get_similar_items(
+    productId: str,
+    limit: int = Query(10, ge=1, le=50),
+    repo: MongoItemRepo = Depends(item_repo),
+):
+    """Listings with similar names, descriptions and category (works without any sales)"""
+    item = await repo.get_by_id(productId)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    # Scores the whole catalog: off the event loop
+    hits = await asyncio.to_thread(similar_items.similar, item, limit)
+    items = await repo.get_many([pid for pid, _ in hits])
+    return [
+        SimilarItemOut(
+            productId=i.product_id,
+            productName=i.product_name,
+            category=i.category,
+            priceCents=i.price_cents,
+            qty=i.qty,
+            ownerUserId=i.owner_user_id,
+            isSeller=i.is_seller,
+            description=i.description,
+            photos=i.photos,
+            avgRating=getattr(i, "avg_rating", 0),
+            similarity=round(score, 4)
+        )
+        for pid, score in hits
+        if (i := items.get(pid))
+    ]
 
 @router.get("/owner/{ownerUserId}", response_model=list[ItemOut])
 async def list_by_owner(ownerUserId: str, repo: MongoItemRepo = Depends(item_repo)):
     uc = ListItemsByOwner(repo)
     items = await uc.execute(owner_user_id=ownerUserId)
-    return [ItemOut(
-        productId=i.product_id, productName=i.product_name, category=i.category,
-        priceCents=i.price_cents, qty=i.qty, ownerUserId=i.owner_user_id,
-        isSeller=i.is_seller, description=i.description, photos=i.photos
-    ) for i in items]
+    return json_rows(item_row(i) for i in items)
@@ -0,0 +1,51 @@
+# app/interfaces/routes/metrics.py
+from fastapi import APIRouter
+
+from app.infrastructure.notifications import seller_notifications
+from app.infrastructure.outbox import dispatcher
+from app.infrastructure.view_counter import view_counter
+from app.interfaces.compression import compression_stats
+from app.interfaces.schemas import (
+    MetricsOut,
+    ViewCounterMetricsOut,
+    OutboxMetricsOut,
+    NotificationMetricsOut,
+    CompressionMetricsOut
+)
+
+router = APIRouter(prefix="/api/v1/metrics", tags=["Metrics"])
+
+
+@router.get("", response_model=MetricsOut)
+async def get_metrics():
+    """Counters of this worker's background components"""
+    views = view_counter.stats()
+    return MetricsOut(
+        viewCounter=ViewCounterMetricsOut(
+            pendingProducts=views.pending_products,
+            pendingViews=views.pending_views,
+            flushLagSeconds=round(views.flush_lag_seconds, 3),
+            lastBatchSize=views.last_batch_size,
+            lastFlushMs=round(views.last_flush_ms, 3),
+            flushes=views.flushes,
+            viewsFlushed=views.views_flushed,
+            failedFlushes=views.failed_flushes
+        ),
+        outbox=OutboxMetricsOut(
+            dispatched=dispatcher.dispatched,
+            failed=dispatcher.failed
+        ),
+        sellerNotifications=NotificationMetricsOut(
+            subscribers=seller_notifications.subscriber_count,
+            published=seller_notifications.published,
+            dropped=seller_notifications.dropped
+        ),
+        compression=CompressionMetricsOut(
+            compressed=compression_stats.compressed,
+            precompressed=compression_stats.precompressed,
+            skippedSmall=compression_stats.skipped_small,
+            bytesIn=compression_stats.bytes_in,
+            bytesOut=compression_stats.bytes_out,
+            bytesSaved=compression_stats.bytes_saved
+        )
+    )
@@ -1,17 +1,35 @@
 # app/interfaces/routes/purchase.py
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from datetime import date, datetime
 
 from app.application.use_cases import (
     PurchaseItem,
     GetPurchasesByBuyer,
     GetPurchasesBySeller,
-    GetPurchaseById
+    GetPurchaseById,
+    GetSellerSalesStats,
+    RebuildSalesRollups,
+    UpdatePurchaseStatus
 )
+from app.domain.entities import PurchaseStatus
 from app.infrastructure.purchase_repo import MongoPurchaseRepo
 from app.infrastructure.item_repo import MongoItemRepo
+from app.infrastructure.sales_rollup_repo import MongoSalesRollupRepo
 from app.infrastructure.database import get_database
-from app.interfaces.schemas import PurchaseIn, PurchaseOut
+from app.infrastructure.idempotency import MongoIdempotencyStore
+from app.infrastructure.flash_sale import flash_sales
+from app.infrastructure.notifications import seller_notifications
+from app.config import settings
+from app.interfaces.idempotency import idempotency_store, idempotent
+from app.interfaces.schemas import (
+    PurchaseIn, PurchaseOut, PurchaseStatusIn, SellerStatsOut, SalesDayOut, TopProductOut,
+    FlashSaleIn, FlashSaleStatsOut
+)
+from app.interfaces.serializers import (
+    PURCHASE_FIELDS, Fieldset, SparseFields, json_rows, purchase_row
+)
 
 router = APIRouter(prefix="/api/v1/purchases", tags=["Purchases"])
 
@@ -23,100 +41,239 @@ def purchase_repo() -> MongoPurchaseRepo:
 def item_repo() -> MongoItemRepo:
     return MongoItemRepo(get_database())
 
+def sales_rollup_repo() -> MongoSalesRollupRepo:
+    return MongoSalesRollupRepo(get_database())
+
+
+def status_filter(
+    status_: Optional[List[str]] = Query(None, alias="status")
+) -> Optional[List[str]]:
+    """?status=pending&status=shipped; "open" stands for every not-yet-finished status"""
+    if not status_:
+        return None
+    statuses = []
+    for s in status_:
+        if s == "open":
+            statuses.extend(PurchaseStatus.OPEN)
+        elif s in PurchaseStatus.ALL:
+            statuses.append(s)
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown status '{s}'"
+            )
+    return statuses
+
 
 @router.post("/{buyer_user_id}", response_model=PurchaseOut, status_code=status.HTTP_201_CREATED)
 async def create_purchase(
     buyer_user_id: str,
     purchase_data: PurchaseIn,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     p_repo: MongoPurchaseRepo = Depends(purchase_repo),
-    i_repo: MongoItemRepo = Depends(item_repo)
+    i_repo: MongoItemRepo = Depends(item_repo),
+    store: MongoIdempotencyStore = Depends(idempotency_store)
 ):
-    try:
-        uc = PurchaseItem(p_repo, i_repo)
-        result = await uc.execute(
-            buyer_user_id=buyer_user_id,
-            product_id=purchase_data.productId,
-            quantity=purchase_data.quantity
-        )
+    async def purchase():
+        try:
+            uc = PurchaseItem(p_repo, i_repo, flash_sales, seller_notifications)
+            result = await uc.execute(
+                buyer_user_id=buyer_user_id,
+                product_id=purchase_data.productId,
+                quantity=purchase_data.quantity
+            )
 
-        if result.error:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=result.error
+            if result.error:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=result.error
+                )
+
+            return PurchaseOut(
+                purchaseId=result.purchase.purchase_id,
+                buyerUserId=result.purchase.buyer_user_id,
+                sellerUserId=result.purchase.seller_user_id,
+                productId=result.purchase.product_id,
+                productName=result.purchase.product_name,
+                quantity=result.purchase.quantity,
+                totalPriceCents=result.purchase.total_price_cents,
+                purchaseDate=result.purchase.purchase_date,
+                status=result.purchase.status
             )
 
-        return PurchaseOut(
-            purchaseId=result.purchase.purchase_id,
-            buyerUserId=result.purchase.buyer_user_id,
-            sellerUserId=result.purchase.seller_user_id,
-            productId=result.purchase.product_id,
-            productName=result.purchase.product_name,
-            quantity=result.purchase.quantity,
-            totalPriceCents=result.purchase.total_price_cents,
-            purchaseDate=result.purchase.purchase_date,
-            status=result.purchase.status
-        )
+        except HTTPException:
+            # rethrow expected errors
+            raise
 
-    except HTTPException:
-        # rethrow expected errors
-        raise
+        except Exception as e:
+            # unexpected server error
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Internal server error: {str(e)}"
+            )
 
-    except Exception as e:
-        # unexpected server error
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Internal server error: {str(e)}"
-        )
+    return await idempotent(
+        store,
+        idempotency_key,
+        scope=f"purchase:{buyer_user_id}",
+        payload=purchase_data.model_dump(),
+        operation=purchase,
+        status_code=status.HTTP_201_CREATED
+    )
 
 
 
 @router.get("/buyer/{buyer_user_id}", response_model=List[PurchaseOut])
 async def get_buyer_purchases(
     buyer_user_id: str,
+    statuses: Optional[List[str]] = Depends(status_filter),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    fields: Optional[Fieldset] = Depends(SparseFields(PURCHASE_FIELDS)),
     repo: MongoPurchaseRepo = Depends(purchase_repo)
 ):
-    """Get all purchases made by a specific buyer"""
+    """Purchases made by a buyer, newest first; filter with ?status= and page with limit/offset"""
     uc = GetPurchasesByBuyer(repo)
-    purchases = await uc.execute(buyer_user_id=buyer_user_id)
+    purchases = await uc.execute(
+        buyer_user_id=buyer_user_id, statuses=statuses, limit=limit, offset=offset,
+        fields=fields.attributes if fields else None
+    )
     
-    return [
-        PurchaseOut(
-            purchaseId=p.purchase_id,
-            buyerUserId=p.buyer_user_id,
-            sellerUserId=p.seller_user_id,
-            productId=p.product_id,
-            productName=p.product_name,
-            quantity=p.quantity,
-            totalPriceCents=p.total_price_cents,
-            purchaseDate=p.purchase_date,
-            status=p.status
-        )
-        for p in purchases
-    ]
+    return json_rows((purchase_row(p) for p in purchases), fields=fields)
 
 
 @router.get("/seller/{seller_user_id}", response_model=List[PurchaseOut])
 async def get_seller_sales(
     seller_user_id: str,
+    statuses: Optional[List[str]] = Depends(status_filter),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    fields: Optional[Fieldset] = Depends(SparseFields(PURCHASE_FIELDS)),
     repo: MongoPurchaseRepo = Depends(purchase_repo)
 ):
-    """Get all sales (purchases) for a specific seller"""
+    """Sales for a seller, newest first; ?status=open lists orders still to ship or deliver"""
     uc = GetPurchasesBySeller(repo)
-    purchases = await uc.execute(seller_user_id=seller_user_id)
+    purchases = await uc.execute(
+        seller_user_id=seller_user_id, statuses=statuses, limit=limit, offset=offset,
+        fields=fields.attributes if fields else None
+    )
     
+    return json_rows((purchase_row(p) for p in purchases), fields=fields)
+
+
+@router.get("/seller/{seller_user_id}/events")
+async def seller_events(seller_user_id: str):
+    """Server-sent events stream of new orders for a seller (FR-SELL-03)"""
+    sub = seller_notifications.subscribe(seller_user_id)
+
+    async def stream():
+        try:
+            yield f"retry: {settings.SSE_RETRY_MS}\n\n".encode()
+            while True:
+                message = await sub.next()
+                if message is None:
+                    break  # dropped as a slow consumer or shutting down
+                yield message
+        finally:
+            seller_notifications.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/seller/{seller_user_id}/stats", response_model=SellerStatsOut)
+async def get_seller_stats(
+    seller_user_id: str,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    repo: MongoSalesRollupRepo = Depends(sales_rollup_repo)
+):
+    """Daily revenue, units and top products for a seller (inclusive date range, UTC)"""
+    if from_date and to_date and from_date > to_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must not be after 'to'"
+        )
+
+    uc = GetSellerSalesStats(repo)
+    stats = await uc.execute(
+        seller_user_id=seller_user_id,
+        start=datetime.combine(from_date, datetime.min.time()) if from_date else None,
+        end=datetime.combine(to_date, datetime.min.time()) if to_date else None
+    )
+
+    return SellerStatsOut(
+        sellerUserId=stats.seller_user_id,
+        fromDate=stats.start.date(),
+        toDate=stats.end.date(),
+        totalUnits=stats.total_units,
+        totalRevenueCents=stats.total_revenue_cents,
+        totalOrders=stats.total_orders,
+        daily=[
+            SalesDayOut(
+                day=d.day.date(),
+                units=d.units,
+                revenueCents=d.revenue_cents,
+                orders=d.orders
+            )
+            for d in stats.daily
+        ],
+        topProducts=[
+            TopProductOut(
+                productId=p.product_id,
+                productName=p.product_name,
+                units=p.units,
+                revenueCents=p.revenue_cents
+            )
+            for p in stats.top_products
+        ]
+    )
+
+
+@router.post("/stats/rebuild")
+async def rebuild_sales_stats(
+    seller_user_id: Optional[str] = Query(None, alias="sellerUserId"),
+    repo: MongoSalesRollupRepo = Depends(sales_rollup_repo)
+):
+    """
+    Recompute sales rollups from purchases (all sellers, or one seller).
+    Run it while purchase events are not being dispatched; see MongoSalesRollupRepo.rebuild.
+    """
+    uc = RebuildSalesRollups(repo)
+    rows = await uc.execute(seller_user_id=seller_user_id)
+    return {"rollupRows": rows}
+
+
+@router.put("/flash-sales/{product_id}", response_model=List[FlashSaleStatsOut])
+async def configure_flash_sale(product_id: str, config: FlashSaleIn):
+    """Turn flash-sale mode on or off for a product (other workers follow within seconds)"""
+    found = await flash_sales.configure(
+        get_database(), product_id, enabled=config.enabled, chunk_size=config.chunkSize
+    )
+    if not found:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    return await list_flash_sales()
+
+
+@router.get("/flash-sales", response_model=List[FlashSaleStatsOut])
+async def list_flash_sales():
+    """Flash sales active in this worker with their token pool counters"""
     return [
-        PurchaseOut(
-            purchaseId=p.purchase_id,
-            buyerUserId=p.buyer_user_id,
-            sellerUserId=p.seller_user_id,
-            productId=p.product_id,
-            productName=p.product_name,
-            quantity=p.quantity,
-            totalPriceCents=p.total_price_cents,
-            purchaseDate=p.purchase_date,
-            status=p.status
+        FlashSaleStatsOut(
+            productId=s.product_id,
+            available=s.available,
+            claimed=s.claimed,
+            admitted=s.admitted,
+            rejected=s.rejected,
+            exhausted=s.exhausted
         )
-        for p in purchases
+        for s in flash_sales.stats()
     ]
 
 
@@ -145,4 +302,39 @@ async def get_purchase(
         totalPriceCents=purchase.total_price_cents,
         purchaseDate=purchase.purchase_date,
         status=purchase.status
-    )
\ No newline at end of file
+    )
+
+
+@router.put("/{purchase_id}/status", response_model=PurchaseOut)
+async def update_purchase_status(
+    purchase_id: str,
+    body: PurchaseStatusIn,
+    p_repo: MongoPurchaseRepo = Depends(purchase_repo)
+):
+    """Ship, deliver or cancel an order (FR-SELL-04)"""
+    uc = UpdatePurchaseStatus(p_repo, seller_notifications)
+    result = await uc.execute(purchase_id=purchase_id, user_id=body.userId, new_status=body.status)
+
+    if result.error:
+        codes = {
+            "not_found": status.HTTP_404_NOT_FOUND,
+            "forbidden": status.HTTP_403_FORBIDDEN,
+            "conflict": status.HTTP_409_CONFLICT,
+        }
+        raise HTTPException(
+            status_code=codes.get(result.reason, status.HTTP_400_BAD_REQUEST),
+            detail=result.error
+        )
+
+    p = result.purchase
+    return PurchaseOut(
+        purchaseId=p.purchase_id,
+        buyerUserId=p.buyer_user_id,
+        sellerUserId=p.seller_user_id,
+        productId=p.product_id,
+        productName=p.product_name,
+        quantity=p.quantity,
+        totalPriceCents=p.total_price_cents,
+        purchaseDate=p.purchase_date,
+        status=p.status
+    )
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
+from app.infrastructure.collection_versions import MongoCollectionVersions
 from app.infrastructure.review_repo import MongoReviewRepo
 from app.infrastructure.purchase_repo import MongoPurchaseRepo
-from app.application.use_cases import ReviewService
+from app.infrastructure.user_repo import MongoUserRepo
+from app.application.use_cases import ReviewService, ListReviews, ReviewPage
+from app.interfaces.conditional import Validators
+from app.interfaces.serializers import REVIEW_FIELDS, Fieldset, SparseFields, json_rows, review_row
 from app.db import db
+from app.config import settings
 
 router = APIRouter(prefix="/reviews", tags=["reviews"])
 
@@ -32,6 +37,19 @@ class ReviewResponse(BaseModel):
     comment: str
     created_at: datetime
     updated_at: Optional[datetime] = None
+    reviewer_name: Optional[str] = None
+    comment_truncated: bool = False
+
+
+class ProductRatingsRequest(BaseModel):
+    product_ids: List[str] = Field(..., min_length=1, max_length=settings.RATING_BATCH_MAX_PRODUCTS)
+
+
+class ProductRatingResponse(BaseModel):
+    product_id: str
+    average_rating: Optional[float] = None
+    total_reviews: int
+    rating_distribution: Dict[str, int]
 
 
 def get_review_repo():
@@ -40,6 +58,56 @@ def get_review_repo():
 def get_purchase_repo():
     return MongoPurchaseRepo(db)
 
+def get_list_reviews(review_repo = Depends(get_review_repo)):
+    return ListReviews(review_repo, MongoUserRepo())
+
+def get_collection_versions():
+    return MongoCollectionVersions(db)
+
+
+class ReviewPageParams:
+    """?limit=&cursor=&comment_chars=&fields= for paginated review lists"""
+
+    def __init__(
+        self,
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+        comment_chars: Optional[int] = Query(
+            None, ge=1, le=1000, description="Cut comments to this many characters"
+        ),
+        fields: Optional[Fieldset] = Depends(SparseFields(REVIEW_FIELDS)),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.comment_chars = comment_chars
+        self.fields = fields
+
+
+async def _review_page(
+    uc: ListReviews, by: str, owner_id: str, params: ReviewPageParams,
+    request: Request, versions: MongoCollectionVersions
+) -> Response:
+    # 304 while no review has changed; reviewer names are not versioned
+    validators = Validators.of_collection(await versions.get(settings.MONGO_REVIEWS_COLLECTION))
+    if validators.not_modified(request):
+        return validators.response()
+
+    fields = params.fields
+    try:
+        page: ReviewPage = await uc.execute(
+            by=by, owner_id=owner_id, limit=params.limit, cursor=params.cursor,
+            comment_chars=params.comment_chars, fields=fields.attributes if fields else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = validators.headers
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    names = page.reviewer_names
+    return json_rows(
+        (review_row(r, names.get(r.reviewer_user_id)) for r in page.reviews), headers, fields
+    )
+
 
 async def get_current_user_id():
     return "current_user_id"
@@ -71,6 +139,19 @@ async def create_review(
     return result["review"]
 
 
+@router.post("/products/ratings", response_model=List[ProductRatingResponse])
+async def get_product_ratings(
+    body: ProductRatingsRequest,
+    review_repo = Depends(get_review_repo)
+):
+    """Rating summaries for a grid of products in one request, in the order asked for"""
+    stats = await review_repo.get_product_rating_stats(body.product_ids)
+    return [
+        ProductRatingResponse(product_id=pid, **stats[pid])
+        for pid in dict.fromkeys(body.product_ids)
+    ]
+
+
 @router.get("/{review_id}", response_model=ReviewResponse)
 async def get_review(
     review_id: str,
@@ -122,12 +203,40 @@ async def get_seller_reviews(
     return await review_service.get_seller_reviews(seller_user_id)
 
 
+@router.get("/seller/{seller_user_id}/reviews", response_model=List[ReviewResponse])
+async def list_seller_reviews(
+    seller_user_id: str,
+    request: Request,
+    params: ReviewPageParams = Depends(),
+    uc: ListReviews = Depends(get_list_reviews),
+    versions: MongoCollectionVersions = Depends(get_collection_versions)
+):
+    """Reviews a seller received, one page at a time (next page: X-Next-Cursor)"""
+    return await _review_page(uc, "seller", seller_user_id, params, request, versions)
+
+
+@router.get("/reviewer/{user_id}", response_model=List[ReviewResponse])
+async def list_user_reviews(
+    user_id: str,
+    request: Request,
+    params: ReviewPageParams = Depends(),
+    uc: ListReviews = Depends(get_list_reviews),
+    versions: MongoCollectionVersions = Depends(get_collection_versions)
+):
+    """Reviews a user wrote, one page at a time (next page: X-Next-Cursor)"""
+    return await _review_page(uc, "reviewer", user_id, params, request, versions)
+
+
 @router.get("/product/{product_id}", response_model=List[ReviewResponse])
 async def get_product_reviews(
     product_id: str,
-    review_repo = Depends(get_review_repo)
+    request: Request,
+    params: ReviewPageParams = Depends(),
+    uc: ListReviews = Depends(get_list_reviews),
+    versions: MongoCollectionVersions = Depends(get_collection_versions)
 ):
-    return await review_repo.list_by_product(product_id)
+    """A product's reviews, newest first, one page at a time (next page: X-Next-Cursor)"""
+    return await _review_page(uc, "product", product_id, params, request, versions)
 
 
 
@@ -0,0 +1,101 @@
+# app/interfaces/routes/saved_search.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List
+
+from app.application.use_cases import (
+    SaveSearch,
+    ListSavedSearches,
+    DeleteSavedSearch,
+    GetSearchAlerts,
+    MarkSearchAlertsRead
+)
+from app.domain.entities import SavedSearch
+from app.infrastructure.database import get_database
+from app.infrastructure.saved_search_repo import MongoSavedSearchRepo
+from app.config import settings
+from app.interfaces.schemas import SavedSearchIn, SavedSearchOut, SearchAlertOut, SearchAlertsReadIn
+
+router = APIRouter(prefix="/api/v1/saved-searches", tags=["Saved searches"])
+
+
+def saved_search_repo() -> MongoSavedSearchRepo:
+    return MongoSavedSearchRepo(get_database())
+
+
+def _search_out(s: SavedSearch) -> SavedSearchOut:
+    return SavedSearchOut(
+        searchId=s.search_id,
+        userId=s.user_id,
+        query=s.query,
+        category=s.category,
+        minPriceCents=s.min_price_cents,
+        maxPriceCents=s.max_price_cents,
+        createdAt=s.created_at
+    )
+
+
+@router.post("", response_model=SavedSearchOut, status_code=status.HTTP_201_CREATED)
+async def save_search(body: SavedSearchIn, repo: MongoSavedSearchRepo = Depends(saved_search_repo)):
+    """Get alerted when a listing matching this search is created"""
+    uc = SaveSearch(repo, settings.SAVED_SEARCH_MAX_PER_USER)
+    result = await uc.execute(
+        user_id=body.userId,
+        query=body.query,
+        category=body.category,
+        min_price_cents=body.minPriceCents,
+        max_price_cents=body.maxPriceCents,
+    )
+    if result.error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result.error)
+    return _search_out(result.search)
+
+
+@router.get("", response_model=List[SavedSearchOut])
+async def list_saved_searches(
+    userId: str = Query(...),
+    repo: MongoSavedSearchRepo = Depends(saved_search_repo)
+):
+    return [_search_out(s) for s in await ListSavedSearches(repo).execute(userId)]
+
+
+@router.get("/alerts", response_model=List[SearchAlertOut])
+async def list_search_alerts(
+    userId: str = Query(...),
+    unreadOnly: bool = Query(False),
+    limit: int = Query(50, ge=1, le=200),
+    repo: MongoSavedSearchRepo = Depends(saved_search_repo)
+):
+    """New listings that matched the user's saved searches, newest first"""
+    alerts = await GetSearchAlerts(repo).execute(userId, unread_only=unreadOnly, limit=limit)
+    return [
+        SearchAlertOut(
+            alertId=a.alert_id,
+            searchId=a.search_id,
+            productId=a.product_id,
+            productName=a.product_name,
+            category=a.category,
+            priceCents=a.price_cents,
+            createdAt=a.created_at,
+            read=a.read
+        )
+        for a in alerts
+    ]
+
+
+@router.post("/alerts/read")
+async def mark_search_alerts_read(
+    body: SearchAlertsReadIn,
+    repo: MongoSavedSearchRepo = Depends(saved_search_repo)
+):
+    updated = await MarkSearchAlertsRead(repo).execute(body.userId, body.alertIds)
+    return {"updated": updated}
+
+
+@router.delete("/{search_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_saved_search(
+    search_id: str,
+    userId: str = Query(...),
+    repo: MongoSavedSearchRepo = Depends(saved_search_repo)
+):
+    if not await DeleteSavedSearch(repo).execute(search_id, userId):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Saved search not found")
@@ -0,0 +1,88 @@
+# app/interfaces/routes/seller.py
+from fastapi import APIRouter, Depends, Query
+
+from app.application.use_cases import GetSellerDashboard
+from app.infrastructure.item_repo import MongoItemRepo
+from app.infrastructure.purchase_repo import MongoPurchaseRepo
+from app.infrastructure.review_repo import MongoReviewRepo
+from app.infrastructure.database import get_database
+from app.interfaces.schemas import (
+    SellerDashboardOut,
+    DashboardListingsOut,
+    DashboardSalesOut,
+    DashboardRatingsOut,
+    DashboardReviewOut,
+    LowStockItemOut,
+    PurchaseOut
+)
+
+router = APIRouter(prefix="/api/v1/sellers", tags=["Sellers"])
+
+
+# Dependency
+def seller_dashboard() -> GetSellerDashboard:
+    db = get_database()
+    return GetSellerDashboard(MongoItemRepo(db), MongoPurchaseRepo(db), MongoReviewRepo(db))
+
+
+@router.get("/{seller_user_id}/dashboard", response_model=SellerDashboardOut)
+async def get_seller_dashboard(
+    seller_user_id: str,
+    recentSales: int = Query(10, ge=1, le=50),
+    recentReviews: int = Query(5, ge=1, le=50),
+    uc: GetSellerDashboard = Depends(seller_dashboard)
+):
+    """Listings summary, recent sales and rating stats in one response."""
+    dashboard = await uc.execute(
+        seller_user_id,
+        recent_sales=recentSales,
+        recent_reviews=recentReviews
+    )
+    listings, sales, ratings = dashboard.listings, dashboard.sales, dashboard.ratings
+
+    return SellerDashboardOut(
+        sellerUserId=dashboard.seller_user_id,
+        listings=DashboardListingsOut(
+            total=listings["total"],
+            active=listings["active"],
+            outOfStock=listings["out_of_stock"],
+            unitsInStock=listings["units_in_stock"],
+            inventoryValueCents=listings["inventory_value_cents"],
+            categories=listings["categories"],
+            lowStock=[LowStockItemOut(**i) for i in listings["low_stock"]]
+        ),
+        sales=DashboardSalesOut(
+            totalOrders=sales["orders"],
+            totalUnits=sales["units"],
+            totalRevenueCents=sales["revenue_cents"],
+            recent=[
+                PurchaseOut(
+                    purchaseId=p.purchase_id,
+                    buyerUserId=p.buyer_user_id,
+                    sellerUserId=p.seller_user_id,
+                    productId=p.product_id,
+                    productName=p.product_name,
+                    quantity=p.quantity,
+                    totalPriceCents=p.total_price_cents,
+                    purchaseDate=p.purchase_date,
+                    status=p.status
+                )
+                for p in sales["recent"]
+            ]
+        ),
+        ratings=DashboardRatingsOut(
+            averageRating=ratings["average_rating"],
+            totalReviews=ratings["total_reviews"],
+            ratingDistribution=ratings["rating_distribution"],
+            recent=[
+                DashboardReviewOut(
+                    reviewId=r.review_id,
+                    productId=r.product_id,
+                    rating=r.rating,
+                    comment=r.comment,
+                    createdAt=r.created_at
+                )
+                for r in ratings["recent"]
+            ]
+        )
+    )
@@ -23,6 +23,7 @@ from app.interfaces.schemas import (
     StatusUpdateRequest,
     ForgotPasswordRequest
 )
+from app.interfaces.serializers import json_rows, user_row
 
 router = APIRouter(prefix="/api/v1/users", tags=["Users"])
 
@@ -124,17 +125,7 @@ async def list_all_users(
     uc = ListUsers(repo)
     users = await uc.execute()
     
-    return [
-        UserOut(
-            userId=u.user_id,
-            name=u.name,
-            email=u.email,
-            username=u.username,
-            status = u.status,
-            role = u.role
-        )
-        for u in users
-    ]
+    return json_rows(user_row(u) for u in users)
 
 
 @router.put("/{user_id}/password", status_code=status.HTTP_200_OK)
@@ -1,7 +1,7 @@
 # interfaces/schemas.py
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
-from datetime import datetime
+from typing import Optional, List, Dict
+from datetime import datetime, date
 
 class ItemCreate(BaseModel):
     productId: str
@@ -25,6 +25,48 @@ class ItemOut(BaseModel):
     photos: Optional[List[str]] = None
     description: Optional[str] = None
     avgRating: float | None = 0
+    viewCount: int = 0
+    ratingCount: int = 0
+    updatedAt: Optional[datetime] = None
+
+class RelatedItemOut(BaseModel):
+    productId: str
+    productName: str
+    category: str
+    priceCents: int
+    photo: Optional[str] = None
+    score: float
+    coPurchases: int
+
+class SimilarItemOut(ItemOut):
+    similarity: float
+
+class SuggestionOut(BaseModel):
+    text: str
+    kind: str  # "product" | "category"
+    weight: float
+
+class TrendingItemOut(ItemOut):
+    views: int
+    purchases: int
+    score: float
+
+class TopRatedItemOut(ItemOut):
+    ratingCount: int
+    ratingScore: float  # Bayesian average the section is ranked by
+
+class BestSellerItemOut(ItemOut):
+    unitsSold: int
+
+class CategoryBestSellersOut(BaseModel):
+    category: str
+    items: List[BestSellerItemOut]
+
+class HomepageOut(BaseModel):
+    topRated: List[TopRatedItemOut]
+    newArrivals: List[ItemOut]
+    trending: List[TrendingItemOut]
+    bestSellers: List[CategoryBestSellersOut]
 
 # User Input Schemas
 class UserCreateIn(BaseModel):
@@ -50,8 +92,8 @@ class UserOut(BaseModel):
     name: str
     email: str
     username: str
-    status: str
-    role: str
+    status: Optional[str] = None
+    role: Optional[str] = None
 
 
 class UserAuthOut(BaseModel):
@@ -60,8 +102,8 @@ class UserAuthOut(BaseModel):
     email: str
     username: str
     message: str
-    status: str
-    role: str
+    status: Optional[str] = None
+    role: Optional[str] = None
 
 class PurchaseIn(BaseModel):
     productId: str = Field(..., alias="productId")
@@ -81,6 +123,113 @@ class PurchaseOut(BaseModel):
     purchaseDate: datetime
     status: str
 
+class PurchaseStatusIn(BaseModel):
+    status: str  # "shipped", "delivered" or "cancelled"
+    userId: str  # the seller, or the buyer cancelling a pending order
+
+class SavedSearchIn(BaseModel):
+    userId: str
+    query: Optional[str] = Field(None, max_length=200)  # every word must appear in the listing
+    category: Optional[str] = None
+    minPriceCents: Optional[int] = Field(None, ge=0)
+    maxPriceCents: Optional[int] = Field(None, ge=0)
+
+class SavedSearchOut(BaseModel):
+    searchId: str
+    userId: str
+    query: Optional[str] = None
+    category: Optional[str] = None
+    minPriceCents: Optional[int] = None
+    maxPriceCents: Optional[int] = None
+    createdAt: datetime
+
+class SearchAlertOut(BaseModel):
+    alertId: str
+    searchId: str
+    productId: str
+    productName: str
+    category: str
+    priceCents: int
+    createdAt: datetime
+    read: bool
+
+class SearchAlertsReadIn(BaseModel):
+    userId: str
+    alertIds: List[str]
+
+class FlashSaleIn(BaseModel):
+    enabled: bool = True
+    chunkSize: int = Field(50, ge=1, le=10_000)
+
+class FlashSaleStatsOut(BaseModel):
+    productId: str
+    available: int
+    claimed: int
+    admitted: int
+    rejected: int
+    exhausted: bool
+
+class SalesDayOut(BaseModel):
+    day: date
+    units: int
+    revenueCents: int
+    orders: int
+
+class TopProductOut(BaseModel):
+    productId: str
+    productName: str
+    units: int
+    revenueCents: int
+
+class SellerStatsOut(BaseModel):
+    sellerUserId: str
+    fromDate: date
+    toDate: date
+    totalUnits: int
+    totalRevenueCents: int
+    totalOrders: int
+    daily: List[SalesDayOut]
+    topProducts: List[TopProductOut]
+
+class LowStockItemOut(BaseModel):
+    productId: str
+    productName: str
+    qty: int
+
+class DashboardListingsOut(BaseModel):
+    total: int
+    active: int
+    outOfStock: int
+    unitsInStock: int
+    inventoryValueCents: int
+    categories: Dict[str, int]
+    lowStock: List[LowStockItemOut]
+
+class DashboardSalesOut(BaseModel):
+    totalOrders: int
+    totalUnits: int
+    totalRevenueCents: int
+    recent: List[PurchaseOut]
+
+class DashboardReviewOut(BaseModel):
+    reviewId: str
+    productId: str
+    rating: int
+    comment: str
+    createdAt: datetime
+
+class DashboardRatingsOut(BaseModel):
+    averageRating: Optional[float] = None
+    totalReviews: int
+    ratingDistribution: Dict[str, int]
+    recent: List[DashboardReviewOut]
+
+class SellerDashboardOut(BaseModel):
+    sellerUserId: str
+    listings: DashboardListingsOut
+    sales: DashboardSalesOut
+    ratings: DashboardRatingsOut
+
 from pydantic import BaseModel, EmailStr
 
 class CartItemIn(BaseModel):
@@ -95,10 +244,47 @@ class CartItemOut(BaseModel):
     quantity: int
     sellerUserId: str
     photo: str | None
+    priceChanged: bool = False
+    previousPriceCents: int | None = None
+    outOfStock: bool = False
+    quantityCapped: bool = False
 
 class ForgotPasswordRequest(BaseModel):
     email: EmailStr
 
 class StatusUpdateRequest(BaseModel):
     user_id:str
-    new_status:str
\ No newline at end of file
+    new_status:str
+
+class ViewCounterMetricsOut(BaseModel):
+    pendingProducts: int
+    pendingViews: int
+    flushLagSeconds: float
+    lastBatchSize: int
+    lastFlushMs: float
+    flushes: int
+    viewsFlushed: int
+    failedFlushes: int
+
+class OutboxMetricsOut(BaseModel):
+    dispatched: int
+    failed: int
+
+class NotificationMetricsOut(BaseModel):
+    subscribers: int
+    published: int
+    dropped: int
+
+class CompressionMetricsOut(BaseModel):
+    compressed: int
+    precompressed: int
+    skippedSmall: int
+    bytesIn: int
+    bytesOut: int
+    bytesSaved: int
+
+class MetricsOut(BaseModel):
+    viewCounter: ViewCounterMetricsOut
+    outbox: OutboxMetricsOut
+    sellerNotifications: NotificationMetricsOut
+    compression: CompressionMetricsOut
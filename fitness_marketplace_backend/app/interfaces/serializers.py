@@ -0,0 +1,197 @@
+# app/interfaces/serializers.py
+"""
+JSON for list endpoints, written straight from domain entities.
+
+The models in schemas.py stay the documented contract: routes keep them as
+`response_model`, so OpenAPI is unchanged. But building one model per row,
+which FastAPI then validates and serialises again, is most of the CPU a
+long list costs. The functions here emit the same camelCase fields as
+plain dicts, and orjson encodes the whole list in one call. Returning a
+Response skips FastAPI's `response_model` pass.
+
+Keep each *_row in step with its model:
+fitness_marketplace_metrics/tools/benchmarks/json_rows.py checks that
+both paths produce the same JSON.
+
+List routes also take `?fields=`, a sparse fieldset. Only the entity
+attributes behind the requested response fields are loaded from MongoDB,
+and only those response fields are written.
+"""
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Optional, Tuple
+
+import orjson
+from fastapi import HTTPException, Query, Response
+
+from app.application.cart import CartLine
+from app.domain.entities import Item, Purchase, Review, User
+
+# Response field -> entity attribute it is built from, per list model
+
+ITEM_FIELDS = {
+    "productId": "product_id",
+    "productName": "product_name",
+    "category": "category",
+    "priceCents": "price_cents",
+    "qty": "qty",
+    "ownerUserId": "owner_user_id",
+    "isSeller": "is_seller",
+    "photos": "photos",
+    "description": "description",
+    "avgRating": "avg_rating",
+    "viewCount": "view_count",
+    "ratingCount": "rating_count",
+    "updatedAt": "updated_at",
+}
+
+PURCHASE_FIELDS = {
+    "purchaseId": "purchase_id",
+    "buyerUserId": "buyer_user_id",
+    "sellerUserId": "seller_user_id",
+    "productId": "product_id",
+    "productName": "product_name",
+    "quantity": "quantity",
+    "totalPriceCents": "total_price_cents",
+    "purchaseDate": "purchase_date",
+    "status": "status",
+}
+
+REVIEW_FIELDS = {
+    "review_id": "review_id",
+    "purchase_id": "purchase_id",
+    "reviewer_user_id": "reviewer_user_id",
+    "reviewed_user_id": "reviewed_user_id",
+    "product_id": "product_id",
+    "rating": "rating",
+    "comment": "comment",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "reviewer_name": "reviewer_user_id",  # looked up by the reviewer's id
+    "comment_truncated": "comment_truncated",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Fieldset:
+    names: Tuple[str, ...]  # response fields, in the order requested
+    attributes: Tuple[str, ...]  # entity attributes to load for them
+
+    def trim(self, row: dict) -> dict:
+        return {name: row[name] for name in self.names}
+
+
+class SparseFields:
+    """Dependency for `?fields=a,b`: the requested Fieldset, or None for every field"""
+
+    def __init__(self, allowed: Mapping[str, str]):
+        self.allowed = allowed
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(
+            None, description="Comma-separated response fields; the others are not loaded"
+        ),
+    ) -> Optional[Fieldset]:
+        if not fields:
+            return None
+        names = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [n for n in names if n not in self.allowed]
+        if unknown or not names:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}; choose from {', '.join(self.allowed)}",
+            )
+        attributes = tuple(dict.fromkeys(self.allowed[n] for n in names))
+        return Fieldset(names, attributes)
+
+
+def item_row(i: Item) -> dict:
+    """ItemOut"""
+    return {
+        "productId": i.product_id,
+        "productName": i.product_name,
+        "category": i.category,
+        "priceCents": i.price_cents,
+        "qty": i.qty,
+        "ownerUserId": i.owner_user_id,
+        "isSeller": i.is_seller,
+        "photos": i.photos,
+        "description": i.description,
+        "avgRating": i.avg_rating,
+        "viewCount": i.view_count,
+        "ratingCount": i.rating_count,
+        "updatedAt": i.updated_at,
+    }
+
+
+def purchase_row(p: Purchase) -> dict:
+    """PurchaseOut"""
+    return {
+        "purchaseId": p.purchase_id,
+        "buyerUserId": p.buyer_user_id,
+        "sellerUserId": p.seller_user_id,
+        "productId": p.product_id,
+        "productName": p.product_name,
+        "quantity": p.quantity,
+        "totalPriceCents": p.total_price_cents,
+        "purchaseDate": p.purchase_date,
+        "status": p.status,
+    }
+
+
+def cart_line_row(line: CartLine) -> dict:
+    """CartItemOut"""
+    c = line.item
+    return {
+        "userId": c.user_id,
+        "productId": c.product_id,
+        "productName": c.product_name,
+        "priceCents": c.price_cents,
+        "quantity": c.quantity,
+        "sellerUserId": c.seller_user_id,
+        "photo": c.photo,
+        "priceChanged": line.price_changed,
+        "previousPriceCents": line.previous_price_cents,
+        "outOfStock": line.out_of_stock,
+        "quantityCapped": line.quantity_capped,
+    }
+
+
+def review_row(r: Review, reviewer_name: Optional[str] = None) -> dict:
+    """ReviewResponse"""
+    return {
+        "review_id": r.review_id,
+        "purchase_id": r.purchase_id,
+        "reviewer_user_id": r.reviewer_user_id,
+        "reviewed_user_id": r.reviewed_user_id,
+        "product_id": r.product_id,
+        "rating": r.rating,
+        "comment": r.comment,
+        "created_at": r.created_at,
+        "updated_at": r.updated_at,
+        "reviewer_name": reviewer_name,
+        "comment_truncated": r.comment_truncated,
+    }
+
+
+def user_row(u: User) -> dict:
+    """UserOut: never the password"""
+    return {
+        "userId": u.user_id,
+        "name": u.name,
+        "email": u.email,
+        "username": u.username,
+        "status": u.status,
+        "role": u.role,
+    }
+
+
+def json_rows(
+    rows: Iterable[dict],
+    headers: Optional[Mapping[str, str]] = None,
+    fields: Optional[Fieldset] = None,
+) -> Response:
+    if fields is not None:
+        rows = map(fields.trim, rows)
+    # orjson writes naive datetimes as ISO 8601 without an offset, like pydantic
+    return Response(orjson.dumps(list(rows)), media_type="application/json", headers=headers)
@@ -1,9 +1,38 @@
 # app/main.py
+import asyncio
+import logging
+from datetime import datetime, timedelta
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from app.interfaces.routes import listings, user, purchase, review, cart
-from app.infrastructure.database import connect_to_mongo, close_mongo_connection
+from app.interfaces.routes import listings, user, purchase, review, cart, seller, metrics, saved_search
+from app.infrastructure.database import connect_to_mongo, close_mongo_connection, get_database
+from app.infrastructure.cart_repo import MongoCartRepo
+from app.infrastructure.sales_rollup_repo import MongoSalesRollupRepo
+from app.infrastructure.item_repo import MongoItemRepo
+from app.infrastructure.purchase_repo import MongoPurchaseRepo
+from app.infrastructure.review_repo import MongoReviewRepo
+from app.infrastructure.idempotency import MongoIdempotencyStore
+from app.infrastructure.scheduler import PeriodicJob
+from app.infrastructure.flash_sale import flash_sales
+from app.infrastructure.outbox import MongoOutbox, dispatcher
+from app.infrastructure.notifications import seller_notifications
+from app.infrastructure.trending import trending
+from app.infrastructure.trending_repo import MongoTrendingRepo
+from app.infrastructure.saved_search_repo import MongoSavedSearchRepo
+from app.infrastructure.user_repo import MongoUserRepo
+from app.infrastructure.view_counter import view_counter
+from app.infrastructure.co_purchase import CoPurchaseIndexer
+from app.infrastructure.lease import Lease
+from app.infrastructure.related_items_repo import MongoRelatedItemsRepo
+from app.infrastructure.similar_items import SimilarItemsJob, similar_items
+from app.infrastructure.suggest import autocomplete
+from app.interfaces.compression import CompressionMiddleware
+from app.interfaces.homepage import homepage
+from app.application.events import register_handlers
+from app.config import settings
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Fitness Marketplace API (v1)")
 
@@ -16,16 +45,140 @@ app.add_middleware(
     ],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # review pages
     allow_credentials=True,
 )
 
+# Added last so it wraps everything, CORS included
+app.add_middleware(CompressionMiddleware)
+
+# ✅ Background jobs
+async def compact_carts():
+    report = await MongoCartRepo(get_database()).compact()
+    logger.info(
+        "Cart compaction: merged %d lines for %d users, %d -> %d docs, %d bytes reclaimed",
+        report.lines_merged, report.users_compacted,
+        report.documents_before, report.documents_after, report.bytes_reclaimed,
+    )
+
+async def flush_flash_sales():
+    await flash_sales.flush(get_database())
+
+async def refresh_flash_sales():
+    await flash_sales.refresh(get_database())
+
+async def merge_trending():
+    await trending.merge(get_database())
+
+async def refresh_trending():
+    await trending.refresh(get_database())
+
+async def flush_view_counts():
+    await view_counter.flush(get_database())
+
+# Not released: the worker that holds the lease runs the update until it
+# stops renewing it, and another takes over once it has lapsed
+co_purchase_update_lease = Lease("co-purchase-update", 1.5 * settings.CO_PURCHASE_UPDATE_SECONDS)
+co_purchase_rebuild_lease = Lease("co-purchase-rebuild", settings.CO_PURCHASE_REBUILD_LEASE_SECONDS)
+
+async def update_related_items():
+    db = get_database()
+    if not await co_purchase_update_lease.acquire(db):
+        return
+    # Overlap the previous run; recomputing a product's neighbours is idempotent
+    since = datetime.utcnow() - timedelta(seconds=2 * settings.CO_PURCHASE_UPDATE_SECONDS)
+    updated = await CoPurchaseIndexer(db).update(since)
+    logger.info("Co-purchase update: %d products", updated)
+
+similar_items_job = SimilarItemsJob(similar_items, settings.SIMILAR_ITEMS_REBUILD_SECONDS)
+
+async def refresh_similar_items():
+    await similar_items_job.run(get_database())
+
+async def refresh_autocomplete():
+    await autocomplete.refresh(get_database())
+
+async def refresh_homepage():
+    await homepage.refresh(get_database())
+
+async def backfill_ratings():
+    # Listings written before rating scores existed sort last until scored
+    repo = MongoItemRepo(get_database())
+    if await repo.collection.find_one({"ratingScore": {"$exists": False}}, {"_id": 1}):
+        logger.info("Rating backfill: %d items", await repo.rebuild_ratings())
+
+async def rebuild_related_items():
+    # Whichever worker finds the last rebuild a day old runs the next one
+    db = get_database()
+    indexer = CoPurchaseIndexer(db)
+    every = settings.CO_PURCHASE_REBUILD_SECONDS
+    if not await indexer.rebuild_due(every) or not await co_purchase_rebuild_lease.acquire(db):
+        return
+    try:
+        if await indexer.rebuild_due(every):  # another worker may have finished one meanwhile
+            rebuilt = await indexer.rebuild()
+            logger.info("Co-purchase rebuild: %d products", rebuilt)
+    finally:
+        await co_purchase_rebuild_lease.release(db)
+
+background_jobs = [
+    PeriodicJob("cart-compaction", settings.CART_COMPACTION_INTERVAL_SECONDS, compact_carts),
+    PeriodicJob("flash-sale-flush", settings.FLASH_SALE_FLUSH_SECONDS, flush_flash_sales),
+    PeriodicJob("flash-sale-refresh", settings.FLASH_SALE_REFRESH_SECONDS, refresh_flash_sales),
+    PeriodicJob("trending-merge", settings.TRENDING_MERGE_SECONDS, merge_trending, run_on_stop=True),
+    PeriodicJob("trending-refresh", settings.TRENDING_REFRESH_SECONDS, refresh_trending),
+    PeriodicJob("view-count-flush", settings.VIEW_COUNT_FLUSH_SECONDS, flush_view_counts, run_on_stop=True),
+    PeriodicJob("co-purchase-update", settings.CO_PURCHASE_UPDATE_SECONDS, update_related_items),
+    # Checks often (one find_one) and rebuilds once CO_PURCHASE_REBUILD_SECONDS have passed
+    co_purchase_rebuild := PeriodicJob(
+        "co-purchase-rebuild", settings.CO_PURCHASE_UPDATE_SECONDS, rebuild_related_items
+    ),
+    similar_items_refresh := PeriodicJob(
+        "similar-items", settings.SIMILAR_ITEMS_RELOAD_SECONDS, refresh_similar_items
+    ),
+    autocomplete_refresh := PeriodicJob(
+        "autocomplete-refresh", settings.SUGGEST_REFRESH_SECONDS, refresh_autocomplete
+    ),
+    PeriodicJob("homepage-refresh", settings.HOMEPAGE_REFRESH_SECONDS, refresh_homepage),
+    PeriodicJob("sse-heartbeat", settings.SSE_HEARTBEAT_SECONDS, seller_notifications.heartbeat),
+]
+
 # ✅ Database lifecycle events
 @app.on_event("startup")
 async def startup_event():
     await connect_to_mongo()
+    db = get_database()
+    await MongoItemRepo(db).ensure_indexes()
+    await MongoPurchaseRepo(db).ensure_indexes()
+    await MongoReviewRepo(db).ensure_indexes()
+    await MongoCartRepo(db).ensure_indexes()
+    await MongoSalesRollupRepo(db).ensure_indexes()
+    await MongoIdempotencyStore(db).ensure_indexes()
+    await MongoOutbox(db).ensure_indexes()
+    await MongoTrendingRepo(db).ensure_indexes()
+    await MongoSavedSearchRepo(db).ensure_indexes()
+    await MongoUserRepo().ensure_indexes()
+    await MongoRelatedItemsRepo(db).ensure_indexes()
+    for job in background_jobs:
+        job.start()
+    asyncio.create_task(autocomplete_refresh.run_once())
+    asyncio.create_task(backfill_ratings())
+    # A fresh deploy gets its related items now rather than on the first tick
+    asyncio.create_task(co_purchase_rebuild.run_once())
+    if not similar_items.load():
+        # No index on disk yet: build one without holding up startup
+        asyncio.create_task(similar_items_refresh.run_once())
+    register_handlers(dispatcher, db)
+    dispatcher.start(db)
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    seller_notifications.close_all()
+    # Undispatched events stay pending and are picked up by the next leader
+    await dispatcher.stop(get_database())
+    for job in background_jobs:
+        await job.stop()
+    await flash_sales.shutdown(get_database())
     await close_mongo_connection()
 
 # Serve dev uploads
@@ -37,6 +190,9 @@ app.include_router(user.router)
 app.include_router(purchase.router)
 app.include_router(review.router)
 app.include_router(cart.router) 
+app.include_router(seller.router)
+app.include_router(metrics.router)
+app.include_router(saved_search.router)
 
 
 @app.get("/")
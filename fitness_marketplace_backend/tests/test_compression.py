@@ -0,0 +1,40 @@
+import gzip
+
+import pytest
+
+from app.interfaces import compression
+from app.interfaces.compression import compress, negotiate
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "ENCODINGS", ("br", "gzip"))
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("GZIP;q=0.5", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("*;q=0", None),
+    ("*, br;q=0", "gzip"),
+    ("gzip;q=oops, br;q=0", None),
+    ("identity", None),
+    ("", None),
+])
+def test_negotiate(with_brotli, header, expected):
+    assert negotiate(header) == expected
+
+
+def test_negotiate_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "ENCODINGS", ("gzip",))
+    assert negotiate("br, gzip") == "gzip"
+    assert negotiate("br") is None
+
+
+def test_gzip_output_is_stable():
+    body = b'{"rows": [1, 2, 3]}' * 100
+    assert gzip.decompress(compress(body, "gzip")) == body
+    assert compress(body, "gzip") == compress(body, "gzip")  # mtime=0: same bytes, same ETag
@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from app.infrastructure.collection_versions import MongoCollectionVersions
+from app.infrastructure.item_repo import MongoItemRepo
+from app.interfaces.routes import listings
+
+
+@pytest.fixture
+def db():
+    db = mongomock_motor.AsyncMongoMockClient()["marketplace"]
+    asyncio.run(db.items.insert_one({
+        "productId": "p1", "productName": "Kettlebell", "category": "weights",
+        "priceCents": 2500, "qty": 3, "ownerUserId": "s1", "isSeller": True,
+        "viewCount": 0, "updatedAt": datetime(2026, 3, 1),
+    }))
+    return db
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(listings.router)
+    app.dependency_overrides[listings.item_repo] = lambda: MongoItemRepo(db)
+    app.dependency_overrides[listings.collection_versions] = lambda: MongoCollectionVersions(db)
+    return TestClient(app)
+
+
+def test_listings_answer_304_until_a_listing_changes(client, db):
+    first = client.get("/api/v1/listings")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    again = client.get("/api/v1/listings", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+
+    asyncio.run(MongoItemRepo(db).adjust_quantity("p1", 2))
+    changed = client.get("/api/v1/listings", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()[0]["qty"] == 5
+
+
+def test_listing_detail_answers_304_until_it_or_its_views_change(client, db):
+    first = client.get("/api/v1/listings/p1")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert "last-modified" not in first.headers
+
+    assert client.get("/api/v1/listings/p1", headers={"If-None-Match": etag}).status_code == 304
+
+    # A view count flush changes the tag without touching updatedAt
+    asyncio.run(db.items.update_one({"productId": "p1"}, {"$inc": {"viewCount": 4}}))
+    viewed = client.get("/api/v1/listings/p1", headers={"If-None-Match": etag})
+    assert viewed.status_code == 200
+    etag = viewed.headers["etag"]
+
+    asyncio.run(MongoItemRepo(db).adjust_quantity("p1", -1))
+    restocked = client.get("/api/v1/listings/p1", headers={"If-None-Match": etag})
+    assert restocked.status_code == 200
+    assert restocked.headers["etag"] != etag
+    assert restocked.json()["qty"] == 2
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import pytest
+
+from app.domain.entities import CartItem, Item, Purchase
+from app.infrastructure.cart_repo import CART_LINES
+from app.infrastructure.item_repo import ITEMS
+from app.infrastructure.mapping import DocMapper, doc_field
+from app.infrastructure.purchase_repo import PURCHASES
+
+
+def purchase(**changes):
+    fields = dict(
+        purchase_id="u1", buyer_user_id="b", seller_user_id="s", product_id="p",
+        product_name="Kettlebell", quantity=2, total_price_cents=5000,
+        purchase_date=datetime(2026, 3, 1, 12, 30), status="pending", photo=None,
+    )
+    return Purchase(**{**fields, **changes})
+
+
+def test_round_trip():
+    p = purchase(photo="/uploads/a.jpg")
+    assert PURCHASES.from_doc(PURCHASES.to_doc(p)) == p
+
+
+def test_missing_required_key_raises():
+    doc = PURCHASES.to_doc(purchase())
+    del doc["status"]
+    with pytest.raises(KeyError):
+        PURCHASES.from_doc(doc)
+
+
+def test_dataclass_default_fills_a_missing_key():
+    doc = PURCHASES.to_doc(purchase())
+    del doc["photo"]
+    assert PURCHASES.from_doc(doc).photo is None
+
+
+def test_database_maintained_fields_are_read_not_written():
+    doc = {
+        "productId": "p", "productName": "Bench", "category": "weights", "priceCents": 100,
+        "qty": 1, "isSeller": True, "ownerUserId": "o", "avgRating": 4.2, "viewCount": 7,
+        "ratingCount": 4, "ratingScore": 3.9, "updatedAt": datetime(2026, 1, 1), "_id": "x",
+    }
+    item = ITEMS.from_doc(doc)
+    assert (item.avg_rating, item.view_count, item.rating_count) == (4.2, 7, 4)
+    written = ITEMS.to_doc(item)
+    assert not {"avgRating", "viewCount", "ratingCount", "ratingScore", "updatedAt"} & written.keys()
+    assert written["productName"] == "Bench"
+
+
+def test_listing_without_a_core_key_raises():
+    with pytest.raises(KeyError):
+        ITEMS.from_doc({"productId": "p", "qty": 1})
+
+
+def test_partial_doc_leaves_the_rest_at_defaults():
+    assert ITEMS.projection(["product_id", "qty"]) == {"productId": 1, "qty": 1, "_id": 0}
+    item = ITEMS.from_partial_doc({"productId": "p", "qty": 3})
+    assert (item.product_id, item.qty, item.product_name, item.view_count) == ("p", 3, None, 0)
+
+
+def test_fields_kept_outside_the_document_are_arguments():
+    line = CartItem(
+        user_id="u", product_id="p", product_name="Mat", price_cents=100, quantity=1,
+        seller_user_id="s", photo=None,
+    )
+    doc = CART_LINES.to_doc(line)
+    assert "user_id" not in doc
+    assert CART_LINES.from_doc(doc, "u") == line
+
+
+def test_every_field_must_be_mapped():
+    @dataclass(frozen=True, slots=True)
+    class Thing:
+        a: int
+        b: Optional[int] = None
+
+    with pytest.raises(TypeError):
+        DocMapper(Thing, a="a")
+    with pytest.raises(TypeError):
+        DocMapper(Thing, a="a", b="b", c="c")
+    assert DocMapper(Thing, a="a", b=doc_field("b", default=5)).from_doc({"a": 1}) == Thing(1, 5)
+
+
+def test_requires_slots():
+    @dataclass
+    class Plain:
+        a: int
+
+    with pytest.raises(TypeError):
+        DocMapper(Plain, a="a")
@@ -0,0 +1,100 @@
+from datetime import datetime
+
+from app.domain.entities import Item, SavedSearch
+from app.infrastructure.percolator import SearchPercolator
+
+
+def search(search_id, query=None, category=None, lo=None, hi=None):
+    return SavedSearch(
+        search_id=search_id, user_id=f"user-{search_id}", query=query, category=category,
+        min_price_cents=lo, max_price_cents=hi, created_at=datetime(2026, 1, 1),
+    )
+
+
+def item(name, category="weights", price=5000, description=None):
+    return Item(
+        product_id="p1", product_name=name, category=category, price_cents=price, qty=1,
+        is_seller=True, owner_user_id="seller", description=description,
+    )
+
+
+def matched(percolator, listing):
+    return sorted(search_id for search_id, _ in percolator.match(listing))
+
+
+def test_every_word_must_appear_in_name_or_description():
+    p = SearchPercolator()
+    p.add(search("a", query="adjustable dumbbell"))
+    p.add(search("b", query="kettlebell"))
+    assert matched(p, item("Dumbbell set", description="Adjustable, 2-24 kg")) == ["a"]
+    assert matched(p, item("Dumbbell set")) == []
+
+
+def test_category_is_case_insensitive():
+    p = SearchPercolator()
+    p.add(search("a", category=" Weights "))
+    p.add(search("b", category="cardio"))
+    assert matched(p, item("Plate", category="WEIGHTS")) == ["a"]
+
+
+def test_price_bounds_are_inclusive():
+    p = SearchPercolator()
+    p.add(search("under", hi=5000))
+    p.add(search("over", lo=5000))
+    p.add(search("range", category="weights", lo=1000, hi=2000))
+    assert matched(p, item("Plate", price=5000)) == ["over", "under"]
+    assert matched(p, item("Plate", price=4999)) == ["under"]
+    assert matched(p, item("Plate", price=1500)) == ["range", "under"]
+
+
+def test_search_without_predicates_matches_everything():
+    p = SearchPercolator()
+    p.add(search("all"))
+    assert matched(p, item("Anything", category="", price=0)) == ["all"]
+
+
+def test_words_scoped_to_a_category():
+    p = SearchPercolator()
+    p.add(search("a", query="bench", category="weights"))
+    assert matched(p, item("Flat bench", category="weights")) == ["a"]
+    assert matched(p, item("Flat bench", category="furniture")) == []
+
+
+def test_add_replaces_and_remove_forgets():
+    p = SearchPercolator()
+    p.add(search("a", query="bench"))
+    p.add(search("a", query="rack"))
+    assert len(p) == 1
+    assert matched(p, item("Flat bench")) == []
+    assert matched(p, item("Squat rack")) == ["a"]
+    p.remove("a")
+    p.remove("missing")
+    assert len(p) == 0
+    assert p.postings == {}
+
+
+def test_agrees_with_checking_every_search():
+    p = SearchPercolator()
+    searches = [
+        search(str(n), query=q, category=c, lo=lo, hi=hi)
+        for n, (q, c, lo, hi) in enumerate([
+            ("bench", None, None, None), ("flat bench", "weights", None, 8000),
+            (None, "weights", 3000, None), (None, None, None, 2000), ("rack", "cardio", None, None),
+            (None, None, None, None), ("bench press", None, 1000, 6000),
+        ])
+    ]
+    for s in searches:
+        p.add(s)
+    for listing in [
+        item("Flat bench", price=7000), item("Bench press station", price=5500),
+        item("Squat rack", category="cardio", price=100), item("Mat", category="yoga", price=1999),
+    ]:
+        words = set(f"{listing.product_name} {listing.description or ''}".lower().split())
+        expected = sorted(
+            s.search_id for s in searches
+            if set((s.query or "").lower().split()) <= words
+            and (s.category is None or s.category == listing.category)
+            and (s.min_price_cents is None or listing.price_cents >= s.min_price_cents)
+            and (s.max_price_cents is None or listing.price_cents <= s.max_price_cents)
+        )
+        assert matched(p, listing) == expected
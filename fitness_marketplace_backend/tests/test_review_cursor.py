@@ -0,0 +1,32 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.infrastructure.review_repo import MongoReviewRepo
+
+
+def test_cursor_continues_after_the_last_review():
+    oid = ObjectId()
+    created_at = datetime(2026, 5, 4, 3, 2, 1, 123000)
+    cursor = MongoReviewRepo._encode_cursor({"_id": oid, "created_at": created_at})
+    assert MongoReviewRepo._decode_cursor(cursor) == {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": oid}},
+        ]
+    }
+
+
+def test_cursor_keeps_milliseconds_only():
+    # MongoDB stores dates in milliseconds; a finer cursor would skip reviews
+    created_at = datetime(2026, 5, 4, 3, 2, 1, 123456)
+    cursor = MongoReviewRepo._encode_cursor({"_id": ObjectId(), "created_at": created_at})
+    stored = MongoReviewRepo._decode_cursor(cursor)["$or"][1]["created_at"]
+    assert stored == created_at.replace(microsecond=123000)
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", "MTIz", "YWJjOmRlZg=="])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        MongoReviewRepo._decode_cursor(cursor)
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from app.application.use_cases import SaveSearch
+from app.infrastructure.percolator import SearchPercolator
+
+
+class Repo:
+    def __init__(self):
+        self.saved = []
+
+    async def count_by_user(self, user_id):
+        return len(self.saved)
+
+    async def create(self, search):
+        self.saved.append(search)
+        return search
+
+
+def save(query, category=None):
+    repo = Repo()
+    result = asyncio.run(SaveSearch(repo, max_per_user=10).execute(
+        user_id="u", query=query, category=category, min_price_cents=None, max_price_cents=None
+    ))
+    return result, repo
+
+
+@pytest.mark.parametrize("query", ["гантели", "ダンベル", "!!!", " - "])
+def test_query_without_matchable_words_is_rejected(query):
+    result, repo = save(query, category="weights")
+    assert result.search is None and result.error
+    assert repo.saved == []
+
+
+def test_saved_query_is_filed_under_a_word():
+    result, _ = save("Crème rack")
+    assert result.error is None
+    percolator = SearchPercolator()
+    percolator.add(result.search)
+    assert percolator.key_of[result.search.search_id] in ("t:creme", "t:rack")
@@ -0,0 +1,53 @@
+import random
+
+from app.infrastructure.suggest import CATEGORY, PRODUCT, PrefixIndex, tokens
+
+
+def texts(suggestions):
+    return [s.text for s in suggestions]
+
+
+def test_tokens_are_folded():
+    assert tokens("Crème-Brûlée  Protein 2kg!") == ["creme", "brulee", "protein", "2kg"]
+
+
+def test_typing_can_start_at_any_word():
+    index = PrefixIndex.build(
+        [("Adjustable dumbbell set", PRODUCT, 3), ("Dumbbell rack", PRODUCT, 5)], 100, 10, 100
+    )
+    assert texts(index.suggest("dumb", 5)) == ["Dumbbell rack", "Adjustable dumbbell set"]
+    assert texts(index.suggest("dumbbell s", 5)) == ["Adjustable dumbbell set"]
+    assert texts(index.suggest("ADJ", 5)) == ["Adjustable dumbbell set"]
+    assert index.suggest("set dumbbell", 5) == []
+    assert index.suggest("  ", 5) == []
+
+
+def test_same_text_adds_up_per_kind():
+    index = PrefixIndex.build(
+        [("Weights", CATEGORY, 1), ("weights", CATEGORY, 2), ("Weights", PRODUCT, 1)], 100, 10, 100
+    )
+    assert len(index) == 2
+    best = index.suggest("wei", 1)[0]
+    assert (best.kind, best.weight) == (CATEGORY, 3)
+
+
+def test_build_keeps_the_most_popular_entries():
+    index = PrefixIndex.build([(f"item {n}", PRODUCT, n) for n in range(10)], 3, 10, 100)
+    assert texts(index.suggest("item", 10)) == ["item 9", "item 8", "item 7"]
+    assert not index.add("item new", PRODUCT, 100)
+    assert index.add("item 9", PRODUCT, 1)  # existing entries still gain weight
+
+
+def test_precomputed_prefixes_agree_with_a_scan():
+    rng = random.Random(1)
+    words = ["bar", "barbell", "band", "bench", "bottle", "box", "belt", "ball"]
+    rows = [(" ".join(rng.sample(words, 3)), PRODUCT, rng.randint(1, 50)) for _ in range(300)]
+    index = PrefixIndex.build(rows, 1000, 5, scan_limit=10)
+    assert index.top  # short prefixes have more than scan_limit candidates
+    for n in range(40):
+        index.add(f"{rng.choice(words)} extra {n}", PRODUCT, rng.randint(1, 200))
+    for prefix in ["b", "ba", "bar", "be", "bo", "bal", "barbell b"]:
+        lo, hi = index._range(prefix)
+        scanned = index._best(index.postings[lo:hi], 5)
+        got = index.suggest(prefix, 5)
+        assert [s.weight for s in got] == [index.weight[i] for i in scanned]
@@ -32,6 +32,20 @@ export type Listing = {
   photos?: string[] | null;   
 };
 
+export type HomepageListing = Listing & { avgRating?: number | null };
+
+export type Homepage = {
+  topRated: (HomepageListing & { ratingCount: number; ratingScore: number })[];
+  newArrivals: HomepageListing[];
+  trending: (HomepageListing & { views: number; purchases: number; score: number })[];
+  bestSellers: { category: string; items: (HomepageListing & { unitsSold: number })[] }[];
+};
+
+// Curated sections, precomputed server-side (ETag'd, so repeat loads are 304s)
+export async function fetchHomepage() {
+  return fetch(`${API}/api/v1/listings/home`).then(ok) as Promise<Homepage>;
+}
+
 export async function fetchSellerListings(ownerUserId: string) {
   return fetch(`${API}/api/v1/listings/owner/${ownerUserId}`).then(ok) as Promise<
     Listing[]
@@ -166,8 +180,18 @@ export async function fetchAverageRating(productId: string) {
   return fetch(`${API}/reviews/product/${productId}/average`).then(ok);
 }
 
+// Reviews come a page at a time; X-Next-Cursor points at the next one
 export async function fetchProductReviews(productId: string) {
-  return fetch(`${API}/reviews/product/${productId}`).then(ok);
+  const reviews: any[] = [];
+  let cursor: string | null = null;
+  do {
+    const params = new URLSearchParams({ limit: "100" });
+    if (cursor) params.set("cursor", cursor);
+    const res = await fetch(`${API}/reviews/product/${productId}?${params}`);
+    reviews.push(...(await ok(res)));
+    cursor = res.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return reviews;
 }
 
 
@@ -2,13 +2,11 @@
 
 import { useEffect, useState } from "react";
 import { useNavigate, useLocation } from "react-router-dom";
-import { fetchAllListings, photoUrl } from "../../lib/api";
-import type { Listing } from "../../lib/api";
-
-type ListingWithRating = Listing & { avgRating?: number | null };
+import { fetchHomepage, photoUrl } from "../../lib/api";
+import type { Homepage, HomepageListing } from "../../lib/api";
 
 export default function AllItemsPage() {
-  const [items, setItems] = useState<ListingWithRating[]>([]);
+  const [home, setHome] = useState<Homepage | null>(null);
   const [loading, setLoading] = useState(true);
   const [err, setErr] = useState<string | null>(null);
 
@@ -21,9 +19,9 @@ export default function AllItemsPage() {
     setLoading(true);
     setErr(null);
 
-    fetchAllListings()
+    fetchHomepage()
       .then((data) => {
-        if (isMounted) setItems(data);
+        if (isMounted) setHome(data);
       })
       .catch((e) => {
         if (isMounted) setErr(String(e));
@@ -39,6 +37,7 @@ export default function AllItemsPage() {
 
   if (loading) return <div className="p-6">Loading…</div>;
   if (err) return <div className="p-6 text-red-600">Error: {err}</div>;
+  if (!home) return null;
 
   const renderStars = (rating?: number | null) => {
     if (!rating || rating <= 0) {
@@ -70,41 +69,58 @@ export default function AllItemsPage() {
     );
   };
 
-  return (
-    <main className="max-w-6xl mx-auto p-6 grid gap-4 sm:grid-cols-2 lg:grid-cols-3">
-      {items.map((it) => (
-        <article
-          key={`${it.ownerUserId}-${it.productId}`}
-          onClick={() => navigate(`/item/${it.productId}`)}
-          className="border rounded-xl overflow-hidden cursor-pointer hover:shadow-lg transition"
-        >
-          {it.photos?.[0] ? (
-            <img
-              src={photoUrl(it.photos[0])}
-              className="h-44 w-full object-cover"
-              alt={it.productName}
-            />
-          ) : (
-            <div className="h-44 bg-slate-200" />
-          )}
+  const renderCard = (it: HomepageListing) => (
+    <article
+      key={`${it.ownerUserId}-${it.productId}`}
+      onClick={() => navigate(`/item/${it.productId}`)}
+      className="border rounded-xl overflow-hidden cursor-pointer hover:shadow-lg transition"
+    >
+      {it.photos?.[0] ? (
+        <img
+          src={photoUrl(it.photos[0])}
+          className="h-44 w-full object-cover"
+          alt={it.productName}
+        />
+      ) : (
+        <div className="h-44 bg-slate-200" />
+      )}
+
+      <div className="p-4">
+        <div className="text-xs text-slate-500">{it.category}</div>
+        <h3 className="font-semibold">{it.productName}</h3>
+        <div className="text-sm">
+          ${(it.priceCents / 100).toFixed(2)} · qty {it.qty}
+        </div>
+
+        {renderStars(it.avgRating)}
 
-          <div className="p-4">
-            <div className="text-xs text-slate-500">{it.category}</div>
-            <h3 className="font-semibold">{it.productName}</h3>
-            <div className="text-sm">
-              ${(it.priceCents / 100).toFixed(2)} · qty {it.qty}
-            </div>
+        {it.description && (
+          <p className="text-sm text-slate-600 mt-1 line-clamp-2">
+            {it.description}
+          </p>
+        )}
+      </div>
+    </article>
+  );
 
-            {renderStars(it.avgRating)}
+  const renderSection = (title: string, items: HomepageListing[]) =>
+    items.length > 0 && (
+      <section key={title}>
+        <h2 className="text-xl font-semibold mb-3">{title}</h2>
+        <div className="grid gap-4 sm:grid-cols-2 lg:grid-cols-3">
+          {items.map(renderCard)}
+        </div>
+      </section>
+    );
 
-            {it.description && (
-              <p className="text-sm text-slate-600 mt-1 line-clamp-2">
-                {it.description}
-              </p>
-            )}
-          </div>
-        </article>
-      ))}
+  return (
+    <main className="max-w-6xl mx-auto p-6 space-y-8">
+      {renderSection("Top rated", home.topRated)}
+      {renderSection("Trending", home.trending)}
+      {renderSection("New arrivals", home.newArrivals)}
+      {home.bestSellers.map((group) =>
+        renderSection(`Best sellers in ${group.category || "Other"}`, group.items)
+      )}
     </main>
   );
 }
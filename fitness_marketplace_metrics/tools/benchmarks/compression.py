@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Response compression benchmark
+------------------------------
+
+Listing pages of increasing size are serialised the way GET /listings
+writes them, then compressed with each available encoding two ways:
+
+- "fixed": gzip level 9 / brotli quality 11 for every body
+- "adaptive": the level CompressionMiddleware picks for the body's size
+
+Reported per page size: ratio and milliseconds per response. A last line
+compares compressing the homepage on every hit with serving its
+Precompressed copy.
+
+Usage:
+  python fitness_marketplace_metrics/tools/benchmarks/compression.py --root fitness_marketplace_backend
+"""
+
+from __future__ import annotations
+import os, sys, time, random, argparse
+
+# ---------------- args ----------------
+ap = argparse.ArgumentParser()
+ap.add_argument("--root", default="fitness_marketplace_backend",
+                help="Backend root directory that contains the app package")
+ap.add_argument("--sizes", default="20,200,2000,10000", help="Listings per page, comma-separated")
+ap.add_argument("--repeat", type=int, default=20, help="Compressions per measurement")
+ap.add_argument("--seed", type=int, default=5)
+args = ap.parse_args()
+
+BACKEND_ROOT = os.path.abspath(args.root)
+if not os.path.isdir(BACKEND_ROOT):
+    sys.exit(f"[BENCH][COMPRESSION] Backend root not found: {BACKEND_ROOT}")
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.domain.entities import Item  # noqa: E402
+from app.interfaces.compression import ENCODINGS, Precompressed, compress, negotiate  # noqa: E402
+from app.interfaces.serializers import item_row, json_rows  # noqa: E402
+
+WORDS = ["steel", "grip", "knurled", "adjustable", "rubber", "coated", "home", "gym", "durable",
+         "set", "pair", "kg", "quick", "lock", "collar", "compact", "storage", "rack", "included"]
+BEST = {"br": 11, "gzip": 9}
+
+
+def page(rng: random.Random, n: int) -> bytes:
+    items = [Item(
+        product_id=f"prod-{i}", product_name="Adjustable dumbbell set", category="weights",
+        photos=[f"/uploads/{rng.getrandbits(48):012x}.jpg"], price_cents=rng.randint(500, 80_000),
+        qty=rng.randint(0, 50), description=" ".join(rng.choices(WORDS, k=rng.randint(20, 60))),
+        is_seller=True, owner_user_id=f"seller-{i % 500}", avg_rating=round(rng.uniform(1, 5), 1),
+        view_count=rng.randint(0, 10_000), rating_count=rng.randint(0, 40),
+    ) for i in range(n)]
+    return json_rows(item_row(i) for i in items).body
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        fn()
+    return (time.perf_counter() - start) / args.repeat * 1e3
+
+
+def main():
+    rng = random.Random(args.seed)
+    for n in (int(s) for s in args.sizes.split(",")):
+        body = page(rng, n)
+        for encoding in ENCODINGS:
+            fixed = compress(body, encoding, BEST[encoding])
+            adaptive = compress(body, encoding)
+            fixed_ms = timed(lambda: compress(body, encoding, BEST[encoding]))
+            adaptive_ms = timed(lambda: compress(body, encoding))
+            print(f"[BENCH][COMPRESSION] {n} listings ({len(body) / 1024:.0f} KiB) {encoding}: "
+                  f"fixed {len(fixed) / len(body):.1%} in {fixed_ms:.2f} ms, "
+                  f"adaptive {len(adaptive) / len(body):.1%} in {adaptive_ms:.2f} ms")
+
+    home = page(rng, 60)
+    cached = Precompressed(home)
+    encoding = negotiate("gzip, br")
+    per_hit_ms = timed(lambda: compress(home, encoding, BEST[encoding]))
+    cached_ms = timed(lambda: cached.encoded[negotiate("gzip, br")])
+    print(f"[BENCH][COMPRESSION] homepage {encoding}: compressed per hit {per_hit_ms:.3f} ms, "
+          f"precompressed {cached_ms:.4f} ms")
+
+
+main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Document mapping benchmark
+--------------------------
+
+Converts large result sets of purchase, listing and review documents to
+entities two ways and measures throughput (rows/s) and retained memory
+per entity (tracemalloc):
+
+- "hand": a dict-backed copy of the entity built with keyword arguments,
+  the way the repos' _doc_to_* methods did it
+- "mapper": the slotted entity built by its repo's compiled DocMapper
+
+It also times the reverse direction (entity -> document) for purchases.
+
+Slots cut memory per entity for all three, and all three convert
+faster. Listings read their core fields with doc[key] and take avgRating
+already rounded from the database; the "hand" version still rounds it.
+
+Usage:
+  python fitness_marketplace_metrics/tools/benchmarks/doc_mapping.py --root fitness_marketplace_backend --rows 200000
+"""
+
+from __future__ import annotations
+import os, sys, time, random, argparse, dataclasses, gc, tracemalloc
+from datetime import datetime, timedelta
+
+# ---------------- args ----------------
+ap = argparse.ArgumentParser()
+ap.add_argument("--root", default="fitness_marketplace_backend",
+                help="Backend root directory that contains the app package")
+ap.add_argument("--rows", type=int, default=200_000, help="Documents per result set")
+ap.add_argument("--seed", type=int, default=3)
+args = ap.parse_args()
+
+BACKEND_ROOT = os.path.abspath(args.root)
+if not os.path.isdir(BACKEND_ROOT):
+    sys.exit(f"[BENCH][MAPPING] Backend root not found: {BACKEND_ROOT}")
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from bson import ObjectId  # noqa: E402
+
+from app.domain.entities import Item, Purchase, Review  # noqa: E402
+from app.infrastructure.item_repo import ITEMS  # noqa: E402
+from app.infrastructure.purchase_repo import PURCHASES  # noqa: E402
+from app.infrastructure.review_repo import REVIEWS  # noqa: E402
+
+
+def unslotted(cls):
+    """The entity as it was: same fields and defaults, but with a __dict__"""
+    fields = [
+        (f.name, f.type) if f.default is dataclasses.MISSING
+        else (f.name, f.type, dataclasses.field(default=f.default))
+        for f in dataclasses.fields(cls)
+    ]
+    return dataclasses.make_dataclass(cls.__name__, fields, frozen=cls.__dataclass_params__.frozen)
+
+
+OldPurchase, OldItem, OldReview = unslotted(Purchase), unslotted(Item), unslotted(Review)
+
+
+def hand_purchase(doc):
+    return OldPurchase(
+        purchase_id=doc["purchase_id"], buyer_user_id=doc["buyer_user_id"],
+        seller_user_id=doc["seller_user_id"], product_id=doc["product_id"],
+        product_name=doc["product_name"], quantity=doc["quantity"],
+        total_price_cents=doc["total_price_cents"], purchase_date=doc["purchase_date"],
+        status=doc["status"], photo=doc.get("photo"),
+    )
+
+
+def hand_item(doc):
+    return OldItem(
+        product_id=doc.get("productId"), product_name=doc.get("productName"),
+        category=doc.get("category"), photos=doc.get("photos"), price_cents=doc.get("priceCents"),
+        qty=doc.get("qty"), description=doc.get("description"), is_seller=doc.get("isSeller"),
+        owner_user_id=doc.get("ownerUserId"), avg_rating=round(doc.get("avgRating", 0) or 0, 1),
+        view_count=doc.get("viewCount", 0), rating_count=doc.get("ratingCount", 0),
+        rating_score=doc.get("ratingScore", 3.0),
+    )
+
+
+def hand_review(doc):
+    return OldReview(
+        review_id=doc["review_id"], purchase_id=doc["purchase_id"],
+        reviewer_user_id=doc["reviewer_user_id"], reviewed_user_id=doc["reviewed_user_id"],
+        product_id=doc["product_id"], rating=doc["rating"], comment=doc["comment"],
+        created_at=doc["created_at"], updated_at=doc.get("updated_at"),
+        comment_truncated=doc.get("comment_truncated", False),
+    )
+
+
+def hand_purchase_doc(p):
+    return {
+        "purchase_id": p.purchase_id, "buyer_user_id": p.buyer_user_id,
+        "seller_user_id": p.seller_user_id, "product_id": p.product_id,
+        "product_name": p.product_name, "quantity": p.quantity,
+        "total_price_cents": p.total_price_cents, "purchase_date": p.purchase_date,
+        "status": p.status, "photo": p.photo,
+    }
+
+
+def purchase_docs(rng, n):
+    start = datetime(2026, 1, 1)
+    return [{
+        "_id": ObjectId(), "purchase_id": f"pur-{i}", "buyer_user_id": f"buyer-{i % 1000}",
+        "seller_user_id": f"seller-{i % 500}", "product_id": f"prod-{rng.randint(0, 50_000)}",
+        "product_name": "Yoga mat, 6 mm", "quantity": rng.randint(1, 3),
+        "total_price_cents": rng.randint(500, 80_000),
+        "purchase_date": start + timedelta(seconds=rng.randint(0, 300 * 86400)),
+        "status": rng.choice(["pending", "shipped", "delivered"]), "photo": None,
+    } for i in range(n)]
+
+
+def item_docs(rng, n):
+    return [{
+        "_id": ObjectId(), "productId": f"prod-{i}", "productName": "Adjustable dumbbell set",
+        "category": "weights", "photos": [f"/uploads/{i}.jpg"], "priceCents": rng.randint(500, 80_000),
+        "qty": rng.randint(0, 50), "description": "Solid steel, knurled grip.", "isSeller": True,
+        "ownerUserId": f"seller-{i % 500}", "avgRating": round(rng.uniform(1, 5), 1),
+        "viewCount": rng.randint(0, 10_000), "ratingCount": 3, "ratingSum": 12, "ratingScore": 3.5,
+    } for i in range(n)]
+
+
+def review_docs(rng, n):
+    return [{
+        "_id": ObjectId(), "review_id": f"rev-{i}", "purchase_id": f"pur-{i}",
+        "reviewer_user_id": f"buyer-{i % 1000}", "reviewed_user_id": f"seller-{i % 500}",
+        "product_id": f"prod-{rng.randint(0, 50_000)}", "rating": rng.randint(1, 5),
+        "comment": "Does what it says.", "created_at": datetime(2026, 1, 1), "updated_at": None,
+    } for i in range(n)]
+
+
+def measure(convert, docs):
+    """rows/s, and bytes retained per converted row"""
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(3):
+        out = [convert(d) for d in docs]
+    rate = 3 * len(docs) / (time.perf_counter() - start)
+    del out
+    gc.collect()
+    tracemalloc.start()
+    out = [convert(d) for d in docs]
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rate, used / len(docs)
+
+
+def compare(name, hand, mapper, docs):
+    if dataclasses.astuple(hand(docs[0])) != dataclasses.astuple(mapper(docs[0])):
+        sys.exit(f"[BENCH][MAPPING] {name}: mapper and hand-written conversion differ")
+    old_rate, old_bytes = measure(hand, docs)
+    new_rate, new_bytes = measure(mapper, docs)
+    print(f"[BENCH][MAPPING] {name} doc->entity: hand {old_rate:,.0f} rows/s {old_bytes:.0f} B/row, "
+          f"mapper {new_rate:,.0f} rows/s {new_bytes:.0f} B/row "
+          f"({new_rate / old_rate:.1f}x faster, {1 - new_bytes / old_bytes:.0%} less memory)")
+
+
+def main():
+    rng = random.Random(args.seed)
+    n = args.rows
+    purchases = purchase_docs(rng, n)
+    compare("purchases", hand_purchase, PURCHASES.from_doc, purchases)
+    compare("listings", hand_item, ITEMS.from_doc, item_docs(rng, n))
+    compare("reviews", hand_review, REVIEWS.from_doc, review_docs(rng, n))
+
+    entities = [PURCHASES.from_doc(d) for d in purchases]
+    if hand_purchase_doc(entities[0]) != PURCHASES.to_doc(entities[0]):
+        sys.exit("[BENCH][MAPPING] purchases: to_doc differs from the hand-written mapping")
+    old_rate, _ = measure(hand_purchase_doc, entities)
+    new_rate, _ = measure(PURCHASES.to_doc, entities)
+    print(f"[BENCH][MAPPING] purchases entity->doc: hand {old_rate:,.0f} rows/s, "
+          f"mapper {new_rate:,.0f} rows/s ({new_rate / old_rate:.1f}x)")
+
+
+main()
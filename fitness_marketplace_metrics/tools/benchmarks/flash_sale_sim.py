@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Flash-sale simulation benchmark
+-------------------------------
+
+Simulates many buyers hitting one product across several workers and
+compares two admission strategies:
+
+- direct: every purchase reads the item and decrements `qty` (two round
+  trips, writes serialized on the item document) — the regular PurchaseItem path
+- pool:   every worker admits buyers from a TokenPool that claims stock in
+  chunks (app/infrastructure/flash_sale.py)
+
+MongoDB is replaced by an in-memory stock counter with a simulated round-trip
+latency, so the numbers isolate the admission strategy.
+
+Reports admitted purchases per second, the admission fast-path latency and
+reconciliation accuracy (admitted + returned stock == initial stock, nothing
+oversold).
+
+Usage:
+  python fitness_marketplace_metrics/tools/benchmarks/flash_sale_sim.py --root fitness_marketplace_backend --stock 10000 --buyers 20000
+"""
+
+from __future__ import annotations
+import os, sys, time, asyncio, argparse
+
+# ---------------- args ----------------
+ap = argparse.ArgumentParser()
+ap.add_argument("--root", default="fitness_marketplace_backend",
+                help="Backend root directory that contains the app package")
+ap.add_argument("--stock", type=int, default=10_000, help="Initial units in stock")
+ap.add_argument("--buyers", type=int, default=20_000, help="Purchase attempts (1 unit each)")
+ap.add_argument("--workers", type=int, default=4, help="Simulated worker processes")
+ap.add_argument("--chunk", type=int, default=50, help="Tokens claimed per round trip")
+ap.add_argument("--batch", type=int, default=200, help="Purchases per simulated insert_many")
+ap.add_argument("--rttMs", type=float, default=1.0, help="Simulated MongoDB network round trip (ms)")
+ap.add_argument("--writeMs", type=float, default=0.1,
+                help="Time a write holds the item document (ms); writes to one document serialize")
+args = ap.parse_args()
+
+BACKEND_ROOT = os.path.abspath(args.root)
+if not os.path.isdir(BACKEND_ROOT):
+    sys.exit(f"[BENCH][FLASH] Backend root not found: {BACKEND_ROOT}")
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.infrastructure.flash_sale import TokenPool  # noqa: E402
+
+RTT = args.rttMs / 1000.0
+WRITE = args.writeMs / 1000.0
+
+
+class SimulatedItem:
+    """Stand-in for the item document: atomic ops cost one round trip."""
+
+    def __init__(self, qty: int):
+        self.qty = qty
+        self.round_trips = 0
+        self.write_lock = asyncio.Lock()  # document-level write serialization
+
+    async def read_qty(self) -> int:
+        self.round_trips += 1
+        await asyncio.sleep(RTT)
+        return self.qty
+
+    async def _write(self, op):
+        self.round_trips += 1
+        await asyncio.sleep(RTT / 2)
+        async with self.write_lock:
+            await asyncio.sleep(WRITE)
+            result = op()
+        await asyncio.sleep(RTT / 2)
+        return result
+
+    async def decrement_if_available(self, n: int) -> bool:
+        def op():
+            if self.qty >= n:
+                self.qty -= n
+                return True
+            return False
+        return await self._write(op)
+
+    async def claim(self, n: int) -> int:
+        def op():
+            taken = min(self.qty, n)
+            self.qty -= taken
+            return taken
+        return await self._write(op)
+
+
+async def run_direct() -> dict:
+    item = SimulatedItem(args.stock)
+    admitted = 0
+
+    async def buyer():
+        nonlocal admitted
+        if await item.read_qty() < 1:
+            return
+        if await item.decrement_if_available(1):
+            admitted += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(buyer() for _ in range(args.buyers)))
+    elapsed = time.perf_counter() - start
+    return {"admitted": admitted, "elapsed": elapsed, "round_trips": item.round_trips,
+            "final_qty": item.qty, "written": admitted, "returned": 0}
+
+
+async def run_pool() -> dict:
+    item = SimulatedItem(args.stock)
+    pools = [TokenPool(item.claim, args.chunk) for _ in range(args.workers)]
+    pending = [[] for _ in range(args.workers)]
+    written = 0
+    inserts = 0
+
+    async def buyer(i: int):
+        w = i % args.workers
+        if await pools[w].acquire(1):
+            pending[w].append(i)
+
+    async def writer(stop: asyncio.Event):
+        nonlocal written, inserts
+        while True:
+            for buf in pending:
+                while buf:
+                    batch, buf[:] = buf[:args.batch], buf[args.batch:]
+                    await asyncio.sleep(RTT)  # one insert_many
+                    written += len(batch)
+                    inserts += 1
+            if stop.is_set():
+                return
+            await asyncio.sleep(0.01)
+
+    stop = asyncio.Event()
+    writer_task = asyncio.create_task(writer(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(buyer(i) for i in range(args.buyers)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await writer_task
+
+    returned = sum(p.drain() for p in pools)
+    item.qty += returned
+    admitted = sum(p.admitted for p in pools)
+    return {"admitted": admitted, "elapsed": elapsed, "round_trips": item.round_trips + inserts,
+            "final_qty": item.qty, "written": written, "returned": returned,
+            "fast_path_us": fast_path_latency_us()}
+
+
+def fast_path_latency_us(n: int = 1_000_000) -> float:
+    """Average cost of admitting a buyer when the worker still holds tokens."""
+    async def never_called(_):
+        return 0
+    pool = TokenPool(never_called, args.chunk)
+    pool.available = n
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        pool.try_acquire(1)
+    return (time.perf_counter_ns() - start) / n / 1000.0
+
+
+def report(name: str, r: dict):
+    rate = r["admitted"] / r["elapsed"] if r["elapsed"] else 0.0
+    reconciled = (r["written"] == r["admitted"]
+                  and r["final_qty"] + r["admitted"] == args.stock
+                  and r["admitted"] <= args.stock)
+    print(f"[BENCH][FLASH] {name:>6}: admitted={r['admitted']} in {r['elapsed']:.3f}s "
+          f"-> {rate:,.0f} purchases/s, round trips={r['round_trips']}")
+    if "fast_path_us" in r:
+        print(f"[BENCH][FLASH] {name:>6}: admission fast path {r['fast_path_us']:.2f} µs, "
+              f"unsold tokens returned={r['returned']}")
+    print(f"[BENCH][FLASH] {name:>6}: written={r['written']} final stock={r['final_qty']} "
+          f"reconciled={'yes' if reconciled else 'NO'}")
+    return reconciled
+
+
+async def main():
+    print(f"[BENCH][FLASH] stock={args.stock} buyers={args.buyers} workers={args.workers} "
+          f"chunk={args.chunk} rtt={args.rttMs}ms")
+    ok = report("direct", await run_direct())
+    ok = report("pool", await run_pool()) and ok
+    if not ok:
+        sys.exit(1)
+
+
+asyncio.run(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+List serialisation benchmark
+----------------------------
+
+Serialises long lists of listings and purchases two ways and reports rows
+per second:
+
+- "models": what the routes did before, one pydantic model built per row,
+  then FastAPI's own response_model pass (validation + JSON dump)
+- "orjson": app.interfaces.serializers, plain dicts encoded by orjson
+
+Both outputs are decoded and compared, so a *_row drifting from its model
+fails the run.
+
+Usage:
+  python fitness_marketplace_metrics/tools/benchmarks/json_rows.py --root fitness_marketplace_backend --rows 10000
+"""
+
+from __future__ import annotations
+import os, sys, time, random, argparse, asyncio, json
+from datetime import datetime, timedelta
+
+# ---------------- args ----------------
+ap = argparse.ArgumentParser()
+ap.add_argument("--root", default="fitness_marketplace_backend",
+                help="Backend root directory that contains the app package")
+ap.add_argument("--rows", type=int, default=10_000, help="Rows per response")
+ap.add_argument("--repeat", type=int, default=20, help="Responses serialised per path")
+ap.add_argument("--seed", type=int, default=5)
+args = ap.parse_args()
+
+BACKEND_ROOT = os.path.abspath(args.root)
+if not os.path.isdir(BACKEND_ROOT):
+    sys.exit(f"[BENCH][JSON] Backend root not found: {BACKEND_ROOT}")
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+import orjson  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+from app.domain.entities import Item, Purchase  # noqa: E402
+from app.interfaces.schemas import ItemOut, PurchaseOut  # noqa: E402
+from app.interfaces.serializers import item_row, json_rows, purchase_row  # noqa: E402
+
+CATEGORIES = ["weights", "cardio", "yoga", "running", "cycling", "recovery", "nutrition", "apparel"]
+STATUSES = ["pending", "shipped", "delivered", "cancelled"]
+
+
+def make_item(rng: random.Random, i: int) -> Item:
+    return Item(
+        product_id=f"prod-{i}", product_name=f"Adjustable dumbbell set {i}",
+        category=rng.choice(CATEGORIES), price_cents=rng.randint(500, 80_000), qty=rng.randint(0, 50),
+        is_seller=True, owner_user_id=f"seller-{i % 500}",
+        photos=[f"/uploads/{i}-{n}.jpg" for n in range(rng.randint(0, 4))],
+        description="Solid steel, knurled grip, 2-24 kg in 2 kg steps. Ships in one box.",
+        avg_rating=round(rng.uniform(1, 5), 1), view_count=rng.randint(0, 10_000),
+        rating_count=rng.randint(0, 300),
+    )
+
+
+def make_purchase(rng: random.Random, i: int) -> Purchase:
+    start = datetime(2026, 1, 1)
+    return Purchase(
+        purchase_id=f"pur-{i}", buyer_user_id=f"buyer-{i % 1000}", seller_user_id=f"seller-{i % 500}",
+        product_id=f"prod-{rng.randint(0, 50_000)}", product_name="Yoga mat, 6 mm",
+        quantity=rng.randint(1, 3), total_price_cents=rng.randint(500, 80_000),
+        purchase_date=start + timedelta(seconds=rng.randint(0, 300 * 86400), microseconds=rng.randint(0, 999) * 1000),
+        status=rng.choice(STATUSES),
+    )
+
+
+def item_model(i: Item) -> ItemOut:
+    return ItemOut(
+        productId=i.product_id, productName=i.product_name, category=i.category,
+        priceCents=i.price_cents, qty=i.qty, ownerUserId=i.owner_user_id, isSeller=i.is_seller,
+        description=i.description, photos=i.photos, avgRating=i.avg_rating,
+        viewCount=i.view_count, ratingCount=i.rating_count,
+    )
+
+
+def purchase_model(p: Purchase) -> PurchaseOut:
+    return PurchaseOut(
+        purchaseId=p.purchase_id, buyerUserId=p.buyer_user_id, sellerUserId=p.seller_user_id,
+        productId=p.product_id, productName=p.product_name, quantity=p.quantity,
+        totalPriceCents=p.total_price_cents, purchaseDate=p.purchase_date, status=p.status,
+    )
+
+
+async def models_path(field, to_model, rows) -> bytes:
+    return await serialize_response(
+        field=field, response_content=[to_model(r) for r in rows], is_coroutine=True, dump_json=True
+    )
+
+
+def orjson_path(to_row, rows) -> bytes:
+    return json_rows(to_row(r) for r in rows).body
+
+
+async def bench(name, model, to_model, to_row, rows):
+    field = create_model_field("Response", list[model], mode="serialization")
+    old = await models_path(field, to_model, rows)
+    new = orjson_path(to_row, rows)
+    if json.loads(old) != orjson.loads(new):
+        sys.exit(f"[BENCH][JSON] {name}: serializer output differs from {model.__name__}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        await models_path(field, to_model, rows)
+    before = args.rows * args.repeat / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        orjson_path(to_row, rows)
+    after = args.rows * args.repeat / (time.perf_counter() - start)
+
+    print(f"[BENCH][JSON] {name}: models {before:,.0f} rows/s, orjson {after:,.0f} rows/s "
+          f"({after / before:.1f}x); {len(new) / args.rows:.0f} bytes/row, output identical")
+
+
+async def main():
+    rng = random.Random(args.seed)
+    items = [make_item(rng, i) for i in range(args.rows)]
+    purchases = [make_purchase(rng, i) for i in range(args.rows)]
+    await bench("listings", ItemOut, item_model, item_row, items)
+    await bench("purchases", PurchaseOut, purchase_model, purchase_row, purchases)
+
+
+asyncio.run(main())
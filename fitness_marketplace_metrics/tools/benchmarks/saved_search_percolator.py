@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Saved-search percolator benchmark
+---------------------------------
+
+Loads many synthetic saved searches into the percolator (the reverse index
+the outbox dispatcher matches new listings against) and measures:
+
+- load time and memory of the index (tracemalloc)
+- match latency per new listing (p50/p95/p99) and matches per listing
+- the same listings checked against every search, the naive approach the
+  reverse index replaces (on a small sample: it is slow)
+
+Usage:
+  python fitness_marketplace_metrics/tools/benchmarks/saved_search_percolator.py --root fitness_marketplace_backend --searches 1000000
+"""
+
+from __future__ import annotations
+import os, sys, time, random, argparse, tracemalloc
+from datetime import datetime
+
+# ---------------- args ----------------
+ap = argparse.ArgumentParser()
+ap.add_argument("--root", default="fitness_marketplace_backend",
+                help="Backend root directory that contains the app package")
+ap.add_argument("--searches", type=int, default=1_000_000, help="Saved searches to index")
+ap.add_argument("--listings", type=int, default=2_000, help="New listings to match")
+ap.add_argument("--naive", type=int, default=20, help="Listings to match by full scan")
+ap.add_argument("--seed", type=int, default=11)
+args = ap.parse_args()
+
+BACKEND_ROOT = os.path.abspath(args.root)
+if not os.path.isdir(BACKEND_ROOT):
+    sys.exit(f"[BENCH][PERCOLATOR] Backend root not found: {BACKEND_ROOT}")
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.domain.entities import Item, SavedSearch  # noqa: E402
+from app.infrastructure.percolator import SearchPercolator  # noqa: E402
+from app.infrastructure.suggest import tokens  # noqa: E402
+
+CATEGORIES = ["weights", "cardio", "yoga", "running", "cycling", "recovery", "nutrition", "apparel"]
+NOUNS = ["dumbbell", "kettlebell", "barbell", "mat", "block", "strap", "shoes", "shorts", "bottle",
+         "roller", "band", "bench", "rack", "rower", "bike", "treadmill", "gloves", "belt", "jersey"]
+BRANDS = [f"brand{i}" for i in range(20_000)]  # long tail of rarer words
+ADJECTIVES = ["adjustable", "heavy", "light", "foam", "steel", "rubber", "compact", "pro", "thick",
+              "breathable", "padded", "foldable", "wireless", "ergonomic", "premium", "classic"]
+
+
+def make_search(rng: random.Random, i: int) -> SavedSearch:
+    # Buyers mostly look for a product of a brand; some browse a category
+    # within a price range
+    shape = rng.random()
+    words, category, lo, hi = [], None, None, None
+    if shape < 0.5:
+        words = [rng.choice(NOUNS), rng.choice(BRANDS)]
+    elif shape < 0.7:
+        words = [rng.choice(BRANDS)]
+    elif shape < 0.85:
+        words = [rng.choice(NOUNS), rng.choice(ADJECTIVES)]
+        category = rng.choice(CATEGORIES)
+    elif shape < 0.95:
+        category = rng.choice(CATEGORIES)
+        lo = rng.randint(500, 60_000)
+        hi = lo + rng.randint(100, 2_000)
+    else:
+        words = [rng.choice(NOUNS)]
+        hi = rng.randint(500, 5_000)
+    return SavedSearch(
+        search_id=f"s{i}", user_id=f"u{i % 200_000}", query=" ".join(words) or None,
+        category=category, min_price_cents=lo, max_price_cents=hi, created_at=datetime.utcnow(),
+    )
+
+
+def make_item(rng: random.Random, i: int) -> Item:
+    name = f"{rng.choice(BRANDS)} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+    return Item(
+        product_id=f"p{i}", product_name=name, category=rng.choice(CATEGORIES),
+        price_cents=rng.randint(500, 80_000), qty=1, is_seller=True, owner_user_id="seller",
+        description=" ".join(rng.choices(ADJECTIVES + NOUNS, k=8)),
+    )
+
+
+def compile_all(searches):
+    return [
+        (s.search_id, set(tokens(s.query or "")), s.category.lower() if s.category else None,
+         s.min_price_cents, s.max_price_cents)
+        for s in searches
+    ]
+
+
+def naive_match(compiled, item: Item):
+    words = set(tokens(f"{item.product_name} {item.description or ''}"))
+    category = item.category.lower()
+    price = item.price_cents
+    return [
+        sid for sid, terms, cat, lo, hi in compiled
+        if (cat is None or cat == category)
+        and (lo is None or price >= lo)
+        and (hi is None or price <= hi)
+        and terms <= words
+    ]
+
+
+def pct(values, p):
+    return sorted(values)[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    rng = random.Random(args.seed)
+    searches = [make_search(rng, i) for i in range(args.searches)]
+    percolator = SearchPercolator()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for s in searches:
+        percolator.add(s)
+    took = time.perf_counter() - start
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"[BENCH][PERCOLATOR] index {args.searches:,} searches: {took:.1f} s, "
+          f"{used / 1e6:.0f} MB ({used / args.searches:.0f} bytes/search), "
+          f"{len(percolator.postings):,} keys")
+
+    items = [make_item(rng, i) for i in range(args.listings)]
+    timings, matched = [], 0
+    for item in items:
+        start = time.perf_counter()
+        matched += len(percolator.match(item))
+        timings.append((time.perf_counter() - start) * 1e3)
+    print(f"[BENCH][PERCOLATOR] match {args.listings} listings: p50={pct(timings, 0.5):.2f} ms "
+          f"p95={pct(timings, 0.95):.2f} ms p99={pct(timings, 0.99):.2f} ms; "
+          f"{matched / args.listings:.0f} matches/listing")
+
+    sample = items[:args.naive]
+    compiled = compile_all(searches)
+    start = time.perf_counter()
+    for item in sample:
+        expected = sorted(naive_match(compiled, item))
+        got = sorted(sid for sid, _ in percolator.match(item))
+        if got != expected:
+            sys.exit(f"[BENCH][PERCOLATOR] mismatch on {item.product_id}: "
+                     f"{len(got)} vs {len(expected)} matches")
+    naive = (time.perf_counter() - start) / len(sample) * 1e3
+    print(f"[BENCH][PERCOLATOR] full scan of every search: {naive:.0f} ms/listing "
+          f"({naive / pct(timings, 0.5):.0f}x slower); results identical on {len(sample)} listings")
+
+
+main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Similar-items benchmark
+-----------------------
+
+Builds the content-based similar-items index over a synthetic catalog and
+measures:
+
+- build time and the size of the memory-mapped vector matrix on disk
+- time to map a published version (what every worker does on reload)
+- single-listing query latency (p50/p95) and batched query throughput
+- incremental add latency for a newly created listing, and the query cost
+  once the in-memory tail holds many such listings
+
+Usage:
+  python fitness_marketplace_metrics/tools/benchmarks/similar_items_bench.py --root fitness_marketplace_backend --items 500000
+"""
+
+from __future__ import annotations
+import os, sys, time, random, argparse, tempfile, shutil
+
+# ---------------- args ----------------
+ap = argparse.ArgumentParser()
+ap.add_argument("--root", default="fitness_marketplace_backend",
+                help="Backend root directory that contains the app package")
+ap.add_argument("--items", type=int, default=500_000, help="Catalog size")
+ap.add_argument("--dim", type=int, default=256, help="Vector dimensions")
+ap.add_argument("--queries", type=int, default=200, help="Single queries to time")
+ap.add_argument("--batch", type=int, default=64, help="Listings per batched query")
+ap.add_argument("--adds", type=int, default=1_000, help="Listings added after the build")
+ap.add_argument("--k", type=int, default=10, help="Neighbours per query")
+ap.add_argument("--seed", type=int, default=7)
+args = ap.parse_args()
+
+BACKEND_ROOT = os.path.abspath(args.root)
+if not os.path.isdir(BACKEND_ROOT):
+    sys.exit(f"[BENCH][SIMILAR] Backend root not found: {BACKEND_ROOT}")
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+import numpy as np  # noqa: E402
+
+from app.domain.entities import Item  # noqa: E402
+from app.infrastructure.similar_items import SimilarItemsIndex  # noqa: E402
+
+CATEGORIES = ["weights", "cardio", "yoga", "running", "cycling", "recovery", "nutrition", "apparel"]
+NOUNS = ["dumbbell", "kettlebell", "barbell", "mat", "block", "strap", "shoes", "shorts", "bottle",
+         "roller", "band", "bench", "rack", "rower", "bike", "treadmill", "gloves", "belt", "jersey"]
+ADJECTIVES = ["adjustable", "heavy", "light", "foam", "steel", "rubber", "compact", "pro", "thick",
+              "breathable", "padded", "foldable", "wireless", "ergonomic", "premium", "classic"]
+FILLER = ["for", "home", "gym", "training", "workout", "durable", "grip", "set", "pair", "kg",
+          "beginner", "advanced", "non", "slip", "quick", "dry", "support", "core", "strength"]
+
+
+def make_item(rng: random.Random, i: int) -> Item:
+    name = " ".join(rng.sample(ADJECTIVES, 2) + [rng.choice(NOUNS)])
+    description = " ".join(rng.choices(FILLER + NOUNS + ADJECTIVES, k=rng.randint(8, 30)))
+    return Item(
+        product_id=f"prod-{i}",
+        product_name=name,
+        category=rng.choice(CATEGORIES),
+        price_cents=rng.randint(500, 50_000),
+        qty=1,
+        is_seller=True,
+        owner_user_id="bench",
+        description=description,
+    )
+
+
+def pct(values, p):
+    return sorted(values)[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    rng = random.Random(args.seed)
+    items = [make_item(rng, i) for i in range(args.items)]
+    directory = tempfile.mkdtemp(prefix="similar-items-")
+    try:
+        index = SimilarItemsIndex(directory, args.dim)
+        index.projection  # built once per process; not part of the build timing
+        start = time.perf_counter()
+        version = index.build(items)
+        build = time.perf_counter() - start
+        size = os.path.getsize(os.path.join(directory, version, "vectors.npy"))
+        print(f"[BENCH][SIMILAR] build {args.items:,} listings x {args.dim} dims: {build:.1f} s; "
+              f"matrix {size / 1e6:.0f} MB on disk")
+
+        start = time.perf_counter()
+        index.load()
+        print(f"[BENCH][SIMILAR] map published version: {(time.perf_counter() - start) * 1e3:.1f} ms")
+        index.query(index.vector(items[0]), args.k)  # fault the pages in once
+
+        timings = []
+        for item in rng.sample(items, args.queries):
+            start = time.perf_counter()
+            index.similar(item, args.k)
+            timings.append((time.perf_counter() - start) * 1e3)
+        print(f"[BENCH][SIMILAR] single query (k={args.k}): p50={pct(timings, 0.5):.1f} ms "
+              f"p95={pct(timings, 0.95):.1f} ms")
+
+        batch = rng.sample(items, args.batch)
+        vectors = np.vstack([index.vector(i) for i in batch])
+        start = time.perf_counter()
+        index.query(vectors, args.k, exclude=[i.product_id for i in batch])
+        took = time.perf_counter() - start
+        print(f"[BENCH][SIMILAR] batched query of {args.batch}: {took * 1e3:.1f} ms "
+              f"({took / args.batch * 1e3:.2f} ms/listing)")
+
+        timings = []
+        for i in range(args.adds):
+            item = make_item(rng, args.items + i)
+            start = time.perf_counter()
+            index.add(item)
+            timings.append((time.perf_counter() - start) * 1e3)
+        print(f"[BENCH][SIMILAR] incremental add: p50={pct(timings, 0.5):.3f} ms "
+              f"p95={pct(timings, 0.95):.3f} ms")
+
+        timings = []
+        for item in rng.sample(items, min(args.queries, 50)):
+            start = time.perf_counter()
+            index.similar(item, args.k)
+            timings.append((time.perf_counter() - start) * 1e3)
+        print(f"[BENCH][SIMILAR] single query with {args.adds} tail listings: "
+              f"p50={pct(timings, 0.5):.1f} ms")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Sparse fieldset benchmark
+-------------------------
+
+What `?fields=` saves on GET /listings. A page of listing documents is
+encoded as BSON (what MongoDB sends back) both whole and cut to the
+card projection, then taken through the route's read path: BSON decode,
+DocMapper, serializer rows and orjson. Reported per fieldset:
+
+- BSON bytes per listing (wire size from MongoDB) and JSON bytes per listing
+- time to decode, map and serialise a page
+
+Usage:
+  python fitness_marketplace_metrics/tools/benchmarks/sparse_fields.py --root fitness_marketplace_backend --rows 500
+"""
+
+from __future__ import annotations
+import os, sys, time, random, argparse
+
+# ---------------- args ----------------
+ap = argparse.ArgumentParser()
+ap.add_argument("--root", default="fitness_marketplace_backend",
+                help="Backend root directory that contains the app package")
+ap.add_argument("--rows", type=int, default=500, help="Listings per page")
+ap.add_argument("--repeat", type=int, default=200, help="Pages per measurement")
+ap.add_argument("--fields", default="productId,productName,priceCents,photos,avgRating",
+                help="Sparse fieldset to compare with the full listing")
+ap.add_argument("--seed", type=int, default=9)
+args = ap.parse_args()
+
+BACKEND_ROOT = os.path.abspath(args.root)
+if not os.path.isdir(BACKEND_ROOT):
+    sys.exit(f"[BENCH][FIELDS] Backend root not found: {BACKEND_ROOT}")
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+import bson  # noqa: E402
+from bson import ObjectId  # noqa: E402
+
+from app.infrastructure.item_repo import ITEMS  # noqa: E402
+from app.interfaces.serializers import ITEM_FIELDS, SparseFields, item_row, json_rows  # noqa: E402
+
+WORDS = ["steel", "grip", "knurled", "adjustable", "rubber", "coated", "home", "gym", "durable",
+         "set", "pair", "kg", "quick", "lock", "collar", "compact", "storage", "rack", "included"]
+
+
+def make_doc(rng: random.Random, i: int) -> dict:
+    return {
+        "_id": ObjectId(), "productId": f"prod-{i}", "productName": "Adjustable dumbbell set",
+        "category": "weights", "priceCents": rng.randint(500, 80_000), "qty": rng.randint(0, 50),
+        "photos": [f"/uploads/{ObjectId()}.jpg" for _ in range(rng.randint(1, 6))],
+        "description": " ".join(rng.choices(WORDS, k=rng.randint(40, 120))),
+        "isSeller": True, "ownerUserId": f"seller-{i % 500}", "avgRating": rng.uniform(1, 5),
+        "viewCount": rng.randint(0, 10_000), "ratingCount": 12, "ratingSum": 50, "ratingScore": 3.9,
+    }
+
+
+def page_bytes(docs, projection=None) -> bytes:
+    """The page as MongoDB returns it: concatenated BSON documents"""
+    if projection:
+        docs = [{k: d[k] for k in projection if projection[k] and k in d} for d in docs]
+    return b"".join(bson.encode(d) for d in docs)
+
+
+def read_path(raw: bytes, fields=None) -> bytes:
+    from_doc = ITEMS.from_partial_doc if fields else ITEMS.from_doc
+    items = [from_doc(d) for d in bson.decode_all(raw)]
+    return json_rows((item_row(i) for i in items), fields=fields).body
+
+
+def timed(raw, fields) -> float:
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        read_path(raw, fields)
+    return (time.perf_counter() - start) / args.repeat * 1e3
+
+
+def main():
+    rng = random.Random(args.seed)
+    docs = [make_doc(rng, i) for i in range(args.rows)]
+    fields = SparseFields(ITEM_FIELDS)(args.fields)
+
+    full_raw = page_bytes(docs)
+    sparse_raw = page_bytes(docs, ITEMS.projection(fields.attributes))
+    full_json, sparse_json = read_path(full_raw), read_path(sparse_raw, fields)
+    full_ms, sparse_ms = timed(full_raw, None), timed(sparse_raw, fields)
+
+    n = args.rows
+    print(f"[BENCH][FIELDS] full listing: {len(full_raw) / n:.0f} B/row BSON, "
+          f"{len(full_json) / n:.0f} B/row JSON, {full_ms:.2f} ms per {n}-row page")
+    print(f"[BENCH][FIELDS] fields={args.fields}: {len(sparse_raw) / n:.0f} B/row BSON "
+          f"({len(sparse_raw) / len(full_raw):.0%}), {len(sparse_json) / n:.0f} B/row JSON "
+          f"({len(sparse_json) / len(full_json):.0%}), {sparse_ms:.2f} ms per page "
+          f"({sparse_ms / full_ms:.0%})")
+
+
+main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+SSE fan-out benchmark
+---------------------
+
+Holds many idle seller-notification subscribers in one event loop (one
+worker) and measures:
+
+- memory per idle connection (tracemalloc): the Subscription, the task and
+  the stream generator it drives, i.e. what the app adds on top of the
+  server's own per-socket state
+- fan-out latency of one publish to every subscriber of a topic
+- cost of one hub-wide heartbeat tick
+- slow-consumer dropping: a subscriber that never reads is dropped once its
+  queue is full, the others keep receiving
+
+Usage:
+  python fitness_marketplace_metrics/tools/benchmarks/sse_fanout.py --root fitness_marketplace_backend --subscribers 10000
+"""
+
+from __future__ import annotations
+import os, sys, time, asyncio, argparse, tracemalloc
+
+# ---------------- args ----------------
+ap = argparse.ArgumentParser()
+ap.add_argument("--root", default="fitness_marketplace_backend",
+                help="Backend root directory that contains the app package")
+ap.add_argument("--subscribers", type=int, default=10_000, help="Idle connections to hold")
+ap.add_argument("--sellers", type=int, default=100, help="Topics the subscribers spread over")
+ap.add_argument("--queue", type=int, default=100, help="Per-connection queue size")
+args = ap.parse_args()
+
+BACKEND_ROOT = os.path.abspath(args.root)
+if not os.path.isdir(BACKEND_ROOT):
+    sys.exit(f"[BENCH][SSE] Backend root not found: {BACKEND_ROOT}")
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.infrastructure.notifications import NotificationHub  # noqa: E402
+
+
+async def stream(hub: NotificationHub, sub, received: list):
+    # Same shape as the route's generator, minus the socket write
+    try:
+        while True:
+            message = await sub.next()
+            if message is None:
+                break
+            received[0] += 1
+    finally:
+        hub.unsubscribe(sub)
+
+
+async def main():
+    hub = NotificationHub(queue_size=args.queue)
+    received = [0]
+
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    tasks = []
+    for i in range(args.subscribers):
+        sub = hub.subscribe(f"seller-{i % args.sellers}")
+        tasks.append(asyncio.create_task(stream(hub, sub, received)))
+    await asyncio.sleep(0)  # let every stream park on its waiter
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_conn = (used - base) / args.subscribers
+    print(f"[BENCH][SSE] {args.subscribers} idle subscribers: {(used - base) / 1e6:.1f} MB "
+          f"-> {per_conn:,.0f} bytes/connection")
+
+    # Fan-out: one event to every subscriber of one topic, then to all topics
+    per_topic = args.subscribers // args.sellers
+    start = time.perf_counter()
+    hub.publish("seller-0", "purchase", {"purchaseId": "p-0", "quantity": 1})
+    await asyncio.sleep(0)
+    one = time.perf_counter() - start
+    start = time.perf_counter()
+    for s in range(args.sellers):
+        hub.publish(f"seller-{s}", "purchase", {"purchaseId": f"p-{s}", "quantity": 1})
+    while received[0] < per_topic + args.subscribers:
+        await asyncio.sleep(0)
+    everyone = time.perf_counter() - start
+    print(f"[BENCH][SSE] publish to {per_topic} subscribers: {one * 1e3:.2f} ms; "
+          f"to all {args.subscribers}: {everyone * 1e3:.1f} ms "
+          f"({everyone / args.subscribers * 1e6:.2f} µs/delivery)")
+
+    start = time.perf_counter()
+    await hub.heartbeat()  # everyone was active: only resets flags
+    await hub.heartbeat()  # everyone idle: one keep-alive each
+    await asyncio.sleep(0)
+    print(f"[BENCH][SSE] two heartbeat ticks over {hub.subscriber_count} subscribers: "
+          f"{(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    # Slow consumer: subscribed but never read
+    slow = hub.subscribe("seller-0")
+    for n in range(args.queue + 1):
+        hub.publish("seller-0", "purchase", {"purchaseId": f"burst-{n}", "quantity": 1})
+        await asyncio.sleep(0)
+    dropped_ok = slow.closed and hub.dropped == 1
+    print(f"[BENCH][SSE] slow consumer dropped after {args.queue} queued events: "
+          f"{'yes' if dropped_ok else 'NO'}; active subscribers={hub.subscriber_count}")
+
+    hub.close_all()
+    await asyncio.gather(*tasks)
+    if not dropped_ok:
+        sys.exit(1)
+
+
+asyncio.run(main())